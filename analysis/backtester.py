@@ -0,0 +1,205 @@
+# MCP-Stock-Tracker/analysis/backtester.py
+"""
+Vectorized backtester for strategy configs.
+
+Replays a bar series through the same pipeline run_bot uses live:
+generate_signals_detailed scoring, assess_risk, and the
+SIGNAL_STRENGTH_THRESHOLD gate. Every step is an array operation over the
+whole series; nothing loops per bar or copies a frame per bar.
+
+Indicators run over the full series, as the streaming engine does live, so
+bar t sees exactly the history up to t. Positions change at the close of the
+signal bar and earn the next bar's return. BUY goes long, SELL goes flat
+(or short with allow_short), HOLD keeps the current position.
+
+Usage:
+    python -m analysis.backtester AAPL NVDA --period 60d --interval 1h
+"""
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from analysis.signal_generator import (
+    calculate_rsi,
+    calculate_macd_histogram,
+    calculate_ema_pair,
+    load_signal_config
+)
+from config import SIGNAL_STRENGTH_THRESHOLD, BACKTEST_FEE_BPS
+
+BUY, HOLD, SELL = 1, 0, -1
+
+
+def compute_indicators(df: pd.DataFrame, indicators) -> dict:
+    """RSI, MACD histogram and EMA pair for every bar, as float arrays."""
+    ema_short, ema_long = calculate_ema_pair(df, indicators["ema_short"], indicators["ema_long"])
+    return {
+        "rsi": calculate_rsi(df, indicators["rsi_window"]).to_numpy(dtype="float64"),
+        "macd_hist": calculate_macd_histogram(df, indicators["macd_fast"], indicators["macd_slow"],
+                                              indicators["macd_signal"]).to_numpy(dtype="float64"),
+        "ema_short": ema_short.to_numpy(dtype="float64"),
+        "ema_long": ema_long.to_numpy(dtype="float64")
+    }
+
+
+def wilder_atr(high, low, close, window=14) -> np.ndarray:
+    """
+    ta.volatility.AverageTrueRange without its per-bar Python loop.
+
+    Wilder's recurrence atr[i] = (atr[i-1] * (w-1) + tr[i]) / w is an EWM
+    with alpha = 1/w seeded at the mean of the first w true ranges, so it
+    runs as one ewm() pass. Matches ta to floating-point rounding; like ta,
+    bars before the seed are 0.
+    """
+    high, low, close = (np.asarray(a, dtype="float64") for a in (high, low, close))
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+    atr = np.zeros(len(close))
+    if len(close) < window:
+        return atr
+    seeded = tr[window - 1:].copy()
+    seeded[0] = tr[:window].mean()
+    atr[window - 1:] = pd.Series(seeded).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+    return atr
+
+
+def compute_risk(df: pd.DataFrame, atr_window=14, drawdown_window=20) -> np.ndarray:
+    """assess_risk's risk_score for every bar (NaN until the drawdown window fills)."""
+    close = pd.to_numeric(df['close']).to_numpy(dtype="float64")
+    atr = wilder_atr(df['high'], df['low'], close, atr_window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volatility = np.where(close > 0, atr / close, 0.0)
+        rolling_max = pd.Series(close).rolling(window=drawdown_window).max().to_numpy()
+        drawdown = (rolling_max - close) / rolling_max
+    return np.minimum(np.round(volatility + drawdown, 2), 1.0)
+
+
+def score_bars(values: dict, config) -> tuple:
+    """
+    Vectorized generate_signals_detailed scoring for every bar.
+
+    :return: (action, confidence) arrays; action is BUY/HOLD/SELL codes and
+             confidence is NaN where any indicator is still undefined
+    """
+    weights = config["weights"]
+    thresholds = config["thresholds"]
+    rsi, macd = values["rsi"], values["macd_hist"]
+    trend = values["ema_short"] - values["ema_long"]
+
+    score = (np.where(rsi < thresholds["rsi_oversold"], weights["rsi"],
+                      np.where(rsi > thresholds["rsi_overbought"], -weights["rsi"], 0.0))
+             + np.sign(macd) * weights["macd"]
+             + np.sign(trend) * weights["ema_trend"])
+    normalized = score / sum(weights.values())
+
+    valid = ~(np.isnan(rsi) | np.isnan(macd) | np.isnan(trend))
+    action = np.where(normalized >= thresholds["buy_threshold"], BUY,
+                      np.where(normalized <= thresholds["sell_threshold"], SELL, HOLD))
+    action = np.where(valid, action, HOLD)
+    confidence = np.where(valid, np.round(np.abs(normalized), 3), np.nan)
+    return action, confidence
+
+
+def gate_actions(action, confidence, risk, threshold=SIGNAL_STRENGTH_THRESHOLD):
+    """Apply run_bot's signal strength gate: HOLD unless confidence * (1 - risk) clears it."""
+    strength = np.round(confidence * (1 - risk), 3)
+    return np.where(strength >= threshold, action, HOLD)
+
+
+def simulate(close, action, fee_bps=BACKTEST_FEE_BPS, allow_short=False) -> dict:
+    """
+    Turn per-bar actions into positions and performance metrics.
+
+    :return: Dict with total_return, max_drawdown, hit_rate, trades, exposure and bars
+    """
+    close = np.asarray(close, dtype="float64")
+    target = np.where(action == BUY, 1.0, np.where(action == SELL, -1.0 if allow_short else 0.0, np.nan))
+    position = pd.Series(target).ffill().fillna(0.0).to_numpy()
+
+    returns = np.zeros(len(close))
+    returns[1:] = np.diff(close) / close[:-1]
+    held = np.concatenate(([0.0], position[:-1]))
+    turnover = np.abs(np.diff(position, prepend=0.0))
+    net = held * returns - turnover * fee_bps / 10000.0
+
+    equity = np.cumprod(1.0 + net)
+    peak = np.maximum.accumulate(equity) if len(equity) else equity
+    max_drawdown = float((equity / peak - 1.0).min()) if len(equity) else 0.0
+
+    # A trade is a run of bars at one non-zero position; bar t's return belongs
+    # to the run that was held going into it, and the entry cost to the new run
+    run = np.cumsum(np.diff(position, prepend=0.0) != 0)
+    owner = np.concatenate(([0], run[:-1]))
+    in_market = held != 0
+    entries = (turnover > 0) & (position != 0)
+    trade_pnl = pd.Series((held * returns)[in_market]).groupby(owner[in_market]).sum()
+    entry_cost = pd.Series((turnover * fee_bps / 10000.0)[entries]).groupby(run[entries]).sum()
+    trade_pnl = trade_pnl - entry_cost.reindex(trade_pnl.index, fill_value=0.0)
+    trades = int(entries.sum())
+
+    return {
+        "total_return": float(equity[-1] - 1.0) if len(equity) else 0.0,
+        "max_drawdown": max_drawdown,
+        "hit_rate": float((trade_pnl > 0).mean()) if len(trade_pnl) else None,
+        "trades": trades,
+        "exposure": float((held != 0).mean()) if len(held) else 0.0,
+        "bars": int(len(close))
+    }
+
+
+def run_backtest(df: pd.DataFrame, symbol: str = None, config=None,
+                 threshold=SIGNAL_STRENGTH_THRESHOLD, fee_bps=BACKTEST_FEE_BPS, allow_short=False) -> dict:
+    """
+    Backtest one symbol's bars against a strategy config.
+
+    :param df: Bars shaped like fetch_price_data output (needs high, low, close)
+    :param symbol: Used to pick the symbol-specific config when config is None
+    :param config: Strategy config mapping; defaults to load_signal_config(symbol)
+    :return: Metrics dict from simulate(), plus signal counts
+    """
+    if df.empty or 'close' not in df.columns:
+        return {"error": "No valid price data"}
+
+    config = config or load_signal_config(symbol)
+    close = pd.to_numeric(df['close']).to_numpy(dtype="float64")
+
+    action, confidence = score_bars(compute_indicators(df, config["indicators"]), config)
+    action = gate_actions(action, confidence, compute_risk(df), threshold)
+
+    metrics = simulate(close, action, fee_bps, allow_short)
+    metrics["buy_signals"] = int((action == BUY).sum())
+    metrics["sell_signals"] = int((action == SELL).sum())
+    return metrics
+
+
+def run_backtest_many(frames: dict, configs: dict = None, **kwargs) -> dict:
+    """Backtest every symbol -> frame pair; configs optionally overrides per symbol."""
+    configs = configs or {}
+    return {symbol: run_backtest(df, symbol, configs.get(symbol), **kwargs) for symbol, df in frames.items()}
+
+
+def main():
+    from data.collector import fetch_price_data_many
+
+    parser = argparse.ArgumentParser(description="Backtest strategy configs over historical bars")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--period", default="60d")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--fee-bps", type=float, default=BACKTEST_FEE_BPS)
+    parser.add_argument("--allow-short", action="store_true")
+    args = parser.parse_args()
+
+    frames, failures = fetch_price_data_many(args.symbols, period=args.period, interval=args.interval)
+    for symbol, error in failures.items():
+        print(f"[backtester] Skipping {symbol}: {error}")
+
+    results = run_backtest_many(frames, fee_bps=args.fee_bps, allow_short=args.allow_short)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,164 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from torch.nn.functional import softmax
-import torch
+import threading
 
-# Load FinBERT model + tokenizer
-tokenizer = AutoTokenizer.from_pretrained("yiyanghkust/finbert-tone")
-model = AutoModelForSequenceClassification.from_pretrained("yiyanghkust/finbert-tone")
+from analysis.sentiment_cache import SentimentCache
+from utils.metrics import inc, register_gauge, timed
+from config import (
+    SENTIMENT_BATCH_SIZE,
+    SENTIMENT_NUM_THREADS,
+    SENTIMENT_CACHE_SIZE,
+    SENTIMENT_CACHE_PATH,
+    FINBERT_QUANTIZE,
+    FINBERT_TORCHSCRIPT_PATH
+)
+
+MODEL_NAME = "yiyanghkust/finbert-tone"
+
+# FinBERT model + tokenizer are loaded on first use (see _load_model), so
+# importing this module no longer pays for torch or the model weights.
+tokenizer = None
+model = None
 
 labels = ["positive", "neutral", "negative"]
 
-def analyze_sentiment(text: str) -> dict:
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
+# The engine scores many symbols from a worker pool; the fast tokenizer is not
+# safe to share across threads and torch already parallelises each forward pass.
+_inference_lock = threading.Lock()
+_load_lock = threading.Lock()
+
+# Repeated headlines (same story every minute, or across symbols) skip inference
+sentiment_cache = SentimentCache(max_size=SENTIMENT_CACHE_SIZE, path=SENTIMENT_CACHE_PATH)
+register_gauge("mcp_sentiment_cache_hit_rate", lambda: sentiment_cache.stats()["hit_rate"],
+               help="Share of headline lookups answered by the sentiment cache")
+
+def _load_model():
+    """
+    Load the tokenizer and model once, on first use.
+
+    FINBERT_TORCHSCRIPT_PATH loads a traced artifact written by
+    export_torchscript(); otherwise the Hugging Face weights are loaded and,
+    with FINBERT_QUANTIZE, their Linear layers converted to dynamic int8.
+    """
+    global tokenizer, model
+
+    if model is not None:
+        return tokenizer, model
+
+    with _load_lock:
+        if model is None:
+            import torch
+            from transformers import AutoTokenizer
+
+            if SENTIMENT_NUM_THREADS > 0:
+                torch.set_num_threads(SENTIMENT_NUM_THREADS)
+
+            loaded_tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+            if FINBERT_TORCHSCRIPT_PATH:
+                loaded_model = torch.jit.load(FINBERT_TORCHSCRIPT_PATH, map_location="cpu")
+            else:
+                loaded_model = _load_hf_model(quantize=FINBERT_QUANTIZE)
+            loaded_model.eval()
+
+            tokenizer = loaded_tokenizer
+            model = loaded_model
+
+    return tokenizer, model
+
+def _load_hf_model(quantize=False):
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    hf_model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+    if quantize:
+        hf_model = torch.quantization.quantize_dynamic(hf_model, {torch.nn.Linear}, dtype=torch.qint8)
+    return hf_model
+
+def warm_up():
+    """Load the model and run one throwaway forward pass so the first real cycle is fast."""
+    _run_model(["Markets open steady ahead of earnings."])
 
+def export_torchscript(path: str, quantize: bool = False):
+    """
+    Trace FinBERT (optionally int8-quantized) to a TorchScript file that can
+    be loaded through FINBERT_TORCHSCRIPT_PATH without rebuilding the model
+    from its Hugging Face config.
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    export_tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    export_model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME, torchscript=True)
+    export_model.eval()
+    if quantize:
+        export_model = torch.quantization.quantize_dynamic(export_model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    example = export_tokenizer(["Shares rise after earnings beat.", "Guidance cut"],
+                               return_tensors="pt", padding=True)
     with torch.no_grad():
-        outputs = model(**inputs)
+        traced = torch.jit.trace(export_model, (example["input_ids"], example["attention_mask"]))
+    torch.jit.save(traced, path)
+    return path
+
+@timed("analyze_sentiment")
+def analyze_sentiment(text: str) -> dict:
+    return analyze_sentiment_batch([text])[0]
+
+@timed("analyze_sentiment_batch")
+def analyze_sentiment_batch(texts: list, batch_size: int = None) -> list:
+    """
+    Score many headlines with padded batches and one forward pass per batch.
+    Cached headlines are answered from sentiment_cache and never reach the model.
+
+    :param texts: Headlines to score
+    :param batch_size: Max headlines per forward pass (defaults to SENTIMENT_BATCH_SIZE)
+    :return: List of {"sentiment", "confidence"} dicts in the same order as texts
+    """
+    results = [sentiment_cache.get(text, MODEL_NAME) for text in texts]
+
+    # Run each distinct uncached headline through the model exactly once
+    pending = list(dict.fromkeys(text for text, result in zip(texts, results) if result is None))
+    hits = sum(result is not None for result in results)
+    inc("mcp_sentiment_texts_total", hits, help="Headlines scored, by cache outcome", outcome="cache_hit")
+    inc("mcp_sentiment_texts_total", len(texts) - hits, outcome="cache_miss")
+    if pending:
+        scored = dict(zip(pending, _run_model(pending, batch_size)))
+        for text, result in scored.items():
+            sentiment_cache.put(text, MODEL_NAME, result)
+        results = [result if result is not None else dict(scored[text])
+                   for text, result in zip(texts, results)]
+
+    return results
+
+def get_cache_stats() -> dict:
+    return sentiment_cache.stats()
+
+@timed("finbert_inference")
+def _run_model(texts: list, batch_size: int = None) -> list:
+    import torch
+    from torch.nn.functional import softmax
+
+    batch_tokenizer, batch_model = _load_model()
+    batch_size = max(1, batch_size or SENTIMENT_BATCH_SIZE)
+    results = []
+
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+
+        with _inference_lock:
+            inputs = batch_tokenizer(batch, return_tensors="pt", padding=True, truncation=True, max_length=512)
+
+            with torch.no_grad():
+                if isinstance(batch_model, torch.jit.ScriptModule):
+                    logits = batch_model(inputs["input_ids"], inputs["attention_mask"])[0]
+                else:
+                    logits = batch_model(**inputs).logits
+
+        probs = softmax(logits, dim=1).tolist()
+        best = torch.argmax(logits, dim=1).tolist()
 
-    probs = softmax(outputs.logits, dim=1).squeeze().tolist()
-    best_idx = int(torch.argmax(outputs.logits))
+        for row, best_idx in zip(probs, best):
+            results.append({
+                "sentiment": labels[best_idx],
+                "confidence": round(row[best_idx], 3)
+            })
 
-    return {
-        "sentiment": labels[best_idx],
-        "confidence": round(probs[best_idx], 3)
-    }
+    return results
@@ -0,0 +1,176 @@
+# MCP-Stock-Tracker/analysis/panel_signals.py
+"""
+Cross-sectional signal generation for a whole panel of symbols at once.
+
+Closes are laid out as one right-aligned (bars x symbols) matrix, so the
+newest bar of every symbol sits in the last row and shorter histories are
+NaN-padded at the top. pandas' ewm skips leading NaNs, so each column gets
+exactly the indicator values it would get on its own. Indicators are
+computed column-wise per distinct window setting, and the weighted score,
+thresholds and actions are NumPy array operations over all symbols.
+Only the human-readable reason strings are assembled per symbol.
+"""
+
+import numpy as np
+import pandas as pd
+
+from analysis.signal_generator import load_signal_config
+
+_INDICATOR_KEYS = ("rsi_window", "macd_fast", "macd_slow", "macd_signal", "ema_short", "ema_long")
+
+
+def to_close_matrix(panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build the right-aligned close matrix (columns = symbols) from either
+
+    - a long frame with 'symbol' and 'close' columns, rows in time order per
+      symbol (e.g. concatenated collector frames), or
+    - a wide frame of closes, one column per symbol, rows in time order.
+    """
+    if "symbol" in panel.columns:
+        groups = {symbol: g["close"].to_numpy(dtype="float64")
+                  for symbol, g in panel.groupby("symbol", sort=False)}
+    else:
+        groups = {symbol: panel[symbol].dropna().to_numpy(dtype="float64") for symbol in panel.columns}
+    return right_align(groups)
+
+
+def right_align(groups: dict) -> pd.DataFrame:
+    """Stack symbol -> 1-D array into a (bars x symbols) frame, newest bars in the last row."""
+    length = max((len(v) for v in groups.values()), default=0)
+    matrix = np.full((length, len(groups)), np.nan)
+    for j, values in enumerate(groups.values()):
+        if len(values):
+            matrix[length - len(values):, j] = values
+    return pd.DataFrame(matrix, columns=list(groups))
+
+
+def _ema(frame, span):
+    return frame.ewm(span=span, min_periods=span, adjust=False).mean()
+
+
+def _rsi(frame, window, padding):
+    # Same steps as ta.momentum.RSIIndicator, applied column-wise. ta turns the
+    # first (NaN) diff into 0.0, which must not happen inside the padding or
+    # the EWM would start counting before the symbol's first real bar.
+    diff = frame.diff(1)
+    up = diff.where(diff > 0, 0.0).mask(padding)
+    down = -diff.where(diff < 0, 0.0).mask(padding)
+    emaup = up.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    emadn = down.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    return pd.DataFrame(np.where(emadn == 0, 100, 100 - (100 / (1 + emaup / emadn))),
+                        index=frame.index, columns=frame.columns)
+
+
+def _leading_nan_mask(closes):
+    """True for the NaN padding above each column's first real bar."""
+    return np.cumsum(~np.isnan(closes), axis=0) == 0
+
+
+def compute_panel_indicators(closes: pd.DataFrame, indicator_rows: np.ndarray) -> dict:
+    """
+    :param closes: Right-aligned close matrix from to_close_matrix
+    :param indicator_rows: (n_symbols, 6) int array of windows in _INDICATOR_KEYS order
+    :return: Dict of (bars x symbols) arrays: rsi, macd_hist, ema_short, ema_long
+    """
+    shape = closes.shape
+    out = {name: np.full(shape, np.nan) for name in ("rsi", "macd_hist", "ema_short", "ema_long")}
+    padding = _leading_nan_mask(closes.to_numpy())
+
+    # Symbols that share windows are computed together in one column-wise pass
+    unique_rows, groups = np.unique(indicator_rows, axis=0, return_inverse=True)
+    for g, row in enumerate(unique_rows):
+        cols = np.flatnonzero(groups.ravel() == g)
+        frame = closes.iloc[:, cols]
+        rsi_window, macd_fast, macd_slow, macd_signal, ema_short, ema_long = (int(v) for v in row)
+
+        out["rsi"][:, cols] = _rsi(frame, rsi_window, padding[:, cols]).to_numpy()
+
+        macd = _ema(frame, macd_fast) - _ema(frame, macd_slow)
+        out["macd_hist"][:, cols] = (macd - _ema(macd, macd_signal)).to_numpy()
+        out["ema_short"][:, cols] = _ema(frame, ema_short).to_numpy()
+        out["ema_long"][:, cols] = _ema(frame, ema_long).to_numpy()
+
+    return out
+
+
+def _config_arrays(configs):
+    weights = np.array([[c["weights"]["rsi"], c["weights"]["macd"], c["weights"]["ema_trend"]]
+                        for c in configs], dtype="float64")
+    thresholds = np.array([[c["thresholds"]["rsi_oversold"], c["thresholds"]["rsi_overbought"],
+                            c["thresholds"]["buy_threshold"], c["thresholds"]["sell_threshold"]]
+                           for c in configs], dtype="float64")
+    indicators = np.array([[c["indicators"][k] for k in _INDICATOR_KEYS] for c in configs], dtype="int64")
+    return weights, thresholds, indicators
+
+
+def _latest_complete(values: dict):
+    """Row index of each symbol's newest bar with every indicator defined (-1 if none)."""
+    complete = ~(np.isnan(values["rsi"]) | np.isnan(values["macd_hist"])
+                 | np.isnan(values["ema_short"]) | np.isnan(values["ema_long"]))
+    n = complete.shape[0]
+    last = n - 1 - np.argmax(complete[::-1], axis=0)
+    return np.where(complete.any(axis=0), last, -1)
+
+
+def generate_signals_panel(panel: pd.DataFrame, configs: dict = None) -> dict:
+    """
+    Score every symbol in a panel with NumPy operations across symbols.
+
+    :param panel: Long frame (symbol, close, ...) or wide frame of closes per symbol
+    :param configs: Optional symbol -> config dict; defaults to load_signal_config(symbol)
+    :return: Dict of symbol -> {"action", "reason", "confidence"}, matching
+             generate_signals_detailed for each symbol
+    """
+    closes = to_close_matrix(panel)
+    symbols = list(closes.columns)
+    if not symbols:
+        return {}
+
+    configs = configs or {}
+    config_list = [configs.get(s) or load_signal_config(s) for s in symbols]
+    weights, thresholds, indicators = _config_arrays(config_list)
+
+    values = compute_panel_indicators(closes, indicators)
+    rows = _latest_complete(values)
+    has_data = rows >= 0
+    cols = np.arange(len(symbols))
+    pick = np.where(has_data, rows, 0)
+
+    rsi = values["rsi"][pick, cols]
+    macd = values["macd_hist"][pick, cols]
+    ema_s = values["ema_short"][pick, cols]
+    ema_l = values["ema_long"][pick, cols]
+
+    # Bipolar component scores: +1 bullish, -1 bearish, 0 neutral
+    rsi_dir = np.where(rsi < thresholds[:, 0], 1, np.where(rsi > thresholds[:, 1], -1, 0))
+    # (symbols without enough history are NaN here and get skipped below)
+    macd_dir = np.sign(np.nan_to_num(macd)).astype("int64")
+    ema_dir = np.sign(np.nan_to_num(ema_s - ema_l)).astype("int64")
+
+    directions = np.stack([rsi_dir, macd_dir, ema_dir], axis=1)
+    score = (directions * weights).sum(axis=1)
+    normalized = score / weights.sum(axis=1)
+    action = np.where(normalized >= thresholds[:, 2], "BUY",
+                      np.where(normalized <= thresholds[:, 3], "SELL", "HOLD"))
+
+    rsi_text = {1: "RSI oversold", -1: "RSI overbought", 0: "RSI neutral"}
+    macd_text = {1: "MACD histogram positive", -1: "MACD histogram negative", 0: "MACD histogram neutral"}
+    ema_text = {1: "EMA uptrend", -1: "EMA downtrend", 0: "EMA sideways"}
+
+    results = {}
+    for j, symbol in enumerate(symbols):
+        if not has_data[j]:
+            reason = "No valid price data" if np.isnan(closes.iloc[:, j]).all() else "Insufficient data"
+            results[symbol] = {"action": "HOLD", "reason": reason, "confidence": None}
+            continue
+
+        reason = " | ".join([
+            f"{rsi_text[rsi_dir[j]]} ({rsi[j]:.1f})",
+            macd_text[macd_dir[j]],
+            ema_text[ema_dir[j]]
+        ]) + f" (score: {normalized[j]:.2f})"
+        results[symbol] = {"action": str(action[j]), "reason": reason,
+                           "confidence": round(abs(float(normalized[j])), 3)}
+
+    return results
@@ -1,9 +1,9 @@
 import pandas as pd
 import ta.volatility
 
-import pandas as pd
-import ta.volatility
+from utils.metrics import timed
 
+@timed("assess_risk")
 def assess_risk(df: pd.DataFrame) -> dict:
     """
     Assess risk level of an asset based on volatility and drawdown.
@@ -15,27 +15,26 @@ def assess_risk(df: pd.DataFrame) -> dict:
         return {"risk_score": None, "reason": "No valid data"}
 
     try:
-        df = df.copy()
-        df['close'] = pd.to_numeric(df['close'])
+        # Frames from data.preprocessor are already float64; no copy of df is needed
+        close = df['close'] if df['close'].dtype == "float64" else pd.to_numeric(df['close'])
 
         # Calculate ATR (Average True Range)
         atr = ta.volatility.AverageTrueRange(
             high=df['high'],
             low=df['low'],
-            close=df['close'],
+            close=close,
             window=14
         )
-        df['atr'] = atr.average_true_range()
 
         # Volatility score: normalize ATR vs. current price
-        latest_atr = df['atr'].iloc[-1]
-        latest_price = df['close'].iloc[-1]
+        latest_atr = atr.average_true_range().iloc[-1]
+        latest_price = close.iloc[-1]
         volatility_score = latest_atr / latest_price if latest_price > 0 else 0
 
         # Calculate drawdown
-        df['rolling_max'] = df['close'].rolling(window=20).max()
-        df['drawdown'] = (df['rolling_max'] - df['close']) / df['rolling_max']
-        latest_drawdown = df['drawdown'].iloc[-1]
+        rolling_max = close.rolling(window=20).max()
+        drawdown = (rolling_max - close) / rolling_max
+        latest_drawdown = drawdown.iloc[-1]
 
         # Combine into risk score
         raw_risk = volatility_score + latest_drawdown
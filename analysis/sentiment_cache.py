@@ -0,0 +1,101 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def cache_key(text: str, model: str) -> str:
+    """
+    Content hash for a headline under a given model.
+
+    Headlines are NFKC-normalised, whitespace-collapsed and casefolded first so
+    trivially different copies of the same story share an entry (FinBERT-tone
+    uses an uncased vocabulary, so case never changes its output).
+    """
+    normalized = " ".join(unicodedata.normalize("NFKC", text or "").split()).casefold()
+    return hashlib.sha256(f"{model}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """
+    Two-tier cache for sentiment results.
+
+    Tier 1 is an in-memory LRU bounded to max_size entries. Tier 2 is an
+    optional sqlite file that survives restarts and is shared by every engine
+    process pointed at the same path. Hits from tier 2 are promoted into tier 1.
+    """
+
+    def __init__(self, max_size: int = 10000, path: str = None):
+        self.max_size = max(1, max_size)
+        self.path = path or None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if self.path:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS sentiment_cache (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL
+                )
+            """)
+            self._db.commit()
+
+    def get(self, text: str, model: str):
+        """Return the cached result dict, or None on a miss."""
+        key = cache_key(text, model)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(result)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT result FROM sentiment_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    result = json.loads(row[0])
+                    self._remember(key, result)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return dict(result)
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, model: str, result: dict):
+        key = cache_key(text, model)
+        with self._lock:
+            self._remember(key, dict(result))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sentiment_cache (key, result) VALUES (?, ?)",
+                    (key, json.dumps(result))
+                )
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "size": len(self._entries),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None
+            }
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
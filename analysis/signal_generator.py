@@ -2,47 +2,21 @@ import pandas as pd
 import ta
 import ta.momentum
 import ta.trend
-import json
-import os
 from datetime import datetime
 
+from analysis.strategy_config import get_strategy, thaw
+from utils.metrics import timed
+
 def load_signal_config(symbol=None):
-    """Load signal configuration - can be symbol-specific or default"""
-    # Try symbol-specific first
-    if symbol:
-        symbol_config = f"strategies/symbol_specific/{symbol}_config.json"
-        if os.path.exists(symbol_config):
-            with open(symbol_config, 'r') as f:
-                return json.load(f)
-    
-    # Fall back to default
-    default_config = "strategies/default_config.json"
-    if os.path.exists(default_config):
-        with open(default_config, 'r') as f:
-            return json.load(f)
-    
-    # Hardcoded fallback if no config files exist
-    return {
-        "weights": {
-            "rsi": 0.4,
-            "macd": 0.3,
-            "ema_trend": 0.3
-        },
-        "thresholds": {
-            "rsi_oversold": 30,
-            "rsi_overbought": 70,
-            "buy_threshold": 0.4,
-            "sell_threshold": -0.4
-        },
-        "indicators": {
-            "rsi_window": 14,
-            "ema_short": 12,
-            "ema_long": 26,
-            "macd_fast": 12,
-            "macd_slow": 26,
-            "macd_signal": 9
-        }
-    }
+    """
+    Load signal configuration - can be symbol-specific or default.
+
+    Served from the strategy_config registry, so files are parsed and
+    validated once and picked up again when they change on disk. The result
+    is a read-only mapping; use get_strategy(symbol).to_dict() for a copy
+    that can be edited.
+    """
+    return get_strategy(symbol).raw
 
 def calculate_rsi(df, window=14):
     """Calculate RSI indicator"""
@@ -59,6 +33,22 @@ def calculate_ema_pair(df, short=12, long=26):
     ema_long = ta.trend.EMAIndicator(df['close'], window=long).ema_indicator()
     return ema_short, ema_long
 
+def indicator_frame(df, indicators):
+    """
+    Close plus every indicator column, built next to the input instead of
+    on a copy of it (cleaned frames from data.preprocessor are used as is).
+    """
+    ema_short, ema_long = calculate_ema_pair(df, indicators["ema_short"], indicators["ema_long"])
+    return pd.DataFrame({
+        'close': df['close'],
+        'rsi': calculate_rsi(df, indicators["rsi_window"]),
+        'macd_hist': calculate_macd_histogram(df, indicators["macd_fast"],
+                                              indicators["macd_slow"], indicators["macd_signal"]),
+        'ema_short': ema_short,
+        'ema_long': ema_long
+    })
+
+@timed("generate_signals")
 def generate_signals(df: pd.DataFrame) -> dict:
     """
     Generate basic trading signals from technical indicators.
@@ -78,17 +68,11 @@ def generate_signals(df: pd.DataFrame) -> dict:
         thresholds = config["thresholds"]
         indicators = config["indicators"]
         
-        df = df.copy()
-        
         # Calculate indicators with configurable parameters
-        df['rsi'] = calculate_rsi(df, indicators["rsi_window"])
-        df['macd_hist'] = calculate_macd_histogram(df, indicators["macd_fast"], 
-                                                   indicators["macd_slow"], indicators["macd_signal"])
-        df['ema_short'], df['ema_long'] = calculate_ema_pair(df, indicators["ema_short"], 
-                                                            indicators["ema_long"])
+        df = indicator_frame(df, indicators)
 
         # Remove rows with NaNs
-        df.dropna(inplace=True)
+        df = df.dropna()
         if df.empty:
             return {"action": "HOLD", "reason": "Insufficient data after computing indicators", "confidence": None}
 
@@ -165,6 +149,7 @@ def generate_signals(df: pd.DataFrame) -> dict:
         return {"action": "HOLD", "reason": f"Signal error: {str(e)}", "confidence": None}
 
 # Additional function for enhanced analysis (optional - for future LLM integration)
+@timed("generate_signals_detailed")
 def generate_signals_detailed(df: pd.DataFrame, symbol: str = None) -> dict:
     """
     Enhanced version that includes detailed breakdown for LLM analysis.
@@ -178,137 +163,140 @@ def generate_signals_detailed(df: pd.DataFrame, symbol: str = None) -> dict:
         return {"action": "HOLD", "reason": "No valid price data", "confidence": None, "details": {}}
 
     try:
-        config = load_signal_config(symbol)
-        weights = config["weights"]
-        thresholds = config["thresholds"]
+        strategy = get_strategy(symbol)
+        config = strategy.raw
         indicators = config["indicators"]
         
-        df = df.copy()
-        
         # Calculate indicators
-        df['rsi'] = calculate_rsi(df, indicators["rsi_window"])
-        df['macd_hist'] = calculate_macd_histogram(df, indicators["macd_fast"], 
-                                                   indicators["macd_slow"], indicators["macd_signal"])
-        df['ema_short'], df['ema_long'] = calculate_ema_pair(df, indicators["ema_short"], 
-                                                            indicators["ema_long"])
-
-        df.dropna(inplace=True)
+        df = indicator_frame(df, indicators).dropna()
         if df.empty:
             return {"action": "HOLD", "reason": "Insufficient data", "confidence": None, "details": {}}
 
         latest = df.iloc[-1]
-        
-        # Detailed component analysis
-        components = {}
-        confidence_score = 0
-        reasons = []
-        
-        # RSI analysis
-        rsi_val = latest['rsi']
-        if rsi_val < thresholds["rsi_oversold"]:
-            rsi_contrib = weights['rsi']
-            rsi_signal = "BUY"
-            rsi_reason = f"RSI oversold ({rsi_val:.1f})"
-        elif rsi_val > thresholds["rsi_overbought"]:
-            rsi_contrib = -weights['rsi']
-            rsi_signal = "SELL"
-            rsi_reason = f"RSI overbought ({rsi_val:.1f})"
-        else:
-            rsi_contrib = 0
-            rsi_signal = "NEUTRAL"
-            rsi_reason = f"RSI neutral ({rsi_val:.1f})"
-        
-        components['rsi'] = {
-            'value': rsi_val,
-            'contribution': rsi_contrib,
-            'signal': rsi_signal,
-            'reason': rsi_reason,
-            'weight': weights['rsi']
-        }
-        confidence_score += rsi_contrib
-        reasons.append(rsi_reason)
-        
-        # MACD analysis
-        macd_val = latest['macd_hist']
-        if macd_val > 0:
-            macd_contrib = weights['macd']
-            macd_signal = "BUY"
-            macd_reason = "MACD histogram positive"
-        elif macd_val < 0:
-            macd_contrib = -weights['macd']
-            macd_signal = "SELL"
-            macd_reason = "MACD histogram negative"
-        else:
-            macd_contrib = 0
-            macd_signal = "NEUTRAL"
-            macd_reason = "MACD histogram neutral"
-        
-        components['macd'] = {
-            'value': macd_val,
-            'contribution': macd_contrib,
-            'signal': macd_signal,
-            'reason': macd_reason,
-            'weight': weights['macd']
-        }
-        confidence_score += macd_contrib
-        reasons.append(macd_reason)
-        
-        # EMA analysis
-        ema_short_val = latest['ema_short']
-        ema_long_val = latest['ema_long']
-        if ema_short_val > ema_long_val:
-            ema_contrib = weights['ema_trend']
-            ema_signal = "BUY"
-            ema_reason = "EMA uptrend"
-        elif ema_short_val < ema_long_val:
-            ema_contrib = -weights['ema_trend']
-            ema_signal = "SELL"
-            ema_reason = "EMA downtrend"
-        else:
-            ema_contrib = 0
-            ema_signal = "NEUTRAL"
-            ema_reason = "EMA sideways"
-        
-        components['ema_trend'] = {
-            'short_ema': ema_short_val,
-            'long_ema': ema_long_val,
-            'contribution': ema_contrib,
-            'signal': ema_signal,
-            'reason': ema_reason,
-            'weight': weights['ema_trend']
-        }
-        confidence_score += ema_contrib
-        reasons.append(ema_reason)
-        
-        # Final calculation
-        max_possible = sum(weights.values())
-        normalized_confidence = confidence_score / max_possible
-        confidence = round(abs(normalized_confidence), 3)
-        
-        # Determine action
-        if normalized_confidence >= thresholds["buy_threshold"]:
-            action = "BUY"
-        elif normalized_confidence <= thresholds["sell_threshold"]:
-            action = "SELL"
-        else:
-            action = "HOLD"
-        
-        return {
-            "action": action,
-            "reason": " | ".join(reasons) + f" (score: {normalized_confidence:.2f})",
-            "confidence": confidence,
-            "details": {
-                "raw_score": confidence_score,
-                "normalized_score": normalized_confidence,
-                "components": components,
-                "config_used": config,
-                "price": latest['close'],
-                "strongest_signal": max(components.items(), key=lambda x: abs(x[1]['contribution']))[0],
-                "conflicting_signals": len([c for c in components.values() if 
-                                          (c['signal'] == 'BUY' and action == 'SELL') or 
-                                          (c['signal'] == 'SELL' and action == 'BUY')])
-            }
-        }
+        return score_signal(latest['rsi'], latest['macd_hist'], latest['ema_short'],
+                            latest['ema_long'], latest['close'], config, strategy.plain)
 
     except Exception as e:
-        return {"action": "HOLD", "reason": f"Signal error: {str(e)}", "confidence": None, "details": {}}
\ No newline at end of file
+        return {"action": "HOLD", "reason": f"Signal error: {str(e)}", "confidence": None, "details": {}}
+
+
+def score_signal(rsi_val, macd_val, ema_short_val, ema_long_val, price, config, config_used=None) -> dict:
+    """
+    Score one bar's indicator values against a strategy config.
+
+    Shared by generate_signals_detailed and the streaming indicator engine so
+    both produce exactly the same action, reason, confidence and details.
+
+    :param config_used: Plain copy of config for the details (StrategyConfig.plain);
+                        thawed on every call when not given
+    """
+    weights = config["weights"]
+    thresholds = config["thresholds"]
+
+    # Detailed component analysis
+    components = {}
+    confidence_score = 0
+    reasons = []
+
+    # RSI analysis
+    if rsi_val < thresholds["rsi_oversold"]:
+        rsi_contrib = weights['rsi']
+        rsi_signal = "BUY"
+        rsi_reason = f"RSI oversold ({rsi_val:.1f})"
+    elif rsi_val > thresholds["rsi_overbought"]:
+        rsi_contrib = -weights['rsi']
+        rsi_signal = "SELL"
+        rsi_reason = f"RSI overbought ({rsi_val:.1f})"
+    else:
+        rsi_contrib = 0
+        rsi_signal = "NEUTRAL"
+        rsi_reason = f"RSI neutral ({rsi_val:.1f})"
+
+    components['rsi'] = {
+        'value': rsi_val,
+        'contribution': rsi_contrib,
+        'signal': rsi_signal,
+        'reason': rsi_reason,
+        'weight': weights['rsi']
+    }
+    confidence_score += rsi_contrib
+    reasons.append(rsi_reason)
+
+    # MACD analysis
+    if macd_val > 0:
+        macd_contrib = weights['macd']
+        macd_signal = "BUY"
+        macd_reason = "MACD histogram positive"
+    elif macd_val < 0:
+        macd_contrib = -weights['macd']
+        macd_signal = "SELL"
+        macd_reason = "MACD histogram negative"
+    else:
+        macd_contrib = 0
+        macd_signal = "NEUTRAL"
+        macd_reason = "MACD histogram neutral"
+
+    components['macd'] = {
+        'value': macd_val,
+        'contribution': macd_contrib,
+        'signal': macd_signal,
+        'reason': macd_reason,
+        'weight': weights['macd']
+    }
+    confidence_score += macd_contrib
+    reasons.append(macd_reason)
+
+    # EMA analysis
+    if ema_short_val > ema_long_val:
+        ema_contrib = weights['ema_trend']
+        ema_signal = "BUY"
+        ema_reason = "EMA uptrend"
+    elif ema_short_val < ema_long_val:
+        ema_contrib = -weights['ema_trend']
+        ema_signal = "SELL"
+        ema_reason = "EMA downtrend"
+    else:
+        ema_contrib = 0
+        ema_signal = "NEUTRAL"
+        ema_reason = "EMA sideways"
+
+    components['ema_trend'] = {
+        'short_ema': ema_short_val,
+        'long_ema': ema_long_val,
+        'contribution': ema_contrib,
+        'signal': ema_signal,
+        'reason': ema_reason,
+        'weight': weights['ema_trend']
+    }
+    confidence_score += ema_contrib
+    reasons.append(ema_reason)
+
+    # Final calculation
+    max_possible = sum(weights.values())
+    normalized_confidence = confidence_score / max_possible
+    confidence = round(abs(normalized_confidence), 3)
+
+    # Determine action
+    if normalized_confidence >= thresholds["buy_threshold"]:
+        action = "BUY"
+    elif normalized_confidence <= thresholds["sell_threshold"]:
+        action = "SELL"
+    else:
+        action = "HOLD"
+
+    return {
+        "action": action,
+        "reason": " | ".join(reasons) + f" (score: {normalized_confidence:.2f})",
+        "confidence": confidence,
+        "details": {
+            "raw_score": confidence_score,
+            "normalized_score": normalized_confidence,
+            "components": components,
+            "config_used": config_used if config_used is not None else thaw(config),  # JSON-serializable
+            "price": price,
+            "strongest_signal": max(components.items(), key=lambda x: abs(x[1]['contribution']))[0],
+            "conflicting_signals": len([c for c in components.values() if 
+                                      (c['signal'] == 'BUY' and action == 'SELL') or 
+                                      (c['signal'] == 'SELL' and action == 'BUY')])
+        }
+    }
@@ -0,0 +1,230 @@
+# MCP-Stock-Tracker/analysis/strategy_config.py
+"""
+Strategy config registry.
+
+Each strategies/*.json file is parsed and validated once, turned into an
+immutable StrategyConfig and cached. Lookups re-stat the file at most every
+CONFIG_RELOAD_SECONDS, and a changed mtime/size triggers a reload, so
+strategies can be retuned live without restarting the bot. A file that
+fails validation is reported and the last good version stays in use.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+from config import CONFIG_RELOAD_SECONDS
+
+STRATEGY_DIR = "strategies"
+DEFAULT_CONFIG_PATH = os.path.join(STRATEGY_DIR, "default_config.json")
+
+# Hardcoded fallback if no config files exist
+FALLBACK_CONFIG = {
+    "weights": {
+        "rsi": 0.4,
+        "macd": 0.3,
+        "ema_trend": 0.3
+    },
+    "thresholds": {
+        "rsi_oversold": 30,
+        "rsi_overbought": 70,
+        "buy_threshold": 0.4,
+        "sell_threshold": -0.4
+    },
+    "indicators": {
+        "rsi_window": 14,
+        "ema_short": 12,
+        "ema_long": 26,
+        "macd_fast": 12,
+        "macd_slow": 26,
+        "macd_signal": 9
+    }
+}
+
+
+@dataclass(frozen=True)
+class Weights:
+    rsi: float
+    macd: float
+    ema_trend: float
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    rsi_oversold: float
+    rsi_overbought: float
+    buy_threshold: float
+    sell_threshold: float
+
+
+@dataclass(frozen=True)
+class Indicators:
+    rsi_window: int
+    ema_short: int
+    ema_long: int
+    macd_fast: int
+    macd_slow: int
+    macd_signal: int
+
+
+@dataclass(frozen=True)
+class StrategyConfig:
+    name: str
+    version: str          # content hash; changes whenever the file's settings change
+    path: str             # None for the hardcoded fallback
+    weights: Weights
+    thresholds: Thresholds
+    indicators: Indicators
+    raw: MappingProxyType  # read-only view of the parsed JSON
+    # Plain copy of raw, thawed once for signal details; shared, so never mutate it
+    plain: dict = field(default=None, compare=False, repr=False)
+
+    @property
+    def max_possible(self) -> float:
+        return self.weights.rsi + self.weights.macd + self.weights.ema_trend
+
+    def to_dict(self) -> dict:
+        """Mutable deep copy of the parsed JSON (e.g. as a starting point for tuning)."""
+        return thaw(self.raw)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Plain, JSON-serializable deep copy of a (possibly frozen) config."""
+    if isinstance(value, (MappingProxyType, dict)):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (tuple, list)):
+        return [thaw(v) for v in value]
+    return copy.copy(value)
+
+
+def validate_config(data) -> None:
+    """Raise ValueError describing the first schema problem in a parsed config."""
+    if not isinstance(data, dict):
+        raise ValueError("config must be a JSON object")
+
+    for section, fields in (("weights", Weights), ("thresholds", Thresholds), ("indicators", Indicators)):
+        block = data.get(section)
+        if not isinstance(block, dict):
+            raise ValueError(f"missing '{section}' block")
+        for name in fields.__dataclass_fields__:
+            value = block.get(name)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"{section}.{name} must be a number, got {value!r}")
+
+    weights = data["weights"]
+    if any(v < 0 for v in weights.values() if isinstance(v, (int, float))):
+        raise ValueError("weights must be non-negative")
+    if weights["rsi"] + weights["macd"] + weights["ema_trend"] <= 0:
+        raise ValueError("weights must sum to more than zero")
+
+    thresholds = data["thresholds"]
+    if not thresholds["rsi_oversold"] < thresholds["rsi_overbought"]:
+        raise ValueError("thresholds.rsi_oversold must be below rsi_overbought")
+    if not thresholds["sell_threshold"] < thresholds["buy_threshold"]:
+        raise ValueError("thresholds.sell_threshold must be below buy_threshold")
+
+    for name, value in data["indicators"].items():
+        if name in Indicators.__dataclass_fields__ and (int(value) != value or value < 1):
+            raise ValueError(f"indicators.{name} must be a positive integer, got {value!r}")
+
+
+def compile_config(data: dict, path: str = None) -> StrategyConfig:
+    """Validate a parsed config and freeze it into a StrategyConfig."""
+    validate_config(data)
+    canonical = json.dumps(data, sort_keys=True, default=str)
+    return StrategyConfig(
+        name=data.get("strategy_name", "default"),
+        version=hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12],
+        path=path,
+        weights=Weights(**{k: float(data["weights"][k]) for k in Weights.__dataclass_fields__}),
+        thresholds=Thresholds(**{k: float(data["thresholds"][k]) for k in Thresholds.__dataclass_fields__}),
+        indicators=Indicators(**{k: int(data["indicators"][k]) for k in Indicators.__dataclass_fields__}),
+        raw=_freeze(data),
+        plain=thaw(data)
+    )
+
+
+def symbol_config_path(symbol: str) -> str:
+    return os.path.join(STRATEGY_DIR, "symbol_specific", f"{symbol}_config.json")
+
+
+class _Entry:
+    __slots__ = ("signature", "config", "checked_at")
+
+    def __init__(self):
+        self.signature = None
+        self.config = None
+        self.checked_at = None
+
+
+_entries = {}
+_lock = threading.Lock()
+_fallback = compile_config(FALLBACK_CONFIG)
+
+
+def get_strategy(symbol: str = None) -> StrategyConfig:
+    """
+    Compiled config for a symbol: its symbol-specific file if present and
+    valid, else strategies/default_config.json, else the hardcoded fallback.
+    """
+    if symbol:
+        config = _lookup(symbol_config_path(symbol))
+        if config is not None:
+            return config
+
+    config = _lookup(DEFAULT_CONFIG_PATH)
+    return config if config is not None else _fallback
+
+
+def reload_all() -> None:
+    """Force every known file to be re-checked on its next lookup."""
+    with _lock:
+        for entry in _entries.values():
+            entry.checked_at = None
+
+
+def _lookup(path):
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.setdefault(path, _Entry())
+        if entry.checked_at is not None and now - entry.checked_at < CONFIG_RELOAD_SECONDS:
+            return entry.config
+        entry.checked_at = now
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            entry.signature = entry.config = None
+            return None
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == entry.signature:
+            return entry.config
+
+        try:
+            with open(path, 'r') as f:
+                config = compile_config(json.load(f), path)
+        except (OSError, ValueError) as e:
+            # Keep serving the last good version of this file (if any)
+            print(f"[strategy_config] Rejected {path}: {e}")
+            entry.signature = signature
+            return entry.config
+
+        if entry.config is not None and entry.config.version != config.version:
+            print(f"[strategy_config] Reloaded {path} ({config.name} {config.version})")
+        entry.signature = signature
+        entry.config = config
+        return config
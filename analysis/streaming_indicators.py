@@ -0,0 +1,309 @@
+# MCP-Stock-Tracker/analysis/streaming_indicators.py
+"""
+Incremental RSI / MACD / EMA engine.
+
+Every indicator here is an exponentially weighted mean, so each new bar can
+be folded into a few floats of running state instead of recomputing the
+whole history through `ta`. The recurrences replicate pandas'
+`ewm(adjust=False)` step for step (including its NaN handling), so for the
+same close series the values are bit-identical to calculate_rsi,
+calculate_macd_histogram and calculate_ema_pair.
+
+yfinance always returns the still-forming bar last, and its close changes
+every minute. Streams therefore commit every bar except the newest and
+evaluate the newest tentatively on top of the committed state.
+
+At most STREAM_CACHE_SIZE streams are kept; the least recently used one
+(a symbol no longer tracked, or an old indicator config) is dropped first
+and simply rebuilt from the window if it is needed again.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from analysis.signal_generator import score_signal
+from analysis.strategy_config import get_strategy
+from utils.metrics import timed
+from config import STREAM_CACHE_SIZE
+
+NAN = float("nan")
+
+
+class _Ewm:
+    """pandas ewm(adjust=False).mean() as an O(1) update."""
+
+    __slots__ = ("alpha", "decay", "min_periods")
+
+    def __init__(self, com, min_periods):
+        self.alpha = 1.0 / (1.0 + com)
+        self.decay = 1.0 - self.alpha
+        self.min_periods = max(min_periods, 1)
+
+    @classmethod
+    def from_span(cls, span):
+        return cls((span - 1) / 2.0, span)
+
+    @classmethod
+    def from_alpha(cls, alpha, min_periods):
+        return cls((1.0 - alpha) / alpha, min_periods)
+
+    def step(self, state, cur):
+        """Return the state after observing cur. state is (weighted, old_wt, nobs) or None."""
+        is_obs = cur == cur
+        if state is None:
+            return (cur, 1.0, int(is_obs))
+
+        weighted, old_wt, nobs = state
+        nobs += is_obs
+        if weighted == weighted:
+            old_wt *= self.decay
+            if is_obs:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + self.alpha * cur) / (old_wt + self.alpha)
+                old_wt = 1.0
+        elif is_obs:
+            weighted = cur
+        return (weighted, old_wt, nobs)
+
+    def value(self, state):
+        if state is None or state[2] < self.min_periods:
+            return NAN
+        return state[0]
+
+
+class IndicatorState:
+    """
+    Running RSI, MACD histogram and EMA pair for one close series.
+
+    The state is an immutable tuple, so peek() can evaluate a tentative bar
+    without disturbing what update() has committed.
+    """
+
+    def __init__(self, rsi_window=14, macd_fast=12, macd_slow=26, macd_signal=9,
+                 ema_short=12, ema_long=26):
+        self._rsi = _Ewm.from_alpha(1 / rsi_window, rsi_window)
+        self._macd_fast = _Ewm.from_span(macd_fast)
+        self._macd_slow = _Ewm.from_span(macd_slow)
+        self._macd_signal = _Ewm.from_span(macd_signal)
+        self._ema_short = _Ewm.from_span(ema_short)
+        self._ema_long = _Ewm.from_span(ema_long)
+        self.reset()
+
+    @classmethod
+    def from_config(cls, indicators):
+        return cls(
+            rsi_window=indicators["rsi_window"],
+            macd_fast=indicators["macd_fast"],
+            macd_slow=indicators["macd_slow"],
+            macd_signal=indicators["macd_signal"],
+            ema_short=indicators["ema_short"],
+            ema_long=indicators["ema_long"]
+        )
+
+    def reset(self):
+        # (prev_close, up, down, fast, slow, signal, ema_short, ema_long)
+        self._state = (None,) * 8
+        self.bars = 0
+
+    def update(self, close: float) -> dict:
+        """Commit one bar and return its indicator values."""
+        self._state, values = self._advance(self._state, float(close))
+        self.bars += 1
+        return values
+
+    def peek(self, close: float) -> dict:
+        """Indicator values if close were the next bar, without committing it."""
+        return self._advance(self._state, float(close))[1]
+
+    def _advance(self, state, close):
+        prev_close, up, down, fast, slow, signal, ema_s, ema_l = state
+
+        # ta: diff.where(diff > 0, 0.0) / -diff.where(diff < 0, 0.0); the first diff is NaN
+        diff = close - prev_close if prev_close is not None else NAN
+        up = self._rsi.step(up, diff if diff > 0 else 0.0)
+        down = self._rsi.step(down, -(diff if diff < 0 else 0.0))
+        emaup, emadn = self._rsi.value(up), self._rsi.value(down)
+        rsi = 100.0 if emadn == 0 else 100 - (100 / (1 + emaup / emadn))
+
+        fast = self._macd_fast.step(fast, close)
+        slow = self._macd_slow.step(slow, close)
+        macd = self._macd_fast.value(fast) - self._macd_slow.value(slow)
+        signal = self._macd_signal.step(signal, macd)
+        macd_hist = macd - self._macd_signal.value(signal)
+
+        ema_s = self._ema_short.step(ema_s, close)
+        ema_l = self._ema_long.step(ema_l, close)
+
+        values = {
+            "close": close,
+            "rsi": rsi,
+            "macd_hist": macd_hist,
+            "ema_short": self._ema_short.value(ema_s),
+            "ema_long": self._ema_long.value(ema_l)
+        }
+        return (close, up, down, fast, slow, signal, ema_s, ema_l), values
+
+
+def _complete(values):
+    return values is not None and not any(
+        math.isnan(values[k]) for k in ("rsi", "macd_hist", "ema_short", "ema_long")
+    )
+
+
+class IndicatorStream:
+    """
+    Keeps an IndicatorState in step with a growing bar series.
+
+    sync() is handed the full recent window every cycle but only folds in
+    bars it has not committed yet, so per-tick work is O(new bars). The
+    indicators are seeded at the window's first bar, as in
+    generate_signals_detailed. So the state is rebuilt from the window when
+    that first bar changes (the window slid), when the window no longer holds
+    the last committed bar, or when that bar's close was revised.
+    """
+
+    def __init__(self, indicators):
+        self.state = IndicatorState.from_config(indicators)
+        self.lock = threading.Lock()
+        self._first_ts = None
+        self._last_ts = None
+        self._last_close = None
+        self._last_complete = None
+
+    def sync(self, timestamps, closes):
+        """
+        :param timestamps: Sorted bar timestamps (any comparable values, e.g. int64 ns)
+        :param closes: Close prices aligned with timestamps
+        :return: Latest bar's indicator values, or None if there is not enough history
+        """
+        n = len(closes)
+        if n == 0:
+            return None
+
+        start = self._resume_index(timestamps, closes)
+        if start is None or timestamps[0] != self._first_ts:
+            self.state.reset()
+            self._first_ts = timestamps[0]
+            self._last_ts = self._last_close = self._last_complete = None
+            start = 0
+
+        # Commit everything but the newest bar
+        for i in range(start, n - 1):
+            values = self.state.update(closes[i])
+            if _complete(values):
+                self._last_complete = values
+        if n > 1:
+            self._last_ts = timestamps[n - 2]
+            self._last_close = float(closes[n - 2])
+
+        # generate_signals_detailed drops NaN rows, i.e. falls back to the last complete bar
+        latest = self.state.peek(closes[n - 1])
+        return latest if _complete(latest) else self._last_complete
+
+    def _resume_index(self, timestamps, closes):
+        return resume_index(timestamps, closes, self._last_ts, self._last_close)
+
+
+def resume_index(timestamps, closes, last_ts, last_close):
+    """
+    Position of the first uncommitted bar in a new window, or None if the
+    stream has to be rebuilt (nothing committed yet, the last committed bar
+    fell out of the window or is now the newest bar, or its close was revised).
+    """
+    if last_ts is None:
+        return None
+    pos = int(np.searchsorted(timestamps, last_ts))
+    if pos >= len(timestamps) - 1 or timestamps[pos] != last_ts:
+        return None
+    if float(closes[pos]) != last_close:
+        return None
+    return pos + 1
+
+
+_streams = OrderedDict()
+_streams_lock = threading.Lock()
+
+
+def get_indicator_stream(symbol, indicators) -> IndicatorStream:
+    """Shared stream per (symbol, indicator windows), LRU-bounded by STREAM_CACHE_SIZE."""
+    key = (symbol, tuple(sorted(indicators.items())))
+    with _streams_lock:
+        stream = _streams.get(key)
+        if stream is None:
+            stream = _streams[key] = IndicatorStream(indicators)
+            while len(_streams) > max(STREAM_CACHE_SIZE, 1):
+                _streams.popitem(last=False)
+        else:
+            _streams.move_to_end(key)
+        return stream
+
+
+def bar_timestamps(df: pd.DataFrame):
+    """int64 nanosecond timestamps for a collector frame (falls back to the row index)."""
+    for name in ("Datetime", "Date", "timestamp"):
+        if name in df.columns:
+            col = df[name]
+            if getattr(col.dt, "tz", None) is not None:
+                col = col.dt.tz_convert("UTC")
+            return col.to_numpy(dtype="datetime64[ns]").view("int64")
+    return df.index.to_numpy()
+
+
+@timed("generate_signals_streaming")
+def generate_signals_streaming(df: pd.DataFrame, symbol: str = None) -> dict:
+    """
+    Drop-in replacement for generate_signals_detailed that updates running
+    indicator state per new bar instead of recomputing the whole history.
+
+    Indicators are seeded at the window's first bar, so results are
+    identical to generate_signals_detailed on the same frame. When that bar
+    changes (once per session for get_bars' 7d window) the stream replays
+    the window.
+
+    :param df: DataFrame from collector.py / bar_store.py
+    :param symbol: Symbol for symbol-specific configs and stream identity
+    :return: Same structure as generate_signals_detailed
+    """
+    if df.empty or 'close' not in df.columns:
+        return {"action": "HOLD", "reason": "No valid price data", "confidence": None, "details": {}}
+    return _signal_from_arrays(lambda: (bar_timestamps(df), df['close'].to_numpy(dtype="float64")), symbol)
+
+
+@timed("generate_signals_streaming")
+def generate_signals_from_buffer(buffer, symbol: str = None, since: int = None) -> dict:
+    """
+    generate_signals_streaming fed straight from a data.bar_buffer.BarBuffer:
+    the stream reads zero-copy views of the ring buffer, no DataFrame involved.
+
+    :param since: int64 ns UTC timestamp of the scoring window's first bar;
+                  older buffered bars are left out, as they are from the 7d frame
+    """
+    with buffer.lock:
+        start = buffer.index_of(since) if since is not None else 0
+        if start >= len(buffer):
+            return {"action": "HOLD", "reason": "No valid price data", "confidence": None, "details": {}}
+        return _signal_from_arrays(lambda: (buffer.timestamps()[start:], buffer.close()[start:]), symbol)
+
+
+def _signal_from_arrays(arrays, symbol):
+    """Shared tail of the streaming entry points; `arrays` returns (timestamps, closes)."""
+    try:
+        strategy = get_strategy(symbol)
+        config = strategy.raw
+        stream = get_indicator_stream(symbol, config["indicators"])
+
+        with stream.lock:
+            latest = stream.sync(*arrays())
+
+        if latest is None:
+            return {"action": "HOLD", "reason": "Insufficient data", "confidence": None, "details": {}}
+
+        return score_signal(latest['rsi'], latest['macd_hist'], latest['ema_short'],
+                            latest['ema_long'], latest['close'], config, strategy.plain)
+
+    except Exception as e:
+        return {"action": "HOLD", "reason": f"Signal error: {str(e)}", "confidence": None, "details": {}}
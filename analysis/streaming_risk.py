@@ -0,0 +1,295 @@
+# MCP-Stock-Tracker/analysis/streaming_risk.py
+"""
+Incremental risk assessment.
+
+assess_risk only ever reports the newest bar's ATR(14) and 20-bar drawdown,
+but recomputes both over the whole history every cycle. Here each symbol
+keeps a Wilder ATR accumulator and a monotonic deque of recent closes, so a
+new bar costs O(1) amortised. ATR is seeded exactly like
+ta.volatility.AverageTrueRange (mean of the first `window` true ranges) and
+the final score goes through the same float64 arithmetic and rounding as
+assess_risk, so risk_score and reason are identical.
+
+As with the indicator streams, the newest (still forming) bar is evaluated
+tentatively and only earlier bars are committed.
+
+Semantics: ATR is seeded at the first bar of the window being scored, as
+assess_risk does, and never carried past it. With a 7-day window the seed
+still weighs noticeably on the newest ATR, so carrying it forward would move
+risk_score against RISK_THRESHOLD. When the window's first bar changes, the
+stream is rebuilt from the window. get_bars trims to whole sessions, so
+that happens once per session and replays about one window (~50 bars);
+every other bar is an O(1) update. The indicator streams follow the same
+rule. The bar buffer is read from the scoring window's first bar (see
+generate_signals_from_buffer), never as a whole ring, whose oldest bar would
+change with every new bar.
+
+assess_risk_panel scores many symbols at once: true ranges, seeds and the
+drawdown window are array operations over a right-aligned matrix, and the
+Wilder recurrence advances every symbol together one row at a time.
+"""
+
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+from analysis.panel_signals import right_align
+from analysis.streaming_indicators import bar_timestamps, resume_index
+from utils.metrics import timed
+from config import STREAM_CACHE_SIZE
+
+NAN = float("nan")
+
+
+def score_risk(atr, close, rolling_max) -> dict:
+    """assess_risk's final step for the newest bar's ATR, close and rolling max."""
+    # np.float64 on purpose: round() on it uses NumPy's rounding, as assess_risk does
+    latest_atr, latest_price, rolling_max = np.float64(atr), np.float64(close), np.float64(rolling_max)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volatility_score = latest_atr / latest_price if latest_price > 0 else 0
+        latest_drawdown = (rolling_max - latest_price) / rolling_max
+
+    raw_risk = volatility_score + latest_drawdown
+    return {
+        "risk_score": min(round(raw_risk, 2), 1.0),
+        "reason": f"ATR: {round(volatility_score, 3)}, Drawdown: {round(latest_drawdown, 3)}"
+    }
+
+
+def _short_history():
+    # Fewer bars than the ATR window: assess_risk fails inside ta here
+    return {"risk_score": None, "reason": "Insufficient data"}
+
+
+class RiskState:
+    """Running Wilder ATR and rolling max of close for one symbol."""
+
+    def __init__(self, atr_window=14, drawdown_window=20):
+        self.atr_window = atr_window
+        self.drawdown_window = drawdown_window
+        self.reset()
+
+    def reset(self):
+        self.bars = 0
+        self._prev_close = None
+        self._seed = []          # true ranges until the ATR seed bar
+        self._atr = 0.0
+        self._maxes = deque()    # (bar index, close), closes strictly decreasing
+
+    def update(self, high: float, low: float, close: float) -> dict:
+        """Commit one bar and return its values."""
+        values, tr = self._evaluate(high, low, close)
+        i = self.bars
+        if i < self.atr_window:
+            self._seed.append(tr)
+        if i >= self.atr_window - 1:
+            self._atr = values["atr"]
+        if i == self.atr_window - 1:
+            self._seed = None
+
+        close = values["close"]
+        while self._maxes and self._maxes[-1][1] <= close:
+            self._maxes.pop()
+        self._maxes.append((i, close))
+        # Keep only what the next bar's window (its w-1 predecessors) can see
+        while self._maxes[0][0] <= i + 1 - self.drawdown_window:
+            self._maxes.popleft()
+
+        self._prev_close = close
+        self.bars += 1
+        return values
+
+    def peek(self, high: float, low: float, close: float) -> dict:
+        """Values if this were the next bar, without committing it."""
+        return self._evaluate(high, low, close)[0]
+
+    def _evaluate(self, high, low, close):
+        high, low, close = float(high), float(low), float(close)
+        i = self.bars
+
+        # ta: max(high - low, |high - prev_close|, |low - prev_close|), NaNs skipped
+        tr = high - low
+        if self._prev_close is not None:
+            tr = np.fmax(tr, np.fmax(abs(high - self._prev_close), abs(low - self._prev_close)))
+
+        w = self.atr_window
+        if i < w - 1:
+            atr = 0.0
+        elif i == w - 1:
+            atr = np.array(self._seed + [tr]).mean()
+        else:
+            atr = (self._atr * (w - 1) + tr) / float(w)
+
+        if i + 1 >= self.drawdown_window:
+            rolling_max = max(self._maxes[0][1], close) if self._maxes else close
+        else:
+            rolling_max = NAN
+
+        return {"close": close, "atr": float(atr), "rolling_max": rolling_max}, float(tr)
+
+
+class RiskStream:
+    """Keeps a RiskState in step with a growing bar window (see IndicatorStream)."""
+
+    def __init__(self, atr_window=14, drawdown_window=20):
+        self.state = RiskState(atr_window, drawdown_window)
+        self.lock = threading.Lock()
+        self._first_ts = None
+        self._last_ts = None
+        self._last_close = None
+
+    def sync(self, timestamps, highs, lows, closes) -> dict:
+        """
+        :return: Newest bar's {"close", "atr", "rolling_max"}, or None for an empty window
+        """
+        n = len(closes)
+        if n == 0:
+            return None
+
+        # ATR is seeded at the window's first bar, so a slid window starts over
+        start = resume_index(timestamps, closes, self._last_ts, self._last_close)
+        if start is None or timestamps[0] != self._first_ts:
+            self.state.reset()
+            self._first_ts = timestamps[0]
+            self._last_ts = self._last_close = None
+            start = 0
+
+        for i in range(start, n - 1):
+            self.state.update(highs[i], lows[i], closes[i])
+        if n > 1:
+            self._last_ts = timestamps[n - 2]
+            self._last_close = float(closes[n - 2])
+
+        return self.state.peek(highs[n - 1], lows[n - 1], closes[n - 1])
+
+
+_streams = OrderedDict()
+_streams_lock = threading.Lock()
+
+
+def get_risk_stream(symbol, atr_window=14, drawdown_window=20) -> RiskStream:
+    """Shared stream per (symbol, windows), LRU-bounded by STREAM_CACHE_SIZE like the indicator streams."""
+    key = (symbol, atr_window, drawdown_window)
+    with _streams_lock:
+        stream = _streams.get(key)
+        if stream is None:
+            stream = _streams[key] = RiskStream(atr_window, drawdown_window)
+            while len(_streams) > max(STREAM_CACHE_SIZE, 1):
+                _streams.popitem(last=False)
+        else:
+            _streams.move_to_end(key)
+        return stream
+
+
+@timed("assess_risk_streaming")
+def assess_risk_streaming(df: pd.DataFrame, symbol: str = None) -> dict:
+    """
+    Drop-in replacement for assess_risk that folds in only new bars.
+
+    ATR is seeded at the window's first bar, as in assess_risk, so the
+    stream is rebuilt from the current window whenever that bar changes
+    (once per session for get_bars' 7d window).
+
+    :param df: Price history DataFrame from collector.py / bar_store.py
+    :param symbol: Stream identity (one running state per symbol)
+    :return: Same structure as assess_risk
+    """
+    if df.empty or 'close' not in df.columns:
+        return {"risk_score": None, "reason": "No valid data"}
+    return _risk_from_arrays(len(df), lambda: (
+        bar_timestamps(df),
+        df['high'].to_numpy(dtype="float64"),
+        df['low'].to_numpy(dtype="float64"),
+        pd.to_numeric(df['close']).to_numpy(dtype="float64")
+    ), symbol)
+
+
+@timed("assess_risk_streaming")
+def assess_risk_from_buffer(buffer, symbol: str = None, since: int = None) -> dict:
+    """
+    assess_risk_streaming fed from zero-copy views of a data.bar_buffer.BarBuffer.
+
+    :param since: int64 ns UTC timestamp of the scoring window's first bar (see generate_signals_from_buffer)
+    """
+    with buffer.lock:
+        start = buffer.index_of(since) if since is not None else 0
+        if start >= len(buffer):
+            return {"risk_score": None, "reason": "No valid data"}
+        return _risk_from_arrays(len(buffer) - start, lambda: (
+            buffer.timestamps()[start:], buffer.high()[start:], buffer.low()[start:], buffer.close()[start:]
+        ), symbol)
+
+
+def _risk_from_arrays(bars, arrays, symbol):
+    """Shared tail of the streaming entry points; `arrays` returns (timestamps, highs, lows, closes)."""
+    try:
+        stream = get_risk_stream(symbol)
+        if bars < stream.state.atr_window:
+            return _short_history()
+
+        with stream.lock:
+            latest = stream.sync(*arrays())
+        return score_risk(latest["atr"], latest["close"], latest["rolling_max"])
+
+    except Exception as e:
+        return {"risk_score": None, "reason": f"Risk assessment error: {str(e)}"}
+
+
+@timed("assess_risk_panel")
+def assess_risk_panel(frames, atr_window=14, drawdown_window=20) -> dict:
+    """
+    Score every symbol of a panel in one vectorized pass.
+
+    :param frames: Long frame with symbol/high/low/close columns, or symbol -> collector frame
+    :return: Dict of symbol -> assess_risk result
+    """
+    if isinstance(frames, pd.DataFrame):
+        frames = dict(tuple(frames.groupby("symbol", sort=False)))
+
+    results = {}
+    usable = {}
+    for symbol, df in frames.items():
+        if df.empty or 'close' not in df.columns:
+            results[symbol] = {"risk_score": None, "reason": "No valid data"}
+        elif len(df) < atr_window:
+            results[symbol] = _short_history()
+        else:
+            usable[symbol] = df
+    if not usable:
+        return results
+
+    try:
+        high = right_align({s: df['high'].to_numpy(dtype="float64") for s, df in usable.items()}).to_numpy()
+        low = right_align({s: df['low'].to_numpy(dtype="float64") for s, df in usable.items()}).to_numpy()
+        close = right_align({s: pd.to_numeric(df['close']).to_numpy(dtype="float64")
+                             for s, df in usable.items()}).to_numpy()
+    except Exception as e:
+        results.update({s: {"risk_score": None, "reason": f"Risk assessment error: {str(e)}"} for s in usable})
+        return results
+
+    rows, cols = close.shape
+    lengths = np.array([len(df) for df in usable.values()])
+    first = rows - lengths
+
+    prev_close = np.vstack([np.full((1, cols), np.nan), close[:-1]])
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+    # Seed: mean of each symbol's first atr_window true ranges
+    seed_rows = first + atr_window - 1
+    window_idx = first[:, None] + np.arange(atr_window)
+    atr = tr[window_idx, np.arange(cols)[:, None]].mean(axis=1)
+
+    # Wilder recurrence, all symbols advancing together
+    for t in range(int(seed_rows.min()) + 1, rows):
+        atr = np.where(t > seed_rows, (atr * (atr_window - 1) + tr[t]) / float(atr_window), atr)
+
+    if rows >= drawdown_window:
+        rolling_max = close[-drawdown_window:].max(axis=0)
+    else:
+        rolling_max = np.full(cols, np.nan)
+
+    for j, symbol in enumerate(usable):
+        results[symbol] = score_risk(atr[j], close[-1, j], rolling_max[j])
+    return results
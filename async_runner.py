@@ -0,0 +1,178 @@
+# MCP-Stock-Tracker/async_runner.py
+"""
+asyncio runner for the per-symbol pipeline (python main.py --async).
+
+run_bot does price fetch, news fetch, FinBERT and the DB write one after
+another. Here, within a cycle:
+
+- the shard's bulk price download and every symbol's NewsAPI request start
+  at once, so a symbol waits for the slower of the two, not their sum;
+- a symbol whose newest bar, headlines and strategy match its last
+  published cycle is skipped before any scoring (see utils/cycle_state.py);
+- signal/risk scoring runs on the default thread pool and FinBERT on a
+  dedicated single-thread executor, keeping the event loop free;
+- DB writes go through the write pipeline, whose writer thread flushes
+  while later symbols are still being fetched and scored.
+
+Every blocking call carries its own timeout (requests, yfinance, psycopg2)
+and is also wrapped in asyncio.wait_for, and each symbol as a whole is
+capped at SYMBOL_TIMEOUT; on expiry its outstanding tasks are cancelled and
+the cycle moves on. A worker thread that is already blocked cannot be
+interrupted, but its result is discarded and its own timeout ends it.
+
+Cycles start every CYCLE_SECONDS on the scheduler's bar-aligned grid
+(utils/scheduler.py). A cycle that overruns makes the runner skip the
+missed starts rather than run them back to back.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from analysis.nlp_insights import analyze_sentiment_batch, get_cache_stats
+from config import (
+    BAR_ANCHOR_SECONDS,
+    CYCLE_SECONDS,
+    ENGINE_WORKERS,
+    INFERENCE_TIMEOUT,
+    NEWS_FETCH_TIMEOUT,
+    PRICE_FETCH_TIMEOUT,
+    PRICE_FETCH_CHUNK,
+    PRICE_SPREAD_SECONDS,
+    SCHEDULE_SETTLE_SECONDS,
+    SHARD_COUNT,
+    SHARD_INDEX,
+    SYMBOL_TIMEOUT
+)
+from data.bar_store import get_bars_many
+from db.write_pipeline import get_pipeline
+from utils.cycle_state import cycle_fingerprint, record_cycle, should_skip_cycle
+from utils.metrics import timed
+from utils.scheduler import ScheduledTask
+from main import (
+    fetch_headlines,
+    get_active_symbols,
+    in_shard,
+    publish_signal,
+    score_prices
+)
+
+
+async def _blocking(func, *args, timeout=None, executor=None):
+    """Run a blocking call off the event loop, giving up after timeout seconds."""
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(loop.run_in_executor(executor, func, *args), timeout)
+
+
+class AsyncRunner:
+    """
+    One engine's symbols, processed concurrently each cycle.
+
+    :param symbols: Explicit symbol list; defaults to the active rows in tracked_symbols
+    :param concurrency: Max symbols in flight at once
+    """
+
+    def __init__(self, symbols=None, concurrency=ENGINE_WORKERS,
+                 shard_index=SHARD_INDEX, shard_count=SHARD_COUNT):
+        self.symbols = symbols
+        self.concurrency = max(1, concurrency)
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        # FinBERT serialises inference anyway; one thread keeps it off the I/O threads
+        self.inference_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcp-inference")
+
+    async def run_forever(self, interval=CYCLE_SECONDS):
+        # Same bar-aligned, phase-offset grid as the threaded scheduler
+        grid = ScheduledTask("async-cycle", None, interval, anchor=BAR_ANCHOR_SECONDS,
+                             settle=SCHEDULE_SETTLE_SECONDS, spread=min(PRICE_SPREAD_SECONDS, interval),
+                             key=f"shard-{self.shard_index}")
+        next_start = grid.next_after(time.time())
+        while True:
+            await asyncio.sleep(max(0.0, next_start - time.time()))
+            await self.run_cycle()
+
+            now = time.time()
+            following = grid.next_after(now)
+            missed = int((following - next_start) // interval) - 1
+            if missed > 0:
+                print(f"[ENGINE] Cycle overran by {now - next_start - interval:.1f}s, "
+                      f"skipping {missed} start(s)", flush=True)
+            next_start = following
+
+    async def run_cycle(self):
+        symbols = self.symbols
+        if symbols is None:
+            try:
+                symbols = await _blocking(get_active_symbols, timeout=PRICE_FETCH_TIMEOUT)
+            except Exception as e:
+                print(f"[ENGINE] Could not load tracked symbols: {e}", flush=True)
+                return
+
+        owned = [s for s in symbols if in_shard(s, self.shard_index, self.shard_count)]
+        print(f"[ENGINE] Async cycle start: {len(owned)} symbols "
+              f"(shard {self.shard_index}/{self.shard_count})", flush=True)
+        started = time.monotonic()
+
+        # One bulk download for the shard, shared by every symbol task
+        chunks = max(1, -(-len(owned) // max(1, PRICE_FETCH_CHUNK)))
+        bars = asyncio.ensure_future(
+            _blocking(get_bars_many, owned, "7d", "1h", timeout=PRICE_FETCH_TIMEOUT * 2 * chunks)
+        )
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def guarded(symbol):
+            async with slots:
+                try:
+                    await asyncio.wait_for(self.run_symbol(symbol, bars), SYMBOL_TIMEOUT)
+                except asyncio.TimeoutError:
+                    print(f"[{symbol}] Cycle timed out after {SYMBOL_TIMEOUT:.0f}s", flush=True)
+                except Exception as e:
+                    print(f"[{symbol}] Cycle failed: {e}", flush=True)
+
+        with timed("async_cycle"):
+            try:
+                await asyncio.gather(*(guarded(s) for s in owned))
+            finally:
+                bars.cancel()
+
+        print(f"[ENGINE] Async cycle complete in {time.monotonic() - started:.1f}s "
+              f"(sentiment cache: {get_cache_stats()}, writes: {get_pipeline().stats()})", flush=True)
+
+    async def run_symbol(self, symbol, bars):
+        print(f"[{datetime.now()}] Running analysis for {symbol}")
+        news = asyncio.ensure_future(_blocking(fetch_headlines, symbol, timeout=NEWS_FETCH_TIMEOUT * 2))
+        try:
+            try:
+                frames, failures = await asyncio.shield(bars)
+            except asyncio.TimeoutError:
+                print(f"[{symbol}] Price fetch timed out")
+                return
+            df = frames.get(symbol)
+            if df is None or df.empty:
+                print(f"[{symbol}] No data to analyze.")
+                return
+
+            try:
+                headlines = await news
+            except asyncio.TimeoutError:
+                print(f"[{symbol}] News fetch timed out")
+                headlines = [f"No recent news found for {symbol}."]
+
+            fingerprint = cycle_fingerprint(symbol, df, headlines)
+            if should_skip_cycle(symbol, fingerprint):
+                print(f"[{symbol}] Inputs unchanged since the last published cycle; skipped")
+                return
+
+            signal, risk = await _blocking(score_prices, symbol, df)
+            sentiments = await _blocking(analyze_sentiment_batch, headlines,
+                                         timeout=INFERENCE_TIMEOUT, executor=self.inference_pool)
+
+            # submit() only blocks when the write queue is full (backpressure)
+            await _blocking(publish_signal, symbol, df, signal, risk, headlines, sentiments)
+            record_cycle(symbol, fingerprint)
+        finally:
+            news.cancel()
+
+    def close(self):
+        self.inference_pool.shutdown(wait=False, cancel_futures=True)
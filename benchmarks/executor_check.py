@@ -0,0 +1,45 @@
+# MCP-Stock-Tracker/benchmarks/executor_check.py
+"""
+Check the paper executor's order sizing.
+
+Opens positions until the cash runs out, with fees and slippage, and checks
+that cash never goes negative and that a BUY never opens a short. The first
+case is the one that used to fail: a fee charged after sizing left cash at
+-1.0, and the next BUY came out as a SELL. Exits non-zero on the first failure.
+
+Usage:
+    python -m benchmarks.executor_check
+"""
+
+import sys
+
+from trades.executor import PaperExecutor
+
+CASES = [
+    dict(cash=1000, order_notional=1000, slippage_bps=0, fee_bps=0, fee_min=1.0),
+    dict(cash=1000, order_notional=400, slippage_bps=5, fee_bps=10, fee_min=1.0),
+    dict(cash=250, order_notional=1000, slippage_bps=20, fee_bps=50, fee_min=0.0),
+]
+
+
+def check(case, prices=(100.0, 50.0, 33.3, 7.5, 1.2, 0.4)):
+    executor = PaperExecutor(snapshot_path="", **case)
+    for i, price in enumerate(prices):
+        fill = executor.on_signal(f"S{i}", "BUY", price)
+        if executor.cash < 0:
+            return f"{case}: cash {executor.cash:.4f} after BUY S{i} @ {price}"
+        if fill is not None and (fill["side"] != "BUY" or fill["position"] <= 0):
+            return f"{case}: BUY S{i} @ {price} filled as {fill!r}"
+    return None
+
+
+def main():
+    failures = [error for error in map(check, CASES) if error]
+    for error in failures:
+        print(f"[executor_check] {error}")
+    print(f"[executor_check] {len(CASES) - len(failures)}/{len(CASES)} cases OK")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
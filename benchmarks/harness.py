@@ -0,0 +1,334 @@
+# MCP-Stock-Tracker/benchmarks/harness.py
+"""
+Benchmark harness for the analysis hot paths.
+
+`run` times each case on deterministic synthetic data and writes a JSON
+report. `compare` diffs two reports and exits non-zero when a case got
+slower than the threshold allows.
+
+Groups:
+
+  signals    generate_signals, generate_signals_detailed, assess_risk and
+             their streaming variants (steady-state tick on an already
+             synced stream) for every --sizes bar count
+  panel      generate_signals_panel / assess_risk_panel for every
+             --symbol-counts universe
+  sentiment  analyze_sentiment / analyze_sentiment_batch, uncached and
+             cached (skipped when torch / the FinBERT weights are unavailable)
+  db         log_trade, log_signal, log_helpers inserts and a write-pipeline
+             flush against a scratch Postgres (opt-in with --db; DB_* must
+             point at a database whose name contains "bench" or "test")
+
+Usage:
+    python -m benchmarks.harness run [--sizes 100 1000 10000 100000] [--quick]
+                                     [--groups signals panel] [--db] [--output FILE]
+    python -m benchmarks.harness run --sizes 1000000 --repeats 1
+    python -m benchmarks.harness compare BASE.json NEW.json [--threshold 0.15]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_headlines, synthetic_ohlcv, synthetic_universe
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+GROUPS = ("signals", "panel", "sentiment", "db")
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000)
+QUICK_SIZES = (100, 1_000)
+DEFAULT_SYMBOL_COUNTS = (10, 100, 500)
+QUICK_SYMBOL_COUNTS = (10, 100)
+
+
+def measure(func, repeats=5, budget=10.0):
+    """
+    Call func() once to warm up, then up to `repeats` timed times, stopping
+    early once `budget` seconds have been spent (large inputs get fewer runs).
+    """
+    started = time.perf_counter()
+    func()
+    warmup = time.perf_counter() - started
+
+    timings = []
+    spent = warmup
+    for _ in range(max(1, repeats)):
+        if timings and spent + timings[-1] > budget:
+            break
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+        spent += timings[-1]
+
+    return {
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "max": max(timings),
+        "runs": len(timings)
+    }
+
+
+def bench_signals(sizes, repeats, budget):
+    from analysis.risk_assessor import assess_risk
+    from analysis.signal_generator import generate_signals, generate_signals_detailed
+    from analysis.streaming_indicators import generate_signals_streaming
+    from analysis.streaming_risk import assess_risk_streaming
+
+    results = {}
+    for size in sizes:
+        df = synthetic_ohlcv(size, seed=size)
+        stream_id = f"BENCH{size}"
+        cases = {
+            "generate_signals": lambda: generate_signals(df),
+            "generate_signals_detailed": lambda: generate_signals_detailed(df, stream_id),
+            "assess_risk": lambda: assess_risk(df),
+            "generate_signals_streaming_tick": lambda: generate_signals_streaming(df, stream_id),
+            "assess_risk_streaming_tick": lambda: assess_risk_streaming(df, stream_id),
+        }
+        for name, func in cases.items():
+            key = f"signals/{name}/bars={size}"
+            results[key] = dict(measure(func, repeats, budget), items=size)
+            _report(key, results[key])
+    return results
+
+
+def bench_panel(symbol_counts, bars, repeats, budget):
+    from analysis.panel_signals import generate_signals_panel
+    from analysis.streaming_risk import assess_risk_panel
+
+    results = {}
+    for count in symbol_counts:
+        frames = synthetic_universe(count, bars)
+        panel = pd.concat(frames.values(), ignore_index=True)
+        cases = {
+            "generate_signals_panel": lambda: generate_signals_panel(panel),
+            "assess_risk_panel": lambda: assess_risk_panel(frames),
+        }
+        for name, func in cases.items():
+            key = f"panel/{name}/symbols={count},bars={bars}"
+            results[key] = dict(measure(func, repeats, budget), items=count)
+            _report(key, results[key])
+    return results
+
+
+def bench_sentiment(batch_sizes, repeats, budget):
+    try:
+        import analysis.nlp_insights as nlp
+        nlp._load_model()
+    except Exception as e:
+        print(f"[bench] sentiment skipped: {e}")
+        return {}, f"sentiment skipped: {e}"
+
+    results = {}
+    counter = iter(range(10 ** 9))
+
+    def fresh(n):
+        # New texts every call so the sentiment cache cannot answer them
+        return synthetic_headlines(n, seed=next(counter))
+
+    cases = {"analyze_sentiment": (lambda: nlp.analyze_sentiment(fresh(1)[0]), 1)}
+    for n in batch_sizes:
+        cases[f"analyze_sentiment_batch/n={n}"] = (lambda n=n: nlp.analyze_sentiment_batch(fresh(n)), n)
+        # Seeds far above the fresh() counter, so cached texts never overlap fresh ones
+        cached = synthetic_headlines(n, seed=n + 1_000_000)
+        cases[f"analyze_sentiment_batch_cached/n={n}"] = (lambda t=cached: nlp.analyze_sentiment_batch(t), n)
+
+    for name, (func, items) in cases.items():
+        key = f"sentiment/{name}"
+        results[key] = dict(measure(func, repeats, budget), items=items)
+        _report(key, results[key])
+    return results, None
+
+
+_SCRATCH_DDL = """
+CREATE TABLE IF NOT EXISTS headlines (
+    id SERIAL PRIMARY KEY, symbol TEXT, headline_text TEXT, source TEXT,
+    created_at TIMESTAMPTZ DEFAULT now());
+CREATE TABLE IF NOT EXISTS nlp_analysis (
+    id SERIAL PRIMARY KEY, sentiment TEXT, confidence REAL, model_used TEXT,
+    created_at TIMESTAMPTZ DEFAULT now());
+CREATE TABLE IF NOT EXISTS trades (
+    id SERIAL PRIMARY KEY, symbol TEXT, action TEXT, signal_reason TEXT,
+    confidence_score REAL, risk_score REAL, sentiment_summary TEXT, market_price REAL,
+    signal_strength REAL, is_executed BOOLEAN, signal_only BOOLEAN, source TEXT,
+    headline_id INTEGER, nlp_id INTEGER, created_at TIMESTAMPTZ DEFAULT now());
+"""
+
+
+def bench_db(batch_sizes, repeats, budget, force=False):
+    from config import DB_NAME
+    if not force and not any(tag in DB_NAME.lower() for tag in ("bench", "test")):
+        reason = f"db skipped: DB_NAME={DB_NAME!r} does not look like a scratch database (use --force-db)"
+        print(f"[bench] {reason}")
+        return {}, reason
+
+    try:
+        from db.db_connection import get_connection, pooled_connection
+        from db.log_helpers import insert_headline, insert_nlp_analysis
+        from db.write_pipeline import WritePipeline
+        from trades.trade_logger import log_signal, log_trade
+
+        conn = get_connection()
+        with conn, conn.cursor() as cur:
+            cur.execute(_SCRATCH_DDL)
+        conn.close()
+    except Exception as e:
+        print(f"[bench] db skipped: {e}")
+        return {}, f"db skipped: {e}"
+
+    def linked_insert():
+        with pooled_connection() as conn:
+            insert_headline(conn, "SYN", "Bench headline")
+            insert_nlp_analysis(conn, "neutral", 0.5)
+
+    pipeline = WritePipeline()
+    cases = {
+        "log_trade": (lambda: log_trade("SYN", "HOLD", "bench", 0.5, 0.1, "Neutral (0.5)"), 1),
+        "log_signal": (lambda: log_signal("SYN", "HOLD", "bench", 100.0, 0.5, 0.1), 1),
+        "insert_headline+nlp": (linked_insert, 1),
+    }
+    for n in batch_sizes:
+        batch = [(dict(symbol="SYN", action="HOLD", reason="bench", market_price=100.0,
+                       confidence=0.5, risk=0.1, signal_strength=0.45),
+                  [{"symbol": "SYN", "text": f"Bench headline {i}", "source": "NewsAPI",
+                    "sentiment": "neutral", "confidence": 0.5, "model": "FinBERT"}])
+                 for i in range(n)]
+        cases[f"write_pipeline_flush/n={n}"] = (lambda b=batch: pipeline._flush(b), n)
+
+    results = {}
+    try:
+        for name, (func, items) in cases.items():
+            key = f"db/{name}"
+            results[key] = dict(measure(func, repeats, budget), items=items)
+            _report(key, results[key])
+    finally:
+        conn = get_connection()
+        with conn, conn.cursor() as cur:
+            cur.execute("TRUNCATE trades, headlines, nlp_analysis RESTART IDENTITY")
+        conn.close()
+    return results, None
+
+
+def _report(key, result):
+    per_item = result["median"] / max(1, result["items"])
+    print(f"[bench] {key:<60} median {result['median'] * 1000:10.3f} ms "
+          f"({per_item * 1e6:9.3f} us/item, {result['runs']} runs)", flush=True)
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count()
+    }
+
+
+def run(args):
+    sizes = args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    symbol_counts = args.symbol_counts or (QUICK_SYMBOL_COUNTS if args.quick else DEFAULT_SYMBOL_COUNTS)
+    groups = args.groups or [g for g in GROUPS if g != "db" or args.db]
+
+    report = {"meta": _metadata(), "config": {"sizes": list(sizes), "symbol_counts": list(symbol_counts),
+                                              "panel_bars": args.panel_bars, "repeats": args.repeats},
+              "skipped": [], "results": {}}
+
+    if "signals" in groups:
+        report["results"].update(bench_signals(sizes, args.repeats, args.budget))
+    if "panel" in groups:
+        report["results"].update(bench_panel(symbol_counts, args.panel_bars, args.repeats, args.budget))
+    if "sentiment" in groups:
+        results, skipped = bench_sentiment(args.batch_sizes, args.repeats, args.budget)
+        report["results"].update(results)
+        if skipped:
+            report["skipped"].append(skipped)
+    if "db" in groups:
+        results, skipped = bench_db(args.batch_sizes, args.repeats, args.budget, args.force_db)
+        report["results"].update(results)
+        if skipped:
+            report["skipped"].append(skipped)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[bench] Wrote {len(report['results'])} results to {output}")
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = json.load(f)["results"]
+    with open(args.new) as f:
+        new = json.load(f)["results"]
+
+    regressions = []
+    print(f"{'case':<62} {'base ms':>10} {'new ms':>10} {'change':>8}")
+    for key in sorted(set(base) & set(new)):
+        old_t, new_t = base[key]["median"], new[key]["median"]
+        change = (new_t - old_t) / old_t if old_t > 0 else 0.0
+        # Sub-resolution timings are too noisy to call regressions on
+        regressed = change > args.threshold and new_t - old_t > args.min_delta
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:<62} {old_t * 1000:10.3f} {new_t * 1000:10.3f} {change:+8.1%}{flag}")
+        if regressed:
+            regressions.append(key)
+
+    for key in sorted(set(base) - set(new)):
+        print(f"{key:<62} missing from {args.new}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP analysis benchmark harness")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Run benchmarks and write a JSON report")
+    run_p.add_argument("--groups", nargs="+", choices=GROUPS)
+    run_p.add_argument("--sizes", nargs="+", type=int, help="Bar counts for the signals group")
+    run_p.add_argument("--symbol-counts", nargs="+", type=int, help="Universe sizes for the panel group")
+    run_p.add_argument("--panel-bars", type=int, default=170, help="Bars per symbol in the panel group")
+    run_p.add_argument("--batch-sizes", nargs="+", type=int, default=[16, 64],
+                       help="Headline / record counts for the sentiment and db groups")
+    run_p.add_argument("--repeats", type=int, default=5)
+    run_p.add_argument("--budget", type=float, default=10.0, help="Max seconds spent per case")
+    run_p.add_argument("--quick", action="store_true", help="Small sizes only")
+    run_p.add_argument("--db", action="store_true", help="Include the db group")
+    run_p.add_argument("--force-db", action="store_true", help="Allow any DB_NAME for the db group")
+    run_p.add_argument("--output", help="Report path (default: benchmarks/results/bench_<time>.json)")
+
+    cmp_p = sub.add_parser("compare", help="Flag regressions between two reports")
+    cmp_p.add_argument("base")
+    cmp_p.add_argument("new")
+    cmp_p.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown (0.15 = 15%%)")
+    cmp_p.add_argument("--min-delta", type=float, default=0.0005, help="Ignore changes below this many seconds")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
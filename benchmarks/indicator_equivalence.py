@@ -0,0 +1,107 @@
+# MCP-Stock-Tracker/benchmarks/indicator_equivalence.py
+"""
+Check that the streaming indicator engine matches the `ta` implementations.
+
+Runs IndicatorState bar by bar over random-walk closes (with flat runs and
+NaN gaps) for several window configs, compares every bar against
+calculate_rsi / calculate_macd_histogram / calculate_ema_pair, and then
+replays growing and sliding windows through generate_signals_streaming vs
+generate_signals_detailed. Exits non-zero on the first mismatch.
+
+Usage:
+    python -m benchmarks.indicator_equivalence [--bars 5000] [--seed 7]
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from analysis.signal_generator import (
+    calculate_rsi,
+    calculate_macd_histogram,
+    calculate_ema_pair,
+    generate_signals_detailed
+)
+from analysis.streaming_indicators import IndicatorState, generate_signals_streaming
+
+CONFIGS = [
+    {"rsi_window": 14, "macd_fast": 12, "macd_slow": 26, "macd_signal": 9, "ema_short": 12, "ema_long": 26},
+    {"rsi_window": 7, "macd_fast": 5, "macd_slow": 35, "macd_signal": 5, "ema_short": 9, "ema_long": 50},
+    {"rsi_window": 2, "macd_fast": 3, "macd_slow": 10, "macd_signal": 16, "ema_short": 2, "ema_long": 200},
+]
+
+
+def synthetic_closes(bars, seed):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.standard_normal(bars))
+    closes[bars // 3:bars // 3 + 25] = closes[bars // 3]
+    closes[rng.integers(1, bars, 5)] = np.nan
+    return closes
+
+
+def check_indicators(closes, indicators):
+    df = pd.DataFrame({"close": closes})
+    ema_short, ema_long = calculate_ema_pair(df, indicators["ema_short"], indicators["ema_long"])
+    expected = {
+        "rsi": calculate_rsi(df, indicators["rsi_window"]).to_numpy(),
+        "macd_hist": calculate_macd_histogram(df, indicators["macd_fast"], indicators["macd_slow"],
+                                              indicators["macd_signal"]).to_numpy(),
+        "ema_short": ema_short.to_numpy(),
+        "ema_long": ema_long.to_numpy()
+    }
+
+    state = IndicatorState.from_config(indicators)
+    rows = [state.update(c) for c in closes]
+    for name, values in expected.items():
+        actual = np.array([row[name] for row in rows])
+        if not np.array_equal(actual, values, equal_nan=True):
+            bad = int(np.flatnonzero(~((actual == values) | (np.isnan(actual) & np.isnan(values))))[0])
+            return f"{name} differs at bar {bad}: {actual[bad]!r} != {values[bad]!r}"
+    return None
+
+
+def check_signals(closes, windows=300, sliding=None):
+    """Growing windows, or with `sliding` a window of at most that many bars moving forward."""
+    closes = closes[~np.isnan(closes)]
+    times = pd.date_range("2024-01-02 09:30", periods=len(closes), freq="h", tz="America/New_York")
+    full = pd.DataFrame({"Datetime": times, "open": closes, "high": closes + 1,
+                         "low": closes - 1, "close": closes, "volume": 1000.0})
+
+    for n in range(1, min(windows, len(full)) + 1):
+        df = full.iloc[max(0, n - sliding) if sliding else 0:n].reset_index(drop=True)
+        df.loc[len(df) - 1, "close"] += 0.25 * (n % 4)  # the forming bar moves between cycles
+        streaming = generate_signals_streaming(df, "EQUIVALENCE")
+        detailed = generate_signals_detailed(df, "EQUIVALENCE")
+        for key in ("action", "reason", "confidence"):
+            if streaming[key] != detailed[key]:
+                return f"{key} differs with {n} bars: {streaming[key]!r} != {detailed[key]!r}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming indicator equivalence check")
+    parser.add_argument("--bars", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    closes = synthetic_closes(args.bars, args.seed)
+    failures = []
+    for indicators in CONFIGS:
+        error = check_indicators(closes, indicators)
+        print(f"[equivalence] {indicators}: {'OK' if error is None else error}")
+        if error:
+            failures.append(error)
+
+    # 49 bars is a 7-session window of 1h bars
+    error = check_signals(closes) or check_signals(closes, sliding=49)
+    print(f"[equivalence] generate_signals_streaming vs detailed: {'OK' if error is None else error}")
+    if error:
+        failures.append(error)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
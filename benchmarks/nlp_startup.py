@@ -0,0 +1,75 @@
+# MCP-Stock-Tracker/benchmarks/nlp_startup.py
+"""
+Cold-start benchmark for analysis.nlp_insights.
+
+Every mode runs in a fresh interpreter so nothing is already imported or
+cached. For each mode we report:
+
+  import     - time to `import analysis.nlp_insights`
+  load       - time for the first forward pass (model load + inference)
+  per_item   - mean latency per headline over a batched steady-state run
+
+"eager-import" reproduces the old behaviour, where the model was loaded at
+import time: its probe loads the model inside the timed import, so its
+first call is inference only.
+
+Usage:
+    python -m benchmarks.nlp_startup [--headlines 64] [--torchscript model.pt]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import analysis.nlp_insights as nlp
+{eager}
+t1 = time.perf_counter()
+nlp._run_model(["Warm-up headline for the benchmark."])
+t2 = time.perf_counter()
+texts = [f"Company {{i}} reports quarterly results above expectations" for i in range({n})]
+t3 = time.perf_counter()
+nlp._run_model(texts)
+t4 = time.perf_counter()
+print(json.dumps({{"import": t1 - t0, "load": t2 - t1, "per_item": (t4 - t3) / len(texts)}}))
+"""
+
+
+def run_mode(env_overrides, headlines, eager=False):
+    env = dict(os.environ, SENTIMENT_CACHE_PATH="", **env_overrides)
+    # The old module ran the equivalent of _load_model() at import time
+    probe = PROBE.format(n=headlines, eager="nlp._load_model()" if eager else "")
+    out = subprocess.run(
+        [sys.executable, "-c", probe],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FinBERT cold-start benchmark")
+    parser.add_argument("--headlines", type=int, default=64)
+    parser.add_argument("--torchscript", help="Traced artifact from nlp_insights.export_torchscript()")
+    args = parser.parse_args()
+
+    modes = {
+        "lazy": {"FINBERT_QUANTIZE": "false", "FINBERT_TORCHSCRIPT_PATH": ""},
+        "lazy+int8": {"FINBERT_QUANTIZE": "true", "FINBERT_TORCHSCRIPT_PATH": ""},
+    }
+    if args.torchscript:
+        modes["torchscript"] = {"FINBERT_QUANTIZE": "false", "FINBERT_TORCHSCRIPT_PATH": args.torchscript}
+
+    results = {"eager-import": run_mode(modes["lazy"], args.headlines, eager=True)}
+    results.update({name: run_mode(env, args.headlines) for name, env in modes.items()})
+
+    print(f"{'mode':<14}{'import (s)':>12}{'first call (s)':>16}{'per headline (ms)':>20}")
+    for name, r in results.items():
+        print(f"{name:<14}{r['import']:>12.2f}{r['load']:>16.2f}{r['per_item'] * 1000:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# MCP-Stock-Tracker/benchmarks/risk_equivalence.py
+"""
+Check that the streaming and panel risk assessors match assess_risk.
+
+Replays growing windows of a synthetic OHLC series (with a moving forming
+bar and a sliding window, long and short) through assess_risk_streaming and
+compares risk_score and reason with assess_risk, then scores a panel of symbols with
+different history lengths through assess_risk_panel. Exits non-zero on the
+first mismatch.
+
+Usage:
+    python -m benchmarks.risk_equivalence [--bars 600] [--symbols 200] [--seed 7]
+"""
+
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.risk_assessor import assess_risk
+from analysis.streaming_risk import assess_risk_panel, assess_risk_streaming
+
+
+def synthetic_bars(bars, seed, symbol="EQUIVALENCE"):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.standard_normal(bars))
+    spread = np.abs(rng.standard_normal(bars))
+    times = pd.date_range("2024-01-02 09:30", periods=bars, freq="h", tz="America/New_York")
+    return pd.DataFrame({"Datetime": times, "open": close, "high": close + spread,
+                         "low": close - spread * rng.random(bars), "close": close,
+                         "volume": 1000.0, "symbol": symbol})
+
+
+def _same(a, b):
+    if a["reason"] == "Insufficient data":
+        # assess_risk fails inside ta for histories shorter than the ATR window
+        return a["risk_score"] is None and b["risk_score"] is None
+    if a["reason"] != b["reason"]:
+        return False
+    x, y = a["risk_score"], b["risk_score"]
+    if x is None or y is None:
+        return x is y
+    return x == y or (math.isnan(x) and math.isnan(y))
+
+
+def check_streaming(full, window=170):
+    for n in range(1, len(full) + 1):
+        df = full.iloc[max(0, n - window):n].reset_index(drop=True)
+        df.loc[len(df) - 1, "close"] += 0.25 * (n % 4)  # the forming bar moves between cycles
+        expected = assess_risk(df)
+        actual = assess_risk_streaming(df, "EQUIVALENCE")
+        if not _same(actual, expected):
+            return f"{n} bars: {actual!r} != {expected!r}"
+    return None
+
+
+def check_panel(symbols, bars, seed):
+    rng = np.random.default_rng(seed)
+    frames = {f"S{i}": synthetic_bars(int(rng.integers(1, bars)), seed + i, f"S{i}") for i in range(symbols)}
+
+    start = time.perf_counter()
+    panel = assess_risk_panel(frames)
+    elapsed = time.perf_counter() - start
+    print(f"[equivalence] assess_risk_panel: {symbols} symbols in {elapsed * 1000:.1f} ms")
+
+    for symbol, df in frames.items():
+        expected = assess_risk(df)
+        if not _same(panel[symbol], expected):
+            return f"{symbol} ({len(df)} bars): {panel[symbol]!r} != {expected!r}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming risk equivalence check")
+    parser.add_argument("--bars", type=int, default=600)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    failures = []
+    # 35 bars is about a 7-day window of 1h bars, where the ATR seed still matters
+    error = check_streaming(synthetic_bars(args.bars, args.seed)) or \
+        check_streaming(synthetic_bars(args.bars, args.seed), window=35)
+    print(f"[equivalence] assess_risk_streaming vs assess_risk: {'OK' if error is None else error}")
+    if error:
+        failures.append(error)
+
+    error = check_panel(args.symbols, args.bars, args.seed)
+    print(f"[equivalence] assess_risk_panel vs assess_risk: {'OK' if error is None else error}")
+    if error:
+        failures.append(error)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
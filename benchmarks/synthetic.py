@@ -0,0 +1,53 @@
+# MCP-Stock-Tracker/benchmarks/synthetic.py
+"""
+Deterministic synthetic market data for benchmarks.
+
+Frames have the same shape as data/collector.fetch_price_data output
+(Datetime, open, high, low, close, volume, symbol), so they can be fed to
+any analysis function unchanged.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_ohlcv(bars: int, seed: int = 0, symbol: str = "SYN", freq: str = "h",
+                    start: str = "2020-01-02 09:30", price: float = 100.0) -> pd.DataFrame:
+    """Geometric random-walk OHLCV with realistic intrabar ranges."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0, 0.004, bars)
+    close = price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([price], close[:-1]))
+    spread = np.abs(rng.normal(0.0, 0.003, bars)) * close
+    high = np.maximum(open_, close) + spread * rng.random(bars)
+    low = np.minimum(open_, close) - spread * rng.random(bars)
+    volume = rng.integers(1_000, 1_000_000, bars).astype("float64")
+
+    return pd.DataFrame({
+        "Datetime": pd.date_range(start, periods=bars, freq=freq, tz="America/New_York"),
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+        "symbol": symbol
+    })
+
+
+def synthetic_universe(symbols: int, bars: int, seed: int = 0) -> dict:
+    """symbol -> frame for a universe of `symbols` tickers with `bars` bars each."""
+    return {f"SYN{i:04d}": synthetic_ohlcv(bars, seed + i, f"SYN{i:04d}") for i in range(symbols)}
+
+
+def synthetic_headlines(count: int, seed: int = 0) -> list:
+    """Distinct, plausible headlines (distinct so the sentiment cache cannot answer them)."""
+    rng = np.random.default_rng(seed)
+    subjects = ["Shares of {s}", "{s}", "Analysts on {s}", "{s} stock"]
+    events = ["beat quarterly earnings estimates", "cut full-year guidance", "announce a buyback",
+              "face a regulatory probe", "hit a 52-week high", "slide after a downgrade",
+              "report record revenue", "miss revenue expectations"]
+    return [
+        f"{subjects[rng.integers(len(subjects))].format(s=f'Company {seed}-{i}')} "
+        f"{events[rng.integers(len(events))]}"
+        for i in range(count)
+    ]
@@ -16,4 +16,107 @@ RISK_THRESHOLD = float(os.getenv("RISK_THRESHOLD", 0.5))
 CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", 0.6))
 SIGNAL_STRENGTH_THRESHOLD = float(os.getenv("SIGNAL_STRENGTH_THRESHOLD", 0.4))
 
+# MULTI-SYMBOL ENGINE
+ENGINE_WORKERS = int(os.getenv("ENGINE_WORKERS", 8))
+SHARD_INDEX = int(os.getenv("SHARD_INDEX", 0))
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", 1))
+CYCLE_SECONDS = float(os.getenv("CYCLE_SECONDS", 60))  # async runner: time between cycle starts
+SYMBOL_TIMEOUT = float(os.getenv("SYMBOL_TIMEOUT", 120))  # async runner: cap on one symbol's pipeline
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", 60))  # async runner: cap on one FinBERT call
+SKIP_UNCHANGED_CYCLES = os.getenv("SKIP_UNCHANGED_CYCLES", "1").lower() in ("1", "true", "yes")  # skip cycles whose inputs did not change
+SKIP_MAX_SECONDS = float(os.getenv("SKIP_MAX_SECONDS", 3600))  # republish unchanged inputs at least this often; 0 = never
+STREAM_CACHE_SIZE = int(os.getenv("STREAM_CACHE_SIZE", 2048))  # indicator / risk streams kept each; least recently used go first
 
+# SCHEDULER
+PRICE_INTERVAL_SECONDS = float(os.getenv("PRICE_INTERVAL_SECONDS", 60))  # should divide the bar length
+NEWS_INTERVAL_SECONDS = float(os.getenv("NEWS_INTERVAL_SECONDS", 900))
+SENTIMENT_INTERVAL_SECONDS = float(os.getenv("SENTIMENT_INTERVAL_SECONDS", 300))
+BAR_ANCHOR_SECONDS = float(os.getenv("BAR_ANCHOR_SECONDS", 1800))  # 1h equity bars close at :30
+SCHEDULE_SETTLE_SECONDS = float(os.getenv("SCHEDULE_SETTLE_SECONDS", 5))  # delay after a bar close
+PRICE_SPREAD_SECONDS = float(os.getenv("PRICE_SPREAD_SECONDS", 30))  # per-container price phase window
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", 4))
+SCHEDULER_STATS_SECONDS = float(os.getenv("SCHEDULER_STATS_SECONDS", 600))
+
+# SENTIMENT MODEL
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", 16))
+SENTIMENT_NUM_THREADS = int(os.getenv("SENTIMENT_NUM_THREADS", 0))  # 0 = torch default
+NEWS_PAGE_SIZE = int(os.getenv("NEWS_PAGE_SIZE", 3))
+NEWS_FETCH_TIMEOUT = float(os.getenv("NEWS_FETCH_TIMEOUT", 10))  # seconds per NewsAPI request
+NEWS_CACHE_TTL_SECONDS = float(os.getenv("NEWS_CACHE_TTL_SECONDS", 600))  # reuse a query's response this long
+NEWS_DAILY_QUOTA = float(os.getenv("NEWS_DAILY_QUOTA", 100))  # NewsAPI requests per day, whole process
+NEWS_BURST = float(os.getenv("NEWS_BURST", 5))  # requests that may be spent back to back
+NEWS_LOOKBACK_HOURS = float(os.getenv("NEWS_LOOKBACK_HOURS", 24))  # history for a query's first request
+NEWS_QUERY_MAX_CHARS = int(os.getenv("NEWS_QUERY_MAX_CHARS", 500))  # NewsAPI q length limit
+NEWS_STREAM_SIZE = int(os.getenv("NEWS_STREAM_SIZE", 50))  # headlines kept per symbol
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", 10000))
+SENTIMENT_CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "")  # sqlite file; empty = memory only
+FINBERT_QUANTIZE = os.getenv("FINBERT_QUANTIZE", "false").lower() in ("1", "true", "yes")
+FINBERT_TORCHSCRIPT_PATH = os.getenv("FINBERT_TORCHSCRIPT_PATH", "")  # traced artifact from export_torchscript()
+FINBERT_WARMUP = os.getenv("FINBERT_WARMUP", "false").lower() in ("1", "true", "yes")
+
+# PRICE DATA
+BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", "cache/bars")  # empty = memory only
+BAR_STORE_RETENTION_DAYS = int(os.getenv("BAR_STORE_RETENTION_DAYS", 365))
+PRICE_FETCH_CHUNK = int(os.getenv("PRICE_FETCH_CHUNK", 100))  # tickers per bulk download
+PRICE_FETCH_TIMEOUT = float(os.getenv("PRICE_FETCH_TIMEOUT", 20))  # seconds per yfinance request
+BAR_BUFFER_CAPACITY = int(os.getenv("BAR_BUFFER_CAPACITY", 512))  # bars kept in memory per symbol
+MARKET_TZ = os.getenv("MARKET_TZ", "America/New_York")  # bars are normalized to this timezone
+PREPROCESS_GAP_POLICY = os.getenv("PREPROCESS_GAP_POLICY", "flag")  # "flag" or "ffill" missing intraday bars
+PREPROCESS_OUTLIER_MAD = float(os.getenv("PREPROCESS_OUTLIER_MAD", 8))  # return outlier cut-off, in MADs
+
+# STRATEGY CONFIGS
+CONFIG_RELOAD_SECONDS = float(os.getenv("CONFIG_RELOAD_SECONDS", 5))  # min gap between mtime checks
+STRATEGY_HOLDOUT_FRACTION = float(os.getenv("STRATEGY_HOLDOUT_FRACTION", 0.3))  # newest bars kept out of the sweep
+
+# DATABASE POOL
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", 1))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))  # seconds to wait for a free connection
+DB_POOL_PING_SECONDS = float(os.getenv("DB_POOL_PING_SECONDS", 60))  # ping connections idle longer than this
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", 10))  # seconds
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))  # 0 = no limit
+
+# WRITE PIPELINE
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", 200))  # records per flush
+WRITE_FLUSH_SECONDS = float(os.getenv("WRITE_FLUSH_SECONDS", 2))  # max age of a buffered record
+WRITE_QUEUE_SIZE = int(os.getenv("WRITE_QUEUE_SIZE", 5000))  # submit() blocks when this many are pending
+WRITE_SUBMIT_TIMEOUT = float(os.getenv("WRITE_SUBMIT_TIMEOUT", 10))
+WRITE_MAX_RETRIES = int(os.getenv("WRITE_MAX_RETRIES", 3))
+
+# BACKTESTING
+BACKTEST_FEE_BPS = float(os.getenv("BACKTEST_FEE_BPS", 1.0))  # cost per unit of position change
+OPTIMIZER_WORKERS = int(os.getenv("OPTIMIZER_WORKERS", 0))  # 0 = all cores
+
+# METRICS & PROFILING
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9108))  # Prometheus /metrics; 0 = disabled
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+PROFILE_MODE = os.getenv("PROFILE_MODE", "").lower()  # "", "cprofile" or "tracemalloc"
+PROFILE_EVERY = int(os.getenv("PROFILE_EVERY", 10))  # profile every Nth cycle
+PROFILE_DIR = os.getenv("PROFILE_DIR", "logs/profiles")
+
+# DISCOVERY
+DISCOVERY_SOURCES = os.getenv("DISCOVERY_SOURCES", "trending,day_gainers,day_losers,most_actives,watchlist")
+DISCOVERY_WATCHLIST = os.getenv("DISCOVERY_WATCHLIST", "")  # comma-separated symbols always tracked
+DISCOVERY_TIMEOUT = float(os.getenv("DISCOVERY_TIMEOUT", 10))  # seconds per source
+DISCOVERY_SOURCE_LIMIT = int(os.getenv("DISCOVERY_SOURCE_LIMIT", 100))  # symbols requested per source
+DISCOVERY_MAX_SYMBOLS = int(os.getenv("DISCOVERY_MAX_SYMBOLS", 0))  # 0 = keep every ranked symbol
+DISCOVERY_STALE_DAYS = float(os.getenv("DISCOVERY_STALE_DAYS", 3))  # deactivate symbols unseen this long
+
+# ORCHESTRATION
+ORCHESTRATOR_IMAGE = os.getenv("ORCHESTRATOR_IMAGE", "mcp-stock-tracker")
+ORCHESTRATOR_NETWORK = os.getenv("ORCHESTRATOR_NETWORK", "mcp-stock-tracker_mcp-network")
+ORCHESTRATOR_CONCURRENCY = int(os.getenv("ORCHESTRATOR_CONCURRENCY", 16))  # parallel Docker API actions
+ORCHESTRATOR_ROLLOUT_BATCH = int(os.getenv("ORCHESTRATOR_ROLLOUT_BATCH", 5))  # outdated containers replaced per pass
+ORCHESTRATOR_STOP_TIMEOUT = int(os.getenv("ORCHESTRATOR_STOP_TIMEOUT", 10))  # seconds before SIGKILL
+ORCHESTRATOR_INTERVAL = float(os.getenv("ORCHESTRATOR_INTERVAL", 60))  # seconds between --watch passes
+
+# PAPER TRADING
+PAPER_TRADING = os.getenv("PAPER_TRADING", "1").lower() in ("1", "true", "yes")  # simulate fills for signals
+PAPER_STARTING_CASH = float(os.getenv("PAPER_STARTING_CASH", 100000))
+PAPER_ORDER_NOTIONAL = float(os.getenv("PAPER_ORDER_NOTIONAL", 5000))  # cash committed per new position
+PAPER_SLIPPAGE_BPS = float(os.getenv("PAPER_SLIPPAGE_BPS", 5))  # fills are this much worse than the last close
+PAPER_FEE_BPS = float(os.getenv("PAPER_FEE_BPS", 1))  # commission on traded notional
+PAPER_FEE_MIN = float(os.getenv("PAPER_FEE_MIN", 0))  # minimum commission per fill
+PAPER_ALLOW_SHORT = os.getenv("PAPER_ALLOW_SHORT", "0").lower() in ("1", "true", "yes")
+PAPER_SNAPSHOT_PATH = os.getenv("PAPER_SNAPSHOT_PATH", f"cache/paper_portfolio_{SHARD_INDEX}.json")  # empty = memory only
+PAPER_SNAPSHOT_SECONDS = float(os.getenv("PAPER_SNAPSHOT_SECONDS", 60))  # min gap between snapshots
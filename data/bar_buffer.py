@@ -0,0 +1,207 @@
+# MCP-Stock-Tracker/data/bar_buffer.py
+"""
+Fixed-capacity ring buffer of OHLCV bars for one symbol.
+
+Timestamps (int64 ns, UTC) and open/high/low/close/volume (float64) live
+in preallocated NumPy arrays of twice the capacity. Every bar is written
+twice, at slot i and i + capacity. That way the newest `capacity` bars
+always form one contiguous slice, and the indicator and risk engines get
+plain zero-copy views with no wrap-around handling and no per-cycle
+allocation. Appending a bar, or revising the still-forming one, is O(1).
+
+Views are read-only and reflect the buffer as it was when taken. Hold
+`buffer.lock` while reading them if another thread may append.
+to_frame() builds a collector-shaped DataFrame for the few callers that
+really need pandas.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import BAR_BUFFER_CAPACITY
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def frame_timestamps(df: pd.DataFrame, time_col: str):
+    """int64 ns UTC timestamps from a collector frame's time column."""
+    col = df[time_col]
+    if getattr(col.dt, "tz", None) is not None:
+        col = col.dt.tz_convert("UTC")
+    return col.to_numpy(dtype="datetime64[ns]").view("int64")
+
+
+class BarBuffer:
+    """
+    :param capacity: Bars kept; older bars fall off as new ones arrive
+    :param tz: Timezone used when rebuilding a DataFrame (collector frames are exchange-local)
+    :param time_col: Name of the timestamp column in frames ("Datetime" intraday, "Date" daily)
+    """
+
+    def __init__(self, capacity: int = BAR_BUFFER_CAPACITY, tz: str = None, time_col: str = "Datetime"):
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity!r}")
+        self.capacity = capacity
+        self.tz = tz
+        self.time_col = time_col
+        self.lock = threading.RLock()
+        self._ts = np.zeros(2 * capacity, dtype="int64")
+        self._values = np.zeros((len(FIELDS), 2 * capacity), dtype="float64")
+        self._start = 0      # slot of the oldest bar, in [0, capacity)
+        self._size = 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, capacity: int = BAR_BUFFER_CAPACITY, time_col: str = None):
+        """Buffer holding the newest `capacity` bars of a collector frame."""
+        time_col = time_col or next((c for c in ("Datetime", "Date") if c in df.columns), "Datetime")
+        tz = getattr(df[time_col].dt, "tz", None) if time_col in df.columns else None
+        buffer = cls(capacity, tz=str(tz) if tz is not None else None, time_col=time_col)
+        buffer.merge_frame(df)
+        return buffer
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return self._ts.nbytes + self._values.nbytes
+
+    @property
+    def last_timestamp(self):
+        """Newest bar's timestamp (int64 ns UTC), or None when empty."""
+        if not self._size:
+            return None
+        return int(self._ts[self._start + self._size - 1])
+
+    def index_of(self, ts: int) -> int:
+        """Position of the first bar at or after ts (int64 ns UTC) in the views; len(self) if none."""
+        return int(np.searchsorted(self.timestamps(), ts))
+
+    def append(self, ts: int, open_: float, high: float, low: float, close: float, volume: float) -> bool:
+        """
+        Add one bar. A bar with the newest timestamp replaces it (the forming
+        bar being revised); an older timestamp is ignored.
+
+        :return: False if the bar was ignored
+        """
+        with self.lock:
+            row = (open_, high, low, close, volume)
+            last = self.last_timestamp
+            if last is not None and ts < last:
+                return False
+            if last is not None and ts == last:
+                self._put((self._start + self._size - 1) % self.capacity, ts, row)
+                return True
+
+            if self._size < self.capacity:
+                slot = (self._start + self._size) % self.capacity
+                self._size += 1
+            else:
+                slot = self._start
+                self._start = (self._start + 1) % self.capacity
+            self._put(slot, ts, row)
+            return True
+
+    def extend(self, timestamps, values) -> int:
+        """
+        Append many bars at once (vectorized).
+
+        :param timestamps: Sorted int64 ns timestamps, all newer than last_timestamp
+        :param values: (5, n) array in FIELDS order
+        :return: Number of bars appended
+        """
+        timestamps = np.asarray(timestamps, dtype="int64")
+        values = np.asarray(values, dtype="float64")
+        n = len(timestamps)
+        if n == 0:
+            return 0
+        with self.lock:
+            if n > self.capacity:
+                timestamps, values = timestamps[-self.capacity:], values[:, -self.capacity:]
+            count = len(timestamps)
+            slots = (self._start + self._size + np.arange(count)) % self.capacity
+            for base in (0, self.capacity):
+                self._ts[slots + base] = timestamps
+                self._values[:, slots + base] = values
+
+            overflow = max(0, self._size + count - self.capacity)
+            self._start = (self._start + overflow) % self.capacity
+            self._size = min(self.capacity, self._size + count)
+            return n
+
+    def merge_frame(self, df: pd.DataFrame) -> int:
+        """
+        Fold a collector frame (full window or delta fetch) into the buffer:
+        the newest stored bar is revised in place and later bars appended.
+
+        :return: Number of bars added or revised
+        """
+        if df is None or df.empty or self.time_col not in df.columns:
+            return 0
+        ts = frame_timestamps(df, self.time_col)
+        order = np.argsort(ts, kind="stable")
+        ts = ts[order]
+        values = np.vstack([pd.to_numeric(df[f], errors="coerce").to_numpy(dtype="float64")[order]
+                            if f in df.columns else np.full(len(ts), np.nan) for f in FIELDS])
+
+        # Duplicate timestamps within the frame: the last occurrence wins
+        keep = np.append(ts[1:] != ts[:-1], True)
+        ts, values = ts[keep], values[:, keep]
+
+        with self.lock:
+            last = self.last_timestamp
+            changed = 0
+            if last is not None:
+                same = np.flatnonzero(ts == last)
+                if len(same):
+                    self.append(int(last), *values[:, same[-1]])
+                    changed += 1
+                newer = ts > last
+                ts, values = ts[newer], values[:, newer]
+            return changed + self.extend(ts, values)
+
+    def timestamps(self) -> np.ndarray:
+        return self._view(self._ts)
+
+    def field(self, name: str) -> np.ndarray:
+        return self._view(self._values[FIELDS.index(name)])
+
+    def open(self) -> np.ndarray:
+        return self.field("open")
+
+    def high(self) -> np.ndarray:
+        return self.field("high")
+
+    def low(self) -> np.ndarray:
+        return self.field("low")
+
+    def close(self) -> np.ndarray:
+        return self.field("close")
+
+    def volume(self) -> np.ndarray:
+        return self.field("volume")
+
+    def to_frame(self, symbol: str = None) -> pd.DataFrame:
+        """Copy into a DataFrame shaped like fetch_price_data output."""
+        with self.lock:
+            times = pd.to_datetime(self.timestamps(), utc=True)
+            if self.tz:
+                times = times.tz_convert(self.tz)
+            data = {self.time_col: times}
+            data.update({name: self.field(name).copy() for name in FIELDS})
+        df = pd.DataFrame(data)
+        if symbol is not None:
+            df["symbol"] = symbol
+        return df
+
+    def _put(self, slot, ts, row):
+        for index in (slot, slot + self.capacity):
+            self._ts[index] = ts
+            self._values[:, index] = row
+
+    def _view(self, array):
+        view = array[self._start:self._start + self._size]
+        view.flags.writeable = False
+        return view
@@ -0,0 +1,271 @@
+# MCP-Stock-Tracker/data/bar_store.py
+
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from config import BAR_STORE_DIR, BAR_STORE_RETENTION_DAYS, BAR_BUFFER_CAPACITY, PREPROCESS_GAP_POLICY
+from data.bar_buffer import BarBuffer
+from data.collector import fetch_price_data, fetch_price_data_many
+from data.preprocessor import clean_bars, split_by_symbol
+
+# (symbol, interval) -> merged bar history, shaped like fetch_price_data output
+_frames = {}
+# (symbol, interval) -> BarBuffer with the newest bars as NumPy arrays
+_buffers = {}
+_locks = {}
+_locks_guard = threading.Lock()
+
+_PERIOD_UNITS = {"d": 1, "wk": 7, "mo": 30, "y": 365}
+
+
+def period_to_timedelta(period: str):
+    """
+    Translate a yfinance period string ("7d", "1mo", "2y") into a timedelta.
+    Returns None for "max"/"ytd"-style periods that have no fixed length.
+    """
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period or "")
+    if not match:
+        return None
+    return timedelta(days=int(match.group(1)) * _PERIOD_UNITS[match.group(2)])
+
+
+def time_column(df: pd.DataFrame):
+    """Name of the timestamp column yfinance produced ("Datetime" intraday, "Date" daily)."""
+    for name in ("Datetime", "Date"):
+        if name in df.columns:
+            return name
+    return None
+
+
+def get_bar_buffer(symbol: str, interval: str = "1h"):
+    """
+    Ring buffer of the newest BAR_BUFFER_CAPACITY bars for a symbol, kept in
+    step with every get_bars / get_bars_many call. None until the symbol has
+    been fetched once. Readers should hold `buffer.lock` (see BarBuffer).
+    """
+    return _buffers.get((symbol.upper(), interval))
+
+
+def get_bars(symbol: str, period: str = "7d", interval: str = "1h") -> pd.DataFrame:
+    """
+    Return the last `period` of bars for a symbol, fetching only what is new.
+
+    The first call (or a store older than the period) downloads the full
+    window. Later calls fetch from the last stored bar onward, so the
+    still-forming bar is refreshed and any newly closed bars are appended.
+    History is persisted under BAR_STORE_DIR so restarts resume incrementally.
+
+    :return: DataFrame in the same shape as fetch_price_data, cleaned by
+             data.preprocessor (gap_bars/filled/zero_volume/outlier columns added),
+             or an empty frame
+    """
+    key = (symbol.upper(), interval)
+    window = period_to_timedelta(period)
+    with _lock_for(key):
+        stored = _load(key)
+        last_ts = _last_timestamp(stored)
+
+        if _needs_full_fetch(last_ts, window):
+            fetched = fetch_price_data(symbol, period=period, interval=interval)
+        else:
+            fetched = fetch_price_data(symbol, interval=interval, start=last_ts)
+
+        return _commit(key, stored, _clean(fetched, interval), period, window)
+
+
+def get_bars_many(symbols, period: str = "7d", interval: str = "1h"):
+    """
+    Bulk version of get_bars for a whole symbol list.
+
+    Symbols with no usable history share one full-period bulk download; the
+    rest share one delta download starting at the oldest of their last stored
+    bars. Overlapping bars are de-duplicated on merge, newest fetch wins.
+
+    :return: (frames, failures) - frames maps symbol -> DataFrame shaped like
+             fetch_price_data; failures maps symbol -> error message for
+             symbols that have neither fresh nor stored data
+    """
+    window = period_to_timedelta(period)
+    keys = {s.upper(): (s.upper(), interval) for s in symbols}
+
+    full, delta = [], {}
+    for symbol, key in keys.items():
+        with _lock_for(key):
+            last_ts = _last_timestamp(_load(key))
+        if _needs_full_fetch(last_ts, window):
+            full.append(symbol)
+        else:
+            delta[symbol] = last_ts
+
+    fetched, failures = {}, {}
+    if full:
+        frames, errors = fetch_price_data_many(full, period=period, interval=interval)
+        fetched.update(frames)
+        failures.update(errors)
+    if delta:
+        frames, errors = fetch_price_data_many(list(delta), interval=interval, start=min(delta.values()))
+        fetched.update(frames)
+        failures.update(errors)
+
+    # One vectorized cleaning pass for the whole batch
+    fetched = split_by_symbol(clean_bars(fetched, interval)) if fetched else {}
+
+    results = {}
+    for symbol, key in keys.items():
+        with _lock_for(key):
+            df = _commit(key, _load(key), fetched.get(symbol), period, window)
+        if df.empty:
+            failures.setdefault(symbol, "No data returned by yfinance.")
+        else:
+            results[symbol] = df
+            failures.pop(symbol, None)
+
+    for symbol, error in failures.items():
+        print(f"[bar_store] Bulk fetch failed for {symbol}: {error}")
+
+    return results, failures
+
+
+def _load(key):
+    stored = _frames.get(key)
+    if stored is None:
+        stored = _read(key)
+        if stored is not None:
+            if "filled" not in stored.columns:
+                stored = _clean(stored, key[1])  # persisted before preprocessing existed
+            elif PREPROCESS_GAP_POLICY == "flag" and stored["filled"].any():
+                stored = stored[~stored["filled"]].reset_index(drop=True)  # persisted under "ffill"
+            _frames[key] = stored
+    return stored
+
+
+def _clean(df, interval):
+    if df is None or df.empty:
+        return df
+    return clean_bars(df, interval)
+
+
+def _needs_full_fetch(last_ts, window):
+    return last_ts is None or window is None or last_ts < datetime.now(timezone.utc) - window
+
+
+def _commit(key, stored, fetched, period, window):
+    merged = _merge(stored, fetched)
+    if merged.empty:
+        return merged
+
+    merged = _apply_retention(merged, window)
+    if merged is not stored:
+        _frames[key] = merged
+        _write(key, merged)
+    _update_buffer(key, merged, fetched)
+
+    return _trim(merged, period, window)
+
+
+def _update_buffer(key, merged, fetched):
+    # Only the fetched rows need folding in; a new buffer starts from the stored history
+    buffer = _buffers.get(key)
+    if buffer is None:
+        _buffers[key] = BarBuffer.from_frame(merged, BAR_BUFFER_CAPACITY)
+    elif fetched is not None and not fetched.empty:
+        buffer.merge_frame(fetched)
+
+
+def _merge(stored, delta):
+    if stored is None or stored.empty:
+        return delta if delta is not None else pd.DataFrame()
+    if delta is None or delta.empty:
+        return stored
+
+    ts_col = time_column(stored)
+    stored_tz = stored[ts_col].dt.tz
+    if stored_tz is not None and delta[ts_col].dt.tz is not None:
+        delta = delta.assign(**{ts_col: delta[ts_col].dt.tz_convert(stored_tz)})
+    merged = pd.concat([stored, delta[stored.columns.intersection(delta.columns)]], ignore_index=True)
+    merged = merged.drop_duplicates(subset=ts_col, keep="last")
+    return merged.sort_values(ts_col, ignore_index=True)
+
+
+def _trim(df, period, window):
+    if window is None:
+        return df.reset_index(drop=True)
+    ts_col = time_column(df)
+
+    # Yahoo treats "Nd" as the last N trading sessions, not N calendar days
+    match = re.fullmatch(r"(\d+)d", period)
+    if match:
+        sessions = df[ts_col].dt.normalize()
+        keep = sessions.drop_duplicates().iloc[-int(match.group(1)):]
+        return df[sessions.isin(keep)].reset_index(drop=True)
+
+    cutoff = _as_utc(df[ts_col].iloc[-1]) - window
+    return df[_as_utc_series(df[ts_col]) >= cutoff].reset_index(drop=True)
+
+
+def _apply_retention(df, window):
+    if df.empty:
+        return df
+    keep = timedelta(days=BAR_STORE_RETENTION_DAYS)
+    if window is not None:
+        keep = max(keep, window)
+    ts_col = time_column(df)
+    cutoff = _as_utc(df[ts_col].iloc[-1]) - keep
+    mask = _as_utc_series(df[ts_col]) >= cutoff
+    return df if mask.all() else df[mask].reset_index(drop=True)
+
+
+def _last_timestamp(df):
+    if df is None or df.empty:
+        return None
+    ts_col = time_column(df)
+    return _as_utc(df[ts_col].iloc[-1]) if ts_col else None
+
+
+def _as_utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _as_utc_series(series):
+    if series.dt.tz is None:
+        return series.dt.tz_localize("UTC")
+    return series.dt.tz_convert("UTC")
+
+
+def _lock_for(key):
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _path(key):
+    symbol, interval = key
+    return os.path.join(BAR_STORE_DIR, f"{symbol}_{interval}.pkl")
+
+
+def _read(key):
+    if not BAR_STORE_DIR:
+        return None
+    try:
+        return pd.read_pickle(_path(key))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[bar_store] Discarding unreadable store for {key}: {e}")
+        return None
+
+
+def _write(key, df):
+    if not BAR_STORE_DIR:
+        return
+    try:
+        os.makedirs(BAR_STORE_DIR, exist_ok=True)
+        tmp_path = _path(key) + ".tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, _path(key))
+    except Exception as e:
+        print(f"[bar_store] Could not persist {key}: {e}")
@@ -2,18 +2,26 @@ import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 
-def fetch_price_data(symbol: str, period: str="7d", interval: str="15m") -> pd.DataFrame:
+from config import PRICE_FETCH_CHUNK, PRICE_FETCH_TIMEOUT
+from utils.metrics import timed
+
+@timed("fetch_price_data")
+def fetch_price_data(symbol: str, period: str="7d", interval: str="15m", start=None) -> pd.DataFrame:
     """
     Fetch historical price data for a given stock symbol.
 
     :param symbol: Ticker symbol (e.g., "APPL")
     :param period: Lookback window (e.g., "1d", "5d", "7d", "1mo")
     :param interval: Granularity (e.g., "1m", "5m", "15m", "1d")
+    :param start: Fetch from this timestamp instead of a full period (delta fetches)
     :return: DataFrame with price data
     """
     try: 
         ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period, interval=interval)
+        if start is not None:
+            df = ticker.history(start=start, interval=interval, timeout=PRICE_FETCH_TIMEOUT)
+        else:
+            df = ticker.history(period=period, interval=interval, timeout=PRICE_FETCH_TIMEOUT)
 
         if df.empty:
             raise ValueError("No data returned by yfinance.")
@@ -32,4 +40,87 @@ def fetch_price_data(symbol: str, period: str="7d", interval: str="15m") -> pd.D
     
     except Exception as e:
         print(f"[collector] Error fetching data for {symbol}: {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
+
+@timed("fetch_price_data_many")
+def fetch_price_data_many(symbols, period: str="7d", interval: str="15m", start=None, chunk_size: int=None):
+    """
+    Fetch price data for many symbols with yfinance's multi-ticker download.
+
+    Symbols are requested in chunks of PRICE_FETCH_CHUNK, so N symbols cost a
+    handful of HTTP round trips instead of N.
+
+    :param symbols: Ticker symbols
+    :param period: Lookback window (ignored when start is given)
+    :param interval: Granularity (e.g., "1m", "5m", "15m", "1d")
+    :param start: Fetch from this timestamp instead of a full period (delta fetches)
+    :param chunk_size: Max tickers per download call
+    :return: (frames, failures) - frames maps symbol -> DataFrame shaped like
+             fetch_price_data; failures maps symbol -> error message
+    """
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    chunk_size = max(1, chunk_size or PRICE_FETCH_CHUNK)
+    frames, failures = {}, {}
+
+    for i in range(0, len(symbols), chunk_size):
+        chunk = symbols[i:i + chunk_size]
+        try:
+            kwargs = {"start": start} if start is not None else {"period": period}
+            raw = yf.download(
+                chunk,
+                interval=interval,
+                group_by="ticker",
+                actions=True,
+                threads=True,
+                progress=False,
+                timeout=PRICE_FETCH_TIMEOUT,
+                **kwargs
+            )
+        except Exception as e:
+            for symbol in chunk:
+                failures[symbol] = str(e)
+            continue
+
+        errors = getattr(getattr(yf, "shared", None), "_ERRORS", {}) or {}
+
+        for symbol in chunk:
+            try:
+                df = _split_download(raw, symbol, len(chunk))
+            except KeyError:
+                df = pd.DataFrame()
+
+            if df.empty:
+                failures[symbol] = str(errors.get(symbol, "No data returned by yfinance."))
+            else:
+                frames[symbol] = df
+
+    return frames, failures
+
+
+def _split_download(raw: pd.DataFrame, symbol: str, chunk_len: int) -> pd.DataFrame:
+    """Pull one symbol out of a yf.download frame into the fetch_price_data schema."""
+    if raw is None or raw.empty:
+        return pd.DataFrame()
+
+    if isinstance(raw.columns, pd.MultiIndex):
+        df = raw[symbol]
+    elif chunk_len == 1:
+        df = raw
+    else:
+        return pd.DataFrame()
+
+    df = df.dropna(subset=["Close"]) if "Close" in df.columns else df.dropna(how="all")
+    if df.empty:
+        return pd.DataFrame()
+
+    df = df.reset_index()
+    df.columns.name = None
+    df = df.rename(columns={
+        "Open": "open",
+        "High": "high",
+        "Low": "low",
+        "Close": "close",
+        "Volume": "volume"
+    })
+    df['symbol'] = symbol
+    return df
@@ -1,8 +1,338 @@
+"""
+NewsAPI client with shared queries, caching, dedup and a request budget.
+
+Symbols are packed into as few `everything` queries as fit NewsAPI's query
+length limit, so one request covers many symbols. Each query's response is
+cached for NEWS_CACHE_TTL_SECONDS. Later requests ask only for articles
+published since the newest one already seen (`from`), and send the last
+ETag (If-None-Match) in case the server honours it.
+
+Articles are deduplicated by normalised URL (or a title/source hash when
+there is no URL) and routed into per-symbol HeadlineStreams, which hand
+out the latest titles.
+
+Adding a symbol to a query only rewrites the query string. The cache,
+cursor and budget state stay as they are, so registering hundreds of
+symbols costs no extra requests. The query's next refresh (after its TTL)
+goes back the full lookback window once, to backfill the new members.
+
+Every HTTP request spends one token from a bucket refilled at
+NEWS_DAILY_QUOTA per day, shared by every symbol in the process. When the
+bucket is empty, or NewsAPI reports a rate limit, callers get the cached
+headlines instead of an error, so the quota can never run dry mid-day.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
 import requests
-import os
 
-from config import NEWSAPI_KEY
+from utils.metrics import inc, register_gauge, timed
+
+from config import (
+    NEWSAPI_KEY,
+    NEWS_PAGE_SIZE,
+    NEWS_FETCH_TIMEOUT,
+    NEWS_CACHE_TTL_SECONDS,
+    NEWS_DAILY_QUOTA,
+    NEWS_BURST,
+    NEWS_LOOKBACK_HOURS,
+    NEWS_QUERY_MAX_CHARS,
+    NEWS_STREAM_SIZE
+)
+
+NEWSAPI_URL = "https://newsapi.org/v2/everything"
+MAX_PAGE_SIZE = 100  # NewsAPI's cap per request
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `capacity` banked."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after the upstream reports a rate limit."""
+        with self._lock:
+            self._tokens = 0.0
+            self._updated = time.monotonic()
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+def article_key(article: dict) -> str:
+    """Dedup key: URL without query/fragment, else a hash of title and source."""
+    url = article.get("url")
+    if url:
+        parts = urlsplit(url.strip())
+        return f"{parts.netloc.lower()}{parts.path.rstrip('/')}"
+    source = (article.get("source") or {}).get("name") or ""
+    text = f"{(article.get('title') or '').strip().lower()}|{source.lower()}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class HeadlineStream:
+    """Deduplicated headlines for one symbol, newest first."""
+
+    def __init__(self, symbol: str, max_size: int = NEWS_STREAM_SIZE):
+        self.symbol = symbol
+        self.max_size = max_size
+        self._articles = []             # (publishedAt, title), newest first
+        self._keys = OrderedDict()      # dedup keys, bounded
+        self._lock = threading.Lock()
+
+    def add(self, articles) -> int:
+        """Merge articles in; returns how many were new."""
+        added = 0
+        with self._lock:
+            for article in articles:
+                title = article.get("title")
+                if not title:
+                    continue
+                key = article_key(article)
+                if key in self._keys:
+                    continue
+                self._keys[key] = None
+                self._articles.append((article.get("publishedAt") or "", title))
+                added += 1
+            if added:
+                self._articles.sort(key=lambda a: a[0], reverse=True)
+                del self._articles[self.max_size:]
+                while len(self._keys) > self.max_size * 4:
+                    self._keys.popitem(last=False)
+        return added
+
+    def latest(self, n: int = NEWS_PAGE_SIZE) -> list:
+        with self._lock:
+            return [title for _, title in self._articles[:n]]
+
+
+class _Query:
+    """One NewsAPI query covering a group of symbols, plus its cached response state."""
+
+    def __init__(self):
+        self.terms = {}          # symbol -> search term
+        self.names = {}          # symbol -> words that attribute an article to it
+        self.q = ""
+        self.fetched_at = None
+        self.newest = None       # newest publishedAt seen (ISO string)
+        self.etag = None
+        self.backfill = False    # members added since the last fetch need the full lookback
+        self.generation = 0      # bumped by rebuild(); a fetch only clears backfill for what it asked
+        self.lock = threading.Lock()
+
+    def rebuild(self):
+        self.q = " OR ".join(self.terms.values())
+        # The ETag belonged to the old query string; the TTL and cursor stay
+        self.etag = None
+        self.backfill = True
+        self.generation += 1
+
+
+class NewsService:
+    """
+    Shared, budgeted NewsAPI access for every symbol in the process.
+
+    :param api_key: NewsAPI key
+    :param ttl: Seconds a query's cached response is served without asking NewsAPI
+    :param bucket: TokenBucket every request draws from
+    """
+
+    def __init__(self, api_key=NEWSAPI_KEY, ttl=NEWS_CACHE_TTL_SECONDS, bucket=None,
+                 max_query_chars=NEWS_QUERY_MAX_CHARS, lookback_hours=NEWS_LOOKBACK_HOURS,
+                 timeout=NEWS_FETCH_TIMEOUT):
+        self.api_key = api_key
+        self.ttl = ttl
+        self.bucket = bucket or TokenBucket(NEWS_DAILY_QUOTA / 86400.0, NEWS_BURST)
+        self.max_query_chars = max_query_chars
+        self.lookback = timedelta(hours=lookback_hours)
+        self.timeout = timeout
+        self._streams = {}
+        self._queries = []
+        self._query_of = {}      # symbol -> _Query
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "not_modified": 0, "cache_hits": 0, "budget_denied": 0,
+                        "rate_limited": 0, "errors": 0, "articles": 0, "duplicates": 0}
+
+    def register(self, symbol: str, company_name: str = None) -> HeadlineStream:
+        """Add a symbol to a shared query (existing groups keep their members)."""
+        symbol = symbol.upper()
+        with self._lock:
+            stream = self._streams.get(symbol)
+            if stream is not None:
+                return stream
+            stream = self._streams[symbol] = HeadlineStream(symbol)
+
+            term, names = f'"{symbol}"', [symbol]
+            if company_name and company_name.upper() != symbol:
+                term = f'({term} OR "{company_name}")'
+                names.append(company_name)
+            query = self._queries[-1] if self._queries else None
+            if query is None or len(query.q) + len(term) + 4 > self.max_query_chars:
+                query = _Query()
+                self._queries.append(query)
+            query.terms[symbol] = term
+            query.names[symbol] = names
+            query.rebuild()
+            self._query_of[symbol] = query
+            return stream
+
+    def stream(self, symbol: str) -> HeadlineStream:
+        return self.register(symbol)
+
+    def refresh(self, symbols=None, timeout=None) -> None:
+        """
+        Bring the queries covering `symbols` (default: all) up to date, within budget.
+
+        :param timeout: Seconds per NewsAPI request (defaults to the service's timeout)
+        """
+        with self._lock:
+            if symbols is None:
+                queries = list(self._queries)
+            else:
+                queries = list({id(q): q for q in (self._query_of.get(s.upper()) for s in symbols) if q}.values())
+        for query in queries:
+            self._refresh_query(query, timeout or self.timeout)
+
+    def headlines(self, symbol: str, n: int = NEWS_PAGE_SIZE) -> list:
+        return self.stream(symbol).latest(n)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts, symbols=len(self._streams), queries=len(self._queries),
+                        tokens=round(self.bucket.tokens, 2))
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counts[name] += n
+        inc("mcp_news_events_total", n, help="NewsAPI service events", event=name)
+
+    def _refresh_query(self, query, timeout):
+        with query.lock:
+            if query.fetched_at is not None and time.monotonic() - query.fetched_at < self.ttl:
+                self._count("cache_hits")
+                return
+            if not self.bucket.try_acquire():
+                # Out of budget: keep serving what the streams already hold
+                self._count("budget_denied")
+                return
+
+            generation = query.generation
+            since = query.newest
+            if since is None or query.backfill:
+                since = (datetime.now(timezone.utc) - self.lookback).strftime("%Y-%m-%dT%H:%M:%SZ")
+            params = {"q": query.q, "from": since, "sortBy": "publishedAt", "language": "en",
+                      "pageSize": MAX_PAGE_SIZE, "apiKey": self.api_key}
+            headers = {"If-None-Match": query.etag} if query.etag else {}
+
+            self._count("requests")
+            try:
+                with timed("newsapi_request"):
+                    response = requests.get(NEWSAPI_URL, params=params, headers=headers, timeout=timeout)
+                if response.status_code == 304:
+                    self._count("not_modified")
+                    query.fetched_at = time.monotonic()
+                    return
+                data = response.json()
+            except (requests.RequestException, ValueError) as e:
+                self._count("errors")
+                print(f"[news_fetcher] Error fetching news for {', '.join(query.terms)}: {e}")
+                return
+
+            if response.status_code in (426, 429) or data.get("code") == "rateLimited":
+                self._count("rate_limited")
+                self.bucket.drain()
+                print(f"[news_fetcher] NewsAPI rate limit hit: {data.get('message', response.status_code)}")
+                return
+            if response.status_code != 200:
+                self._count("errors")
+                print(f"[news_fetcher] NewsAPI error {response.status_code}: {data.get('message')}")
+                return
+
+            articles = data.get("articles") or []
+            query.fetched_at = time.monotonic()
+            query.etag = response.headers.get("ETag")
+            if query.generation == generation:
+                query.backfill = False
+            if articles:
+                query.newest = max(a.get("publishedAt") or "" for a in articles) or query.newest
+            self._route(query, articles)
+
+    def _route(self, query, articles):
+        patterns = {s: re.compile("|".join(rf"\b{re.escape(n)}\b" for n in names), re.IGNORECASE)
+                    for s, names in query.names.items()}
+        added = matched = 0
+        for symbol, pattern in patterns.items():
+            relevant = [a for a in articles
+                        if pattern.search(f"{a.get('title') or ''} {a.get('description') or ''}")
+                        or len(patterns) == 1]
+            matched += len(relevant)
+            added += self._streams[symbol].add(relevant)
+        self._count("articles", added)
+        self._count("duplicates", matched - added)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_news_service() -> NewsService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = NewsService()
+            register_gauge("mcp_news_budget_tokens", lambda: _service.bucket.tokens,
+                           help="NewsAPI requests currently available in the token bucket")
+        return _service
+
+
+@timed("get_latest_headlines")
+def get_latest_headlines(symbol: str, company_name: str = "Apple", page_size: int = NEWS_PAGE_SIZE,
+                         timeout: float = NEWS_FETCH_TIMEOUT) -> list:
+    """
+    Fetch the most recent news headlines related to the stock/company.
+
+    Served from the shared NewsService: NewsAPI is only asked when the
+    symbol's query is past its TTL and the request budget allows it.
+
+    :param symbol: Stock ticker (e.g., AAPL)
+    :param company_name: Used in keyword search
+    :param page_size: Number of headlines to return
+    :param timeout: Seconds to wait for NewsAPI (connect and read)
+    :return: List of news titles, newest first (empty if none were found)
+    """
+    service = get_news_service()
+    service.register(symbol, company_name)
+    service.refresh([symbol], timeout=timeout)
+    return service.headlines(symbol, page_size)
 
+@timed("get_latest_headline")
 def get_latest_headline(symbol: str, company_name: str = "Apple") -> str:
     """
     Fetch the latest news headline related to the stock/company.
@@ -11,19 +341,5 @@ def get_latest_headline(symbol: str, company_name: str = "Apple") -> str:
     :param company_name: Used in keyword search
     :return: Latest news title (string)
     """
-    url = (
-    "https://newsapi.org/v2/everything?"
-    f"q={company_name} OR {symbol}&"
-    "sortBy=publishedAt&"
-    "language=en&"
-    "pageSize=3&"
-    "apiKey=" + NEWSAPI_KEY
-    )
-
-    response = requests.get(url)
-    data = response.json()
-
-    if response.status_code == 200 and data["articles"]:
-        return data["articles"][0]["title"] if data["articles"] else f"No recent news found for {company_name}."
-    else:
-        return f"No recent news found for {company_name}."
+    headlines = get_latest_headlines(symbol, company_name)
+    return headlines[0] if headlines else f"No recent news found for {company_name}."
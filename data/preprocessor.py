@@ -0,0 +1,171 @@
+# MCP-Stock-Tracker/data/preprocessor.py
+"""
+Vectorized cleaning of collector bars, one pass per batch.
+
+clean_bars() takes a multi-symbol long frame (or a symbol -> frame dict) and
+runs every step as column operations over all symbols at once:
+
+1. dtypes: OHLCV as float64, symbol upper-cased; rows without a close dropped
+2. timezones: timestamps converted to MARKET_TZ
+3. duplicates: one row per (symbol, timestamp), the last one wins
+4. gaps: missing intraday bars within a session are counted in `gap_bars`.
+   With PREPROCESS_GAP_POLICY="ffill" (the default is "flag") they are also
+   inserted as flat bars at the previous close with zero volume
+   (`filled`=True). Those bars reach the store and the live indicators, where
+   they pull ATR down and flatten RSI, so "ffill" is opt-in. Overnight and
+   weekend breaks are not gaps.
+5. flags: `zero_volume` for real bars that traded nothing, and `outlier`
+   for log returns more than PREPROCESS_OUTLIER_MAD median absolute
+   deviations from the symbol's median, or bars whose close lies outside
+   their high/low range. Flags never change prices.
+
+The result is sorted by (symbol, timestamp) with a fresh RangeIndex and
+numeric columns already float64, so the analysis code can use it as is
+without copying or coercing it again.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import MARKET_TZ, PREPROCESS_GAP_POLICY, PREPROCESS_OUTLIER_MAD
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+FLAG_COLUMNS = ("gap_bars", "filled", "zero_volume", "outlier")
+
+_DAY_NS = 86_400 * 10 ** 9
+_INTERVAL_UNITS = {"m": "minutes", "h": "hours", "d": "days", "wk": "weeks"}
+
+
+def interval_to_timedelta(interval: str):
+    """yfinance interval ("15m", "1h", "1d", "1wk") as a timedelta, or None if unknown ("1mo")."""
+    for suffix in ("wk", "m", "h", "d"):
+        if interval.endswith(suffix) and interval[:-len(suffix)].isdigit():
+            return timedelta(**{_INTERVAL_UNITS[suffix]: int(interval[:-len(suffix)])})
+    return None
+
+
+def clean_bars(frames, interval: str = "1h", tz: str = MARKET_TZ, gap_policy: str = PREPROCESS_GAP_POLICY,
+               outlier_mad: float = PREPROCESS_OUTLIER_MAD) -> pd.DataFrame:
+    """
+    :param frames: Long frame with a 'symbol' column, or dict symbol -> collector frame
+    :param interval: Bar interval of the input, used to find missing bars
+    :param gap_policy: "ffill" inserts missing intraday bars, "flag" only counts them
+    :return: Cleaned long frame (empty frame if nothing usable)
+    """
+    if gap_policy not in ("ffill", "flag"):
+        raise ValueError(f"gap_policy must be 'ffill' or 'flag', got {gap_policy!r}")
+
+    df = _to_long(frames)
+    time_col = _time_column(df)
+    if df.empty or time_col is None or "close" not in df.columns:
+        return pd.DataFrame()
+
+    df = _normalize(df, time_col, tz)
+    if df.empty:
+        return df
+
+    step = interval_to_timedelta(interval)
+    if step is not None and step < timedelta(days=1):
+        df = _fill_gaps(df, time_col, step, gap_policy)
+    else:
+        df["gap_bars"] = 0
+        df["filled"] = False
+
+    _flag(df, outlier_mad)
+    return df
+
+
+def split_by_symbol(df: pd.DataFrame) -> dict:
+    """symbol -> that symbol's rows (fresh index), from a cleaned long frame."""
+    if df.empty:
+        return {}
+    return {symbol: group.reset_index(drop=True) for symbol, group in df.groupby("symbol", sort=False)}
+
+
+def _to_long(frames):
+    if isinstance(frames, pd.DataFrame):
+        return frames
+    parts = [df.assign(symbol=symbol) for symbol, df in (frames or {}).items() if df is not None and not df.empty]
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+def _time_column(df):
+    for name in ("Datetime", "Date"):
+        if name in df.columns:
+            return name
+    return None
+
+
+def _normalize(df, time_col, tz):
+    df = df.assign(**{
+        time_col: pd.to_datetime(df[time_col], utc=True).dt.tz_convert(tz),
+        "symbol": _upper(df["symbol"]) if "symbol" in df.columns else "",
+        **{c: pd.to_numeric(df[c], errors="coerce").astype("float64") for c in PRICE_COLUMNS if c in df.columns}
+    })
+    df = df[df["close"].notna()]
+    df = df.sort_values(["symbol", time_col], kind="stable")
+    return df.drop_duplicates(subset=["symbol", time_col], keep="last").reset_index(drop=True)
+
+
+def _upper(symbols):
+    # Upper-case each distinct symbol once instead of every row
+    codes, uniques = pd.factorize(symbols)
+    return pd.Index(uniques).astype(str).str.upper().take(codes).to_numpy()
+
+
+def _fill_gaps(df, time_col, step, gap_policy):
+    times = df[time_col]
+    stamps = times.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy().view("int64")
+    symbols = df["symbol"].to_numpy()
+    sessions = times.dt.tz_localize(None).to_numpy().view("int64") // _DAY_NS
+    step_ns = int(step.total_seconds() * 1e9)
+
+    # Bars missing before each row, counted only within one symbol's session
+    same = (symbols[1:] == symbols[:-1]) & (sessions[1:] == sessions[:-1])
+    missing = np.zeros(len(df), dtype="int64")
+    missing[1:] = np.where(same, np.maximum((stamps[1:] - stamps[:-1]) // step_ns - 1, 0), 0)
+
+    df["gap_bars"] = missing
+    df["filled"] = False
+    total = int(missing.sum())
+    if gap_policy != "ffill" or total == 0:
+        return df
+
+    rows = np.flatnonzero(missing)
+    counts = missing[rows]
+    source = np.repeat(rows - 1, counts)
+    k = np.arange(1, total + 1) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    fill = df.iloc[source].reset_index(drop=True)
+    fill[time_col] = fill[time_col] + pd.to_timedelta(k * step_ns, unit="ns")
+    for column in ("open", "high", "low"):
+        if column in fill.columns:
+            fill[column] = fill["close"]
+    extra = [c for c in fill.columns if c not in (time_col, "symbol", "close", "open", "high", "low")
+             and c not in FLAG_COLUMNS and pd.api.types.is_numeric_dtype(fill[c])]
+    fill[extra] = 0.0  # volume, dividends, splits
+    fill["gap_bars"] = 0
+    fill["filled"] = True
+
+    df = pd.concat([df, fill], ignore_index=True)
+    return df.sort_values(["symbol", time_col], kind="stable").reset_index(drop=True)
+
+
+def _flag(df, outlier_mad):
+    if "volume" in df.columns:
+        df["zero_volume"] = (df["volume"] == 0) & ~df["filled"]
+    else:
+        df["zero_volume"] = False
+
+    by_symbol = df["symbol"]
+    returns = np.log(df["close"] / df["close"].groupby(by_symbol).shift())
+    deviation = (returns - returns.groupby(by_symbol).transform("median")).abs()
+    mad = deviation.groupby(by_symbol).transform("median")
+    outlier = (deviation > outlier_mad * 1.4826 * mad) & (mad > 0)
+
+    if "high" in df.columns and "low" in df.columns:
+        tolerance = 1e-9 * df["close"].abs()
+        outlier |= (df["close"] > df["high"] + tolerance) | (df["close"] < df["low"] - tolerance)
+    df["outlier"] = outlier.fillna(False).astype(bool)
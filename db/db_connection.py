@@ -1,11 +1,150 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+
 import psycopg2
-from config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS
+from psycopg2 import extensions
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+from config import (
+    DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS,
+    DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT, DB_POOL_PING_SECONDS,
+    DB_CONNECT_TIMEOUT, DB_STATEMENT_TIMEOUT_MS
+)
+
+# Neither connecting nor a single statement may hang a worker indefinitely
+_TIMEOUTS = {
+    "connect_timeout": DB_CONNECT_TIMEOUT,
+    "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+}
 
 def get_connection():
+    """Open a dedicated, unpooled connection. Prefer pooled_connection()."""
     return psycopg2.connect(
         host=DB_HOST,
         port=DB_PORT,
         dbname=DB_NAME,
         user=DB_USER,
-        password=DB_PASS
-    )
\ No newline at end of file
+        password=DB_PASS,
+        **_TIMEOUTS
+    )
+
+
+class ConnectionPool:
+    """
+    Thread-safe, size-capped Postgres connection pool.
+
+    psycopg2's ThreadedConnectionPool raises as soon as it is exhausted, so a
+    semaphore makes callers wait (up to timeout seconds) for a free slot
+    instead. Connections are health-checked on checkout: closed or broken
+    ones are discarded, and ones idle longer than ping_after are pinged first.
+    """
+
+    def __init__(self, minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX, timeout=DB_POOL_TIMEOUT,
+                 ping_after=DB_POOL_PING_SECONDS):
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self._pool = ThreadedConnectionPool(
+            minconn, maxconn,
+            host=DB_HOST,
+            port=DB_PORT,
+            dbname=DB_NAME,
+            user=DB_USER,
+            password=DB_PASS,
+            **_TIMEOUTS
+        )
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._idle_since = {}
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolError(f"No database connection free after {self.timeout}s")
+        try:
+            # Every stale connection we throw away frees a slot for a fresh one
+            for _ in range(self.maxconn + 1):
+                conn = self._pool.getconn()
+                if self._healthy(conn):
+                    return conn
+                self._discard(conn)
+            raise PoolError("Could not obtain a healthy database connection")
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, discard=False):
+        try:
+            if discard or conn.closed:
+                self._discard(conn)
+            else:
+                self._idle_since[id(conn)] = time.monotonic()
+                self._pool.putconn(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        self._pool.closeall()
+
+    def _healthy(self, conn):
+        if conn.closed:
+            return False
+        if conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+
+        idle_since = self._idle_since.get(id(conn))
+        if idle_since is None or time.monotonic() - idle_since < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        self._idle_since.pop(id(conn), None)
+        try:
+            self._pool.putconn(conn, close=True)
+        except PoolError:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """The process-wide pool, created on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+                atexit.register(_pool.close)
+    return _pool
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrow a pooled connection for one unit of work.
+
+    Commits when the block exits cleanly, rolls back on error, and always
+    returns the connection to the pool (dropping it if it is broken).
+    """
+    pool = get_pool()
+    conn = pool.acquire()
+    broken = False
+    try:
+        yield conn
+        conn.commit()
+    except Exception as e:
+        broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        if not conn.closed:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+        raise
+    finally:
+        pool.release(conn, discard=broken)
@@ -1,3 +1,6 @@
+from utils.metrics import timed
+
+@timed("db_insert_headline")
 def insert_headline(conn, symbol, text, source="NewsAPI"):
     with conn.cursor() as cursor:
         cursor.execute("""
@@ -7,6 +10,7 @@ def insert_headline(conn, symbol, text, source="NewsAPI"):
         """, (symbol, text, source))
         return cursor.fetchone()[0]
 
+@timed("db_insert_nlp_analysis")
 def insert_nlp_analysis(conn, sentiment, confidence, model="FinBERT"):
     with conn.cursor() as cursor:
         cursor.execute("""
@@ -0,0 +1,209 @@
+# MCP-Stock-Tracker/db/write_pipeline.py
+"""
+Buffered, transactional write path for a cycle's signal, headlines and NLP rows.
+
+run_bot submits one record per symbol per cycle. A background thread
+batches records and writes each batch in a single transaction: one
+multi-row INSERT for headlines, one for nlp_analysis (both RETURNING id),
+then one for trades with headline_id / nlp_id pointing at the record's
+newest headline. Batches flush when WRITE_BATCH_SIZE records are buffered
+or the oldest has waited WRITE_FLUSH_SECONDS. The queue is bounded, so a
+slow database pushes back on submitters instead of growing without limit.
+"""
+
+import atexit
+import queue
+import threading
+import time
+
+from psycopg2.extras import execute_values
+
+from config import (
+    WRITE_BATCH_SIZE,
+    WRITE_FLUSH_SECONDS,
+    WRITE_QUEUE_SIZE,
+    WRITE_SUBMIT_TIMEOUT,
+    WRITE_MAX_RETRIES
+)
+from db.db_connection import pooled_connection
+from trades.trade_logger import SIGNAL_COLUMNS, signal_row
+from utils.metrics import inc, observe, register_gauge, timed
+
+_STOP = object()
+
+
+class WritePipeline:
+
+    def __init__(self, batch_size=WRITE_BATCH_SIZE, flush_seconds=WRITE_FLUSH_SECONDS,
+                 max_queue=WRITE_QUEUE_SIZE, max_retries=WRITE_MAX_RETRIES):
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.max_retries = max_retries
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def submit(self, signal: dict, headlines: list = (), timeout=WRITE_SUBMIT_TIMEOUT) -> bool:
+        """
+        Queue one cycle's rows for writing.
+
+        :param signal: log_signal keyword arguments (headline_id / nlp_id are filled in)
+        :param headlines: Dicts with symbol, text, source, sentiment, confidence, model;
+                          the first one is linked from the trades row
+        :param timeout: Seconds to wait for queue space before dropping the record
+        :return: True if queued
+        """
+        self._ensure_started()
+        try:
+            self._queue.put((signal, list(headlines)), timeout=timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            print(f"[write_pipeline] Queue full, dropped record for {signal.get('symbol')}")
+            return False
+
+        with self._stats_lock:
+            self.submitted += 1
+        return True
+
+    def close(self, timeout=30):
+        """Flush everything still buffered and stop the writer thread, waiting at most `timeout` seconds."""
+        if self._thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print(f"[write_pipeline] Queue still full after {timeout}s; "
+                  f"{self._queue.qsize()} pending records are not written")
+        else:
+            self._thread.join(max(0.0, deadline - time.monotonic()))
+        self._thread = None
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "pending": self._queue.qsize()
+            }
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-pipeline", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush_with_retry(batch)
+
+    def _flush_with_retry(self, batch):
+        for attempt in range(self.max_retries + 1):
+            try:
+                with timed("db_flush"):
+                    self._flush(batch)
+                with self._stats_lock:
+                    self.written += len(batch)
+                    self.batches += 1
+                inc("mcp_db_records_written_total", len(batch), help="Signal records committed")
+                observe("mcp_db_batch_records", len(batch), buckets=(1, 5, 10, 25, 50, 100, 200, 500, 1000),
+                        help="Records per write transaction")
+                return
+            except Exception as e:
+                print(f"[write_pipeline] Batch of {len(batch)} failed (attempt {attempt + 1}): {e}")
+                if attempt < self.max_retries:
+                    time.sleep(min(2 ** attempt, 30))
+
+        with self._stats_lock:
+            self.dropped += len(batch)
+        inc("mcp_db_records_dropped_total", len(batch), help="Signal records dropped after retries")
+        print(f"[write_pipeline] Dropped batch of {len(batch)} records after {self.max_retries + 1} attempts")
+
+    def _flush(self, batch):
+        headline_rows, nlp_rows = [], []
+        for _, headlines in batch:
+            for h in headlines:
+                headline_rows.append((h["symbol"], h["text"], h.get("source", "NewsAPI")))
+                nlp_rows.append((h["sentiment"], h["confidence"], h.get("model", "FinBERT")))
+
+        with pooled_connection() as conn, conn.cursor() as cursor:
+            headline_ids, nlp_ids = [], []
+            if headline_rows:
+                headline_ids = [r[0] for r in execute_values(
+                    cursor,
+                    "INSERT INTO headlines (symbol, headline_text, source) VALUES %s RETURNING id",
+                    headline_rows, page_size=len(headline_rows), fetch=True
+                )]
+                nlp_ids = [r[0] for r in execute_values(
+                    cursor,
+                    "INSERT INTO nlp_analysis (sentiment, confidence, model_used) VALUES %s RETURNING id",
+                    nlp_rows, page_size=len(nlp_rows), fetch=True
+                )]
+
+            trade_rows = []
+            offset = 0
+            for signal, headlines in batch:
+                linked = dict(signal)
+                if headlines:
+                    linked["headline_id"] = headline_ids[offset]
+                    linked["nlp_id"] = nlp_ids[offset]
+                offset += len(headlines)
+                trade_rows.append(signal_row(**linked))
+
+            execute_values(
+                cursor,
+                f"INSERT INTO trades ({', '.join(SIGNAL_COLUMNS)}) VALUES %s",
+                trade_rows, page_size=len(trade_rows)
+            )
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline() -> WritePipeline:
+    """The process-wide write pipeline; flushed on interpreter exit."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = WritePipeline()
+                atexit.register(_pipeline.close)
+                register_gauge("mcp_db_write_queue_pending", lambda: _pipeline.stats()["pending"],
+                               help="Records waiting in the write pipeline queue")
+    return _pipeline
+
+
+def submit_signal(signal: dict, headlines: list = ()) -> bool:
+    return get_pipeline().submit(signal, headlines)
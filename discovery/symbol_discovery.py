@@ -1,51 +1,192 @@
 # MCP-Stock-Tracker/discovery/symbol_discovery.py
+"""
+Symbol discovery.
+
+Candidate symbols come from pluggable sources (Yahoo trending, the
+day_gainers / day_losers / most_actives screeners, a static watchlist).
+Sources are queried concurrently, each with its own timeout, so a slow or
+failing endpoint costs at most DISCOVERY_TIMEOUT and never the whole run.
+
+Symbols are ranked by how high they appear and in how many sources
+(weighted), optionally capped at DISCOVERY_MAX_SYMBOLS, and written to
+tracked_symbols in a single transaction: one bulk upsert (execute_values)
+refreshes last_seen, then one UPDATE deactivates every symbol not seen for
+DISCOVERY_STALE_DAYS.
+
+New sources register with @register_source("name") and take the number of
+symbols wanted; list them in DISCOVERY_SOURCES to enable them.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
 
-from yahoo_fin import stock_info as si
-import psycopg2
-from datetime import datetime
-import os
 import requests
+from psycopg2.extras import execute_values
+
+from db.db_connection import pooled_connection
+from utils.metrics import timed
+from config import (
+    DISCOVERY_SOURCES,
+    DISCOVERY_WATCHLIST,
+    DISCOVERY_TIMEOUT,
+    DISCOVERY_SOURCE_LIMIT,
+    DISCOVERY_MAX_SYMBOLS,
+    DISCOVERY_STALE_DAYS
+)
+
+YAHOO_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+TRENDING_URL = "https://query1.finance.yahoo.com/v1/finance/trending/US"
+SCREENER_URL = "https://query1.finance.yahoo.com/v1/finance/screener/predefined/saved"
+
+# Plain tickers only: no indices (^GSPC), futures or FX pairs (CL=F, EUR=X)
+_SYMBOL_RE = re.compile(r"[A-Z][A-Z0-9.\-]{0,9}")
+
+# name -> fetch(limit) -> list of symbols, most relevant first
+SOURCES = {}
+
+# How much a first place in each source counts when ranking; unlisted sources weigh 1.0
+SOURCE_WEIGHTS = {"watchlist": 3.0, "trending": 1.5}
+
+
+def register_source(name):
+    def decorator(func):
+        SOURCES[name] = func
+        return func
+    return decorator
+
+
+def _yahoo_quotes(url, params):
+    response = requests.get(url, params=params, headers=YAHOO_HEADERS, timeout=DISCOVERY_TIMEOUT)
+    response.raise_for_status()
+    quotes = response.json()["finance"]["result"][0]["quotes"]
+    return [item["symbol"] for item in quotes if "symbol" in item]
+
+
+@register_source("trending")
+def get_trending_symbols(limit=DISCOVERY_SOURCE_LIMIT):
+    return _yahoo_quotes(TRENDING_URL, {"count": limit})[:limit]
+
+
+def _screener(scr_id):
+    def fetch(limit=DISCOVERY_SOURCE_LIMIT):
+        return _yahoo_quotes(SCREENER_URL, {"scrIds": scr_id, "count": limit})[:limit]
+    return fetch
+
+
+for _scr_id in ("day_gainers", "day_losers", "most_actives"):
+    register_source(_scr_id)(_screener(_scr_id))
 
-from db.db_connection import get_connection
-
-def get_trending_symbols():
-    try:
-        url = "https://query1.finance.yahoo.com/v1/finance/trending/US"
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers)
-        data = response.json()
-        quotes = data["finance"]["result"][0]["quotes"]
-        return [item["symbol"] for item in quotes][:10]
-    except Exception as e:
-        print("Error fetching Yahoo trending symbols:", e)
-        return []
 
-def update_tracked_symbols(symbols):
-    conn = get_connection()
-    cursor = conn.cursor()
+@register_source("watchlist")
+def get_watchlist_symbols(limit=None):
+    return [s.strip() for s in DISCOVERY_WATCHLIST.split(",") if s.strip()]
 
+
+def clean_symbols(symbols):
+    """Upper-cased, de-duplicated plain tickers, order preserved."""
+    seen = {}
     for symbol in symbols:
-        cursor.execute("""
+        symbol = str(symbol).strip().upper()
+        if _SYMBOL_RE.fullmatch(symbol):
+            seen.setdefault(symbol, None)
+    return list(seen)
+
+
+def collect_candidates(sources=None, limit=DISCOVERY_SOURCE_LIMIT, timeout=DISCOVERY_TIMEOUT):
+    """
+    Query sources concurrently.
+
+    :param sources: Source names; defaults to DISCOVERY_SOURCES
+    :return: source name -> cleaned symbol list (failed or timed-out sources are omitted)
+    """
+    names = sources or [s.strip() for s in DISCOVERY_SOURCES.split(",") if s.strip()]
+    unknown = [name for name in names if name not in SOURCES]
+    for name in unknown:
+        print(f"[discovery] Unknown source '{name}' ignored")
+    names = [name for name in names if name in SOURCES]
+    if not names:
+        return {}
+
+    pool = ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="mcp-discovery")
+    futures = {pool.submit(SOURCES[name], limit): name for name in names}
+    done, pending = wait(futures, timeout=timeout)
+    # Do not wait for stragglers; requests' own timeout ends them shortly
+    pool.shutdown(wait=False)
+
+    results = {}
+    for future in done:
+        name = futures[future]
+        try:
+            results[name] = clean_symbols(future.result())
+        except Exception as e:
+            print(f"[discovery] Source '{name}' failed: {e}")
+    for future in pending:
+        print(f"[discovery] Source '{futures[future]}' timed out after {timeout}s")
+    return results
+
+
+def rank_symbols(candidates, max_symbols=DISCOVERY_MAX_SYMBOLS):
+    """
+    Rank symbols across sources: each appearance scores weight * (1 - position / source size),
+    so symbols near the top of several sources come first.
+
+    :return: Symbols, best first (at most max_symbols when it is positive)
+    """
+    scores = {}
+    for name, symbols in candidates.items():
+        weight = SOURCE_WEIGHTS.get(name, 1.0)
+        for position, symbol in enumerate(symbols):
+            scores[symbol] = scores.get(symbol, 0.0) + weight * (1 - position / len(symbols))
+    ranked = sorted(scores, key=lambda symbol: (-scores[symbol], symbol))
+    return ranked[:max_symbols] if max_symbols > 0 else ranked
+
+
+def update_tracked_symbols(symbols, stale_after=timedelta(days=DISCOVERY_STALE_DAYS)):
+    """
+    Upsert symbols as active with a fresh last_seen and deactivate the ones
+    not seen within stale_after, in one transaction.
+
+    :return: (rows upserted, rows deactivated)
+    """
+    now = datetime.now()
+    rows = [(symbol.upper(), now) for symbol in symbols]
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        execute_values(cursor, """
             INSERT INTO tracked_symbols (symbol, last_seen, active)
-            VALUES (%s, %s, TRUE)
+            VALUES %s
             ON CONFLICT (symbol)
             DO UPDATE SET last_seen = EXCLUDED.last_seen, active = TRUE;
-        """, (symbol.upper(), datetime.now()))
+        """, rows, template="(%s, %s, TRUE)", page_size=1000)
+        upserted = len(rows)
+
+        cursor.execute("""
+            UPDATE tracked_symbols SET active = FALSE
+            WHERE active = TRUE AND (last_seen IS NULL OR last_seen < %s);
+        """, (now - stale_after,))
+        deactivated = cursor.rowcount
+    return upserted, deactivated
 
-    conn.commit()
-    cursor.close()
-    conn.close()
 
+@timed("discovery")
 def run_discovery():
-    print("[DEBUG] Discovery started")  # Add this line
-    symbols = get_trending_symbols()
-    print("[DEBUG] Symbols pulled:", symbols)  # Add this line
-    if symbols:
-        print("Discovered symbols:", symbols)
-        update_tracked_symbols(symbols)
-    else:
-        print("No symbols discovered.")
-        
+    print("[discovery] Discovery started")
+    candidates = collect_candidates()
+    for name, symbols in sorted(candidates.items()):
+        print(f"[discovery] {name}: {len(symbols)} symbols")
+
+    symbols = rank_symbols(candidates)
+    if not symbols:
+        # Every source failing must not deactivate the whole universe
+        print("[discovery] No symbols discovered; tracked_symbols left unchanged.")
+        return []
+
+    print(f"[discovery] Discovered {len(symbols)} symbols: {', '.join(symbols[:20])}"
+          f"{' ...' if len(symbols) > 20 else ''}")
+    upserted, deactivated = update_tracked_symbols(symbols)
+    print(f"[discovery] Upserted {upserted}, deactivated {deactivated} stale symbols")
+    return symbols
+
 
 if __name__ == "__main__":
     run_discovery()
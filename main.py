@@ -1,43 +1,95 @@
+import argparse
+import asyncio
 import os
-import schedule
+import threading
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-from db.db_connection import get_connection
-from db.log_helpers import insert_headline, insert_nlp_analysis
+from db.db_connection import pooled_connection
+from db.write_pipeline import get_pipeline, submit_signal
+from trades.executor import get_executor
 
-from data.collector import fetch_price_data
-from analysis.signal_generator import generate_signals, generate_signals_detailed
-from analysis.risk_assessor import assess_risk
-from analysis.nlp_insights import analyze_sentiment
+from data.bar_buffer import frame_timestamps
+from data.bar_store import get_bar_buffer, get_bars, get_bars_many, time_column
+from analysis.streaming_indicators import generate_signals_from_buffer, generate_signals_streaming
+from analysis.streaming_risk import assess_risk_from_buffer, assess_risk_streaming
+from analysis.nlp_insights import analyze_sentiment_batch, get_cache_stats, warm_up
 
-from trades.trade_logger import log_signal
-from data.news_fetcher import get_latest_headline
+from data.news_fetcher import get_latest_headlines, get_news_service
+from utils.cycle_state import cycle_fingerprint, oldest_heartbeat_age, record_cycle, should_skip_cycle
+from utils.metrics import profile_cycle, register_gauge, start_metrics_server, timed
+from utils.scheduler import Scheduler
 
 from config import (
     SIGNAL_STRENGTH_THRESHOLD,
-    BOT_VERSION
+    PAPER_TRADING,
+    BOT_VERSION,
+    ENGINE_WORKERS,
+    SHARD_INDEX,
+    SHARD_COUNT,
+    FINBERT_WARMUP,
+    PRICE_INTERVAL_SECONDS,
+    NEWS_INTERVAL_SECONDS,
+    SENTIMENT_INTERVAL_SECONDS,
+    BAR_ANCHOR_SECONDS,
+    SCHEDULE_SETTLE_SECONDS,
+    PRICE_SPREAD_SECONDS,
+    SCHEDULER_WORKERS,
+    SCHEDULER_STATS_SECONDS,
+    PROFILE_MODE
 )
 
+# symbol -> {"headlines", "sentiments", "fetched_at"}; filled by the news and
+# sentiment tasks so price cycles do not call NewsAPI themselves
+_news = {}
+_news_lock = threading.Lock()
 
-print(f"[BOOT] MCP container starting for SYMBOL={os.getenv('SYMBOL')}", flush=True)
 
-def run_bot():
-    symbol = os.getenv("SYMBOL", "AAPL")
+@timed("symbol_cycle")
+def run_bot(symbol=None, df=None):
+    symbol = symbol or os.getenv("SYMBOL", "AAPL")
     print(f"[{datetime.now()}] Running analysis for {symbol}")
     
-    df = fetch_price_data(symbol, period="7d", interval="1h")
+    # Only bars newer than the last stored one are downloaded
+    if df is None:
+        df = get_bars(symbol, period="7d", interval="1h")
     if df.empty:
         print(f"[{symbol}] No data to analyze.")
         return
 
-    # Use the enhanced signal generator with symbol-specific config
-    signal = generate_signals_detailed(df, symbol)
-    
-    # Extract the basic fields for compatibility with existing code
-    action = signal["action"]
-    reason = signal["reason"] 
-    confidence = signal["confidence"]
+    # With 1h bars most cycles see the same bar, headlines and strategy as the
+    # last one; those only touch the heartbeat
+    headlines = latest_headlines(symbol)
+    fingerprint = cycle_fingerprint(symbol, df, headlines)
+    if should_skip_cycle(symbol, fingerprint):
+        print(f"[{symbol}] Inputs unchanged since the last published cycle; skipped")
+        return
+
+    signal, risk = score_prices(symbol, df)
+    sentiments = headline_sentiments(symbol, headlines)
+    publish_signal(symbol, df, signal, risk, headlines, sentiments)
+    record_cycle(symbol, fingerprint)
+
+
+def score_prices(symbol, df):
+    """Signal and risk for the newest bar. Returns (signal, risk)."""
+    # bar_store keeps the newest bars in a NumPy ring buffer; the streaming
+    # engines read it directly and only fold in bars they have not seen yet.
+    # The buffer holds more history than df, so it is read from df's first
+    # bar on, and only used when it has exactly df's bars
+    buffer = get_bar_buffer(symbol, "1h")
+    since = None
+    if buffer is not None and len(buffer):
+        since = int(frame_timestamps(df, time_column(df))[0])
+        if len(buffer) - buffer.index_of(since) != len(df):
+            buffer = None
+
+    if buffer is not None:
+        signal = generate_signals_from_buffer(buffer, symbol, since)
+    else:
+        signal = generate_signals_streaming(df, symbol)
     
     # Optional: Log the detailed breakdown for analysis
     if "details" in signal and signal["details"]:
@@ -45,15 +97,80 @@ def run_bot():
         print(f"[{symbol}] Component breakdown:")
         for component, data in signal['details'].get('components', {}).items():
             print(f"  - {component}: {data['signal']} (contrib: {data['contribution']:.2f})")
-            
-    market_price = df.iloc[-1]['close']
-    risk = assess_risk(df)
 
+    if buffer is not None:
+        risk = assess_risk_from_buffer(buffer, symbol, since)
+    else:
+        risk = assess_risk_streaming(df, symbol)
+    return signal, risk
+
+
+def fetch_headlines(symbol):
+    """Latest headlines for a symbol, or a single placeholder if there are none."""
     company_name = symbol
-    headline = get_latest_headline(symbol, company_name)
-    print(f"[{symbol}] Latest headline: {headline}")
+    headlines = get_latest_headlines(symbol, company_name) or [f"No recent news found for {company_name}."]
+    print(f"[{symbol}] Latest headline: {headlines[0]}")
+    return headlines
+
 
-    sentiment = analyze_sentiment(headline)
+def refresh_headlines(symbol):
+    """News task: fetch headlines; changed headlines are queued for sentiment scoring."""
+    headlines = fetch_headlines(symbol)
+    with _news_lock:
+        entry = _news.get(symbol)
+        if entry is None or entry["headlines"] != headlines:
+            _news[symbol] = {"headlines": headlines, "sentiments": None, "fetched_at": time.monotonic()}
+        else:
+            entry["fetched_at"] = time.monotonic()
+
+
+def refresh_sentiments(symbols=None):
+    """Sentiment task: score every symbol's unscored headlines in one batched pass."""
+    with _news_lock:
+        pending = {s: e["headlines"] for s, e in _news.items()
+                   if e["sentiments"] is None and (symbols is None or s in symbols)}
+    if not pending:
+        return
+
+    scored = iter(analyze_sentiment_batch([h for headlines in pending.values() for h in headlines]))
+    with _news_lock:
+        for symbol, headlines in pending.items():
+            sentiments = [next(scored) for _ in headlines]
+            entry = _news.get(symbol)
+            # Headlines may have been refreshed again while the model was running
+            if entry is not None and entry["headlines"] == headlines:
+                entry["sentiments"] = sentiments
+
+
+def latest_headlines(symbol):
+    """Cached headlines for a symbol, fetched inline if the news task has not run lately."""
+    with _news_lock:
+        entry = _news.get(symbol)
+        stale = entry is None or time.monotonic() - entry["fetched_at"] > 2 * NEWS_INTERVAL_SECONDS
+    if stale:
+        refresh_headlines(symbol)
+    with _news_lock:
+        return _news[symbol]["headlines"]
+
+
+def headline_sentiments(symbol, headlines):
+    """Sentiments for headlines, reusing the sentiment task's scores when they match."""
+    with _news_lock:
+        entry = _news.get(symbol)
+        sentiments = entry["sentiments"] if entry is not None and entry["headlines"] == headlines else None
+    if sentiments is None:
+        # Score every fetched headline in one batched pass; the newest drives the summary
+        sentiments = analyze_sentiment_batch(headlines)
+        with _news_lock:
+            if symbol in _news and _news[symbol]["headlines"] == headlines:
+                _news[symbol]["sentiments"] = sentiments
+    return sentiments
+
+
+def publish_signal(symbol, df, signal, risk, headlines, sentiments):
+    """Combine signal, risk and sentiment, apply the strength gate and queue the write."""
+    market_price = df.iloc[-1]['close']
+    sentiment = sentiments[0]
     sentiment_summary = f"{sentiment['sentiment'].capitalize()} ({sentiment['confidence']})"
 
     confidence = signal['confidence']
@@ -71,34 +188,211 @@ def run_bot():
         signal['action'] = "HOLD"
         signal['reason'] = f"Signal strength {signal_strength} below threshold ({SIGNAL_STRENGTH_THRESHOLD})"
 
-    log_signal(
-        symbol=symbol,
-        action=signal['action'],
-        reason=signal['reason'],
-        market_price=float(market_price),
-        confidence=float(signal['confidence']) if signal['confidence'] is not None else None,
-        risk=float(risk['risk_score']) if risk['risk_score'] is not None else None,
-        sentiment=sentiment_summary,
-        signal_strength=signal_strength,
-        executed=False,
-        source=BOT_VERSION
+    # Gated signals are filled against the in-memory paper portfolio; a fill
+    # is logged at its execution price with executed=True
+    fill = get_executor().on_signal(symbol, signal['action'], float(market_price)) if PAPER_TRADING else None
+    if fill:
+        market_price = fill['price']
+        signal['reason'] = (f"{signal['reason']} | Paper fill: {fill['side']} {fill['qty']} @ {fill['price']}"
+                            f" (fee {fill['fee']}, realized {fill['realized_pnl']})")
+        print(f"[{symbol}] Paper fill: {fill}")
+
+    # Signal, headlines and NLP rows are written together (and linked) by the write pipeline
+    submit_signal(
+        dict(
+            symbol=symbol,
+            action=signal['action'],
+            reason=signal['reason'],
+            market_price=float(market_price),
+            confidence=float(signal['confidence']) if signal['confidence'] is not None else None,
+            risk=float(risk['risk_score']) if risk['risk_score'] is not None else None,
+            sentiment=sentiment_summary,
+            signal_strength=signal_strength,
+            executed=fill is not None,
+            source=BOT_VERSION
+        ),
+        [
+            {"symbol": symbol, "text": headline, "source": "NewsAPI",
+             "sentiment": scored["sentiment"], "confidence": scored["confidence"], "model": "FinBERT"}
+            for headline, scored in zip(headlines, sentiments)
+        ]
     )
 
     print(f"[{symbol}] Signal Logged: {signal}")
 
-    conn = get_connection()
-    insert_headline(conn, symbol=symbol, text=headline, source="NewsAPI")
-    insert_nlp_analysis(conn, sentiment=sentiment["sentiment"], confidence=sentiment["confidence"], model="FinBERT")
-    conn.close()
 
+def get_active_symbols():
+    """Return every active symbol from tracked_symbols."""
+    with pooled_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT symbol FROM tracked_symbols WHERE active = TRUE ORDER BY symbol")
+        return [r[0] for r in cur.fetchall()]
+
+
+def in_shard(symbol, shard_index=SHARD_INDEX, shard_count=SHARD_COUNT):
+    """Stable symbol -> shard assignment so every engine owns a disjoint slice."""
+    if shard_count <= 1:
+        return True
+    return zlib.crc32(symbol.upper().encode("utf-8")) % shard_count == shard_index
+
+
+def run_symbol(symbol, df=None):
+    # One bad symbol must not take the rest of the cycle down with it
+    try:
+        # cProfile only sees the calling thread, so it samples symbol cycles
+        # on the worker that runs them
+        with profile_cycle("engine_symbol", mode="cprofile" if PROFILE_MODE == "cprofile" else ""):
+            run_bot(symbol, df)
+    except Exception as e:
+        print(f"[{symbol}] Cycle failed: {e}", flush=True)
+
+
+def run_all(pool, symbols=None, shard_index=SHARD_INDEX, shard_count=SHARD_COUNT):
+    """
+    Run one cycle for every symbol in this engine's shard on a shared worker pool.
+
+    :param pool: ThreadPoolExecutor reused across cycles
+    :param symbols: Explicit symbol list; defaults to the active rows in tracked_symbols
+    :param shard_index: Which shard this engine owns (0-based)
+    :param shard_count: Total number of engine shards
+    :return: The symbols this engine owned in this cycle (None if they could not be loaded)
+    """
+    if symbols is None:
+        try:
+            symbols = get_active_symbols()
+        except Exception as e:
+            print(f"[ENGINE] Could not load tracked symbols: {e}", flush=True)
+            return None
+
+    owned = [s for s in symbols if in_shard(s, shard_index, shard_count)]
+    print(f"[ENGINE] Cycle start: {len(owned)} symbols (shard {shard_index}/{shard_count})", flush=True)
+
+    started = time.monotonic()
+
+    # tracemalloc traces every worker, so its report covers the whole cycle
+    with profile_cycle("engine", mode="tracemalloc" if PROFILE_MODE == "tracemalloc" else ""), \
+            timed("engine_cycle"):
+        # One bulk download for the whole shard instead of a request per symbol
+        bars, failures = get_bars_many(owned, period="7d", interval="1h")
+        for symbol in failures:
+            print(f"[{symbol}] No data to analyze.")
+
+        list(pool.map(run_symbol, list(bars), list(bars.values())))
+    print(f"[ENGINE] Cycle complete in {time.monotonic() - started:.1f}s "
+          f"(sentiment cache: {get_cache_stats()}, writes: {get_pipeline().stats()})", flush=True)
+    return owned
+
+
+def refresh_news(symbols):
+    """Engine news task: one budgeted NewsAPI pass for the shard, then update every symbol."""
+    service = get_news_service()
+    for symbol in symbols:
+        service.register(symbol, symbol)
+    service.refresh(symbols)
+    for symbol in symbols:
+        refresh_headlines(symbol)  # served from the service's cache
+    print(f"[NEWS] {service.stats()}", flush=True)
+
+
+def log_scheduler_stats(scheduler):
+    for name, stats in scheduler.stats().items():
+        print(f"[SCHEDULER] {name}: {stats}", flush=True)
+    if PAPER_TRADING:
+        print(f"[PAPER] {get_executor().summary()}", flush=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="MCP trading bot")
+    parser.add_argument("--all", action="store_true",
+                        help="Run every active symbol (or this engine's shard) in one process")
+    parser.add_argument("--symbols", help="Comma-separated symbols to run instead of tracked_symbols")
+    parser.add_argument("--workers", type=int, default=ENGINE_WORKERS)
+    parser.add_argument("--shard-index", type=int, default=SHARD_INDEX)
+    parser.add_argument("--shard-count", type=int, default=SHARD_COUNT)
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run the pipeline on an asyncio event loop (concurrent fetches, timeouts)")
+    return parser.parse_args()
+
+
+async def run_async(args, symbols):
+    # Imported here: async_runner builds on the pipeline stages defined above
+    from async_runner import AsyncRunner
+
+    if not (args.all or symbols):
+        symbols = [os.getenv("SYMBOL", "AAPL")]
+    print(f"[BOOT] MCP async engine starting (concurrency={args.workers}, "
+          f"shard={args.shard_index}/{args.shard_count})", flush=True)
+
+    runner = AsyncRunner(symbols, args.workers, args.shard_index, args.shard_count)
+    if FINBERT_WARMUP:
+        started = time.monotonic()
+        await asyncio.get_running_loop().run_in_executor(runner.inference_pool, warm_up)
+        print(f"[BOOT] FinBERT warmed up in {time.monotonic() - started:.1f}s", flush=True)
+    try:
+        await runner.run_forever()
+    finally:
+        runner.close()
+
+
+def main():
+    args = parse_args()
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()] if args.symbols else None
+
+    register_gauge("mcp_cycle_heartbeat_age_seconds", oldest_heartbeat_age,
+                   help="Seconds since the least recently cycled symbol last ran (skipped or not)")
+    start_metrics_server()
+
+    if args.use_async:
+        asyncio.run(run_async(args, symbols))
+        return
+
+    if FINBERT_WARMUP:
+        started = time.monotonic()
+        warm_up()
+        print(f"[BOOT] FinBERT warmed up in {time.monotonic() - started:.1f}s", flush=True)
+
+    # Price ticks land just after each bar close (and every PRICE_INTERVAL_SECONDS
+    # in between); news and sentiment run on their own slower cadences, each at
+    # a deterministic phase so containers and symbols do not fire in lockstep
+    scheduler = Scheduler(max_workers=SCHEDULER_WORKERS)
+    price_grid = dict(anchor=BAR_ANCHOR_SECONDS, settle=SCHEDULE_SETTLE_SECONDS,
+                      spread=min(PRICE_SPREAD_SECONDS, PRICE_INTERVAL_SECONDS))
+
+    if args.all or symbols:
+        print(f"[BOOT] MCP engine starting (workers={args.workers}, "
+              f"shard={args.shard_index}/{args.shard_count})", flush=True)
+        pool = ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="mcp-worker")
+
+        owned = []
+
+        def prices():
+            result = run_all(pool, symbols, args.shard_index, args.shard_count)
+            if result is not None:
+                owned[:] = result
+
+        scheduler.add("prices", prices, PRICE_INTERVAL_SECONDS, overrun="coalesce",
+                      key=f"shard-{args.shard_index}", **price_grid)
+        scheduler.add("news", lambda: refresh_news(list(owned)), NEWS_INTERVAL_SECONDS,
+                      spread=NEWS_INTERVAL_SECONDS, key=f"shard-{args.shard_index}")
+        scheduler.add("sentiment", refresh_sentiments, SENTIMENT_INTERVAL_SECONDS,
+                      overrun="coalesce", spread=SENTIMENT_INTERVAL_SECONDS, key=f"shard-{args.shard_index}")
+    else:
+        symbol = os.getenv("SYMBOL", "AAPL")
+        print(f"[BOOT] MCP container starting for SYMBOL={symbol}", flush=True)
+        def price():
+            with profile_cycle(symbol):
+                run_bot(symbol)
+
+        scheduler.add(f"price:{symbol}", price, PRICE_INTERVAL_SECONDS,
+                      overrun="coalesce", key=symbol, **price_grid)
+        scheduler.add(f"news:{symbol}", lambda: refresh_headlines(symbol), NEWS_INTERVAL_SECONDS,
+                      spread=NEWS_INTERVAL_SECONDS, key=symbol)
+        scheduler.add(f"sentiment:{symbol}", lambda: refresh_sentiments([symbol]),
+                      SENTIMENT_INTERVAL_SECONDS, overrun="coalesce",
+                      spread=SENTIMENT_INTERVAL_SECONDS, key=symbol)
 
-# Initial run
-run_bot()
+    scheduler.add("scheduler-stats", lambda: log_scheduler_stats(scheduler), SCHEDULER_STATS_SECONDS)
+    scheduler.run_forever()
 
-# Schedule every 15 minutes
-schedule.every(1).minutes.do(run_bot)
 
 if __name__ == "__main__":
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    main()
@@ -1,93 +1,299 @@
-# MCP-Stock-Tracker/orchestration/container_orchestrator.py
+# MCP-Stock-Tracker/orchestration/container_orchestration.py
+"""
+Declarative reconciler for per-symbol bot containers.
 
-import docker
+Each pass compares the desired state (one running `mcp-<symbol>` container
+per active row in tracked_symbols, built from the current image and
+environment) with what Docker reports in a single containers.list call, then
+applies only the difference:
+
+- start:   active symbol with no container
+- restart: up-to-date container that is not running
+- replace: container whose spec (image id, environment, network) changed
+- stop:    container for a symbol that is no longer active (stopped and removed)
+
+Actions run in parallel, capped at ORCHESTRATOR_CONCURRENCY. Replacements
+are rolled out ORCHESTRATOR_ROLLOUT_BATCH per pass, and the rollout holds
+while any already-updated container is not running, so a bad image stops
+after one batch. Containers carry mcp.* labels that record their symbol and
+spec hash; unlabelled `mcp-<symbol>` containers from older launches are
+adopted by name and replaced as outdated.
+
+    python -m orchestration.container_orchestration            # one pass
+    python -m orchestration.container_orchestration --watch    # keep reconciling
+
+Per-symbol containers and the multi-symbol engine (`main.py --all`, the
+mcp-engine service in docker-compose.yml) are alternative deployments: both
+would analyse every active symbol and write its trades. While an engine
+container is running, the reconciler therefore wants no per-symbol
+containers and stops any that are left.
+
+Reconciler takes the Docker client as a parameter, so a fake client can stand
+in for it; the real one is created lazily on first use.
+"""
+
+import argparse
+import hashlib
+import json
 import os
-from db.db_connection import get_connection  
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db.db_connection import pooled_connection
+from utils.metrics import inc, timed
+from config import (
+    ORCHESTRATOR_IMAGE,
+    ORCHESTRATOR_NETWORK,
+    ORCHESTRATOR_CONCURRENCY,
+    ORCHESTRATOR_ROLLOUT_BATCH,
+    ORCHESTRATOR_STOP_TIMEOUT,
+    ORCHESTRATOR_INTERVAL
+)
 
 # Constants
-IMAGE_NAME = "mcp-stock-tracker"
 CONTAINER_PREFIX = "mcp-"
+ENGINE_PREFIX = "mcp-engine"
+SYMBOL_LABEL = "mcp.symbol"
+SPEC_LABEL = "mcp.spec"
+ACTIONS = ("start", "restart", "replace", "stop")
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Shared Docker client, created on first use with a connection pool sized for the action pool."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            import docker
+            _client = docker.from_env(max_pool_size=ORCHESTRATOR_CONCURRENCY)
+        return _client
+
+
+def container_name(symbol):
+    return f"{CONTAINER_PREFIX}{symbol.lower()}"
+
+
+def container_environment(symbol):
+    return {
+        "PYTHONUNBUFFERED": "1",
+        "SYMBOL": symbol,
+        "DB_HOST": os.getenv("DB_HOST", "192.168.1.202"),
+        "DB_PORT": os.getenv("DB_PORT", "5432"),
+        "DB_NAME": os.getenv("DB_NAME", "trading_db"),
+        "DB_USER": os.getenv("DB_USER", "trading_user"),
+        "DB_PASS": os.getenv("DB_PASS", "Blank-Salamander-Car2"),
+        "BOT_VERSION": os.getenv("BOT_VERSION", "MCP-BOT:v0.0.1"),
+        "NEWSAPI_KEY": os.getenv("NEWSAPI_KEY", "8cd5d073ac044228b83f76d8166a3352"),
+
+        "RISK_THRESHOLD": os.getenv("RISK_THRESHOLD", "0.5"),
+        "CONFIDENCE_THRESHOLD": os.getenv("CONFIDENCE_THRESHOLD", "0.6"),
+        "SIGNAL_STRENGTH_THRESHOLD": os.getenv("SIGNAL_STRENGTH_THRESHOLD", "0.4")
+    }
+
+
+def container_spec(image_id, environment, network=ORCHESTRATOR_NETWORK):
+    """Short hash of everything a running container is built from."""
+    payload = json.dumps({"image": image_id, "env": environment, "network": network}, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def get_symbol_states():
+    """symbol -> active flag for every row of tracked_symbols (one query)."""
+    with pooled_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT symbol, active FROM tracked_symbols")
+        return {symbol.upper(): bool(active) for symbol, active in cur.fetchall()}
+
+
+def plan_actions(desired, observed, rollout_batch=ORCHESTRATOR_ROLLOUT_BATCH):
+    """
+    Diff desired against observed state.
+
+    :param desired: symbol -> spec hash for every symbol that should be running
+    :param observed: symbol -> {"container", "name", "state", "spec"} from Reconciler.observe
+    :return: action -> sorted symbols, plus "held": outdated symbols left for later passes
+    """
+    plan = {action: [] for action in ACTIONS}
+    outdated = []
+    for symbol in sorted(set(desired) | set(observed)):
+        current = observed.get(symbol)
+        if symbol not in desired:
+            plan["stop"].append(symbol)
+        elif current is None:
+            plan["start"].append(symbol)
+        elif current["spec"] != desired[symbol]:
+            outdated.append(symbol)
+        elif current["state"] != "running":
+            plan["restart"].append(symbol)
+
+    # An updated container that is not running may be a bad image: finish
+    # restarting it before replacing any more
+    if plan["restart"] or any(observed[s]["state"] == "restarting" for s in observed
+                              if s in desired and observed[s]["spec"] == desired[s]):
+        batch = 0
+    else:
+        batch = max(rollout_batch, 0)
+    plan["replace"], plan["held"] = outdated[:batch], outdated[batch:]
+    return plan
+
+
+class Reconciler:
+    """
+    :param client: Docker client (docker.DockerClient or a stand-in); defaults to get_client()
+    :param concurrency: Docker actions applied at the same time
+    :param rollout_batch: Outdated containers replaced per pass
+    """
+
+    def __init__(self, client=None, image=ORCHESTRATOR_IMAGE, network=ORCHESTRATOR_NETWORK,
+                 concurrency=ORCHESTRATOR_CONCURRENCY, rollout_batch=ORCHESTRATOR_ROLLOUT_BATCH,
+                 stop_timeout=ORCHESTRATOR_STOP_TIMEOUT):
+        self._client = client
+        self.image = image
+        self.network = network
+        self.concurrency = max(1, concurrency)
+        self.rollout_batch = rollout_batch
+        self.stop_timeout = stop_timeout
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_client()
+        return self._client
+
+    def list_containers(self):
+        """(name, state, labels, container) for every mcp-* container, from one list call."""
+        listed = []
+        for container in self.client.containers.list(all=True, sparse=True, filters={"name": CONTAINER_PREFIX}):
+            attrs = container.attrs
+            name = (attrs.get("Names") or [attrs.get("Name") or ""])[0].lstrip("/")
+            labels = attrs.get("Labels") or (attrs.get("Config") or {}).get("Labels") or {}
+            state = attrs.get("State")
+            if isinstance(state, dict):
+                state = state.get("Status")
+            listed.append((name, state, labels, container))
+        return listed
+
+    def observe(self, known_symbols, listed=None):
+        """
+        symbol -> container info for every managed container.
+        Unlabelled containers count only if their name matches a tracked symbol.
+        """
+        observed = {}
+        for name, state, labels, container in (self.list_containers() if listed is None else listed):
+            symbol = labels.get(SYMBOL_LABEL)
+            if symbol is None:
+                if not name.startswith(CONTAINER_PREFIX) or name[len(CONTAINER_PREFIX):].upper() not in known_symbols:
+                    continue  # e.g. mcp-engine
+                symbol = name[len(CONTAINER_PREFIX):].upper()
+
+            observed[symbol] = {"container": container, "name": name, "state": state,
+                                "spec": labels.get(SPEC_LABEL)}
+        return observed
+
+    @timed("reconcile")
+    def reconcile_once(self, dry_run=False):
+        """One observe / diff / apply pass. Returns the plan."""
+        states = get_symbol_states()
+        image_id = self.client.images.get(self.image).id
+        listed = self.list_containers()
+        engines = [name for name, state, labels, _ in listed
+                   if name.startswith(ENGINE_PREFIX) and SYMBOL_LABEL not in labels and state == "running"]
+        if engines:
+            print(f"[RECONCILE] {', '.join(engines)} already covers every active symbol; "
+                  f"no per-symbol containers wanted")
+            desired = {}
+        else:
+            desired = {symbol: container_spec(image_id, container_environment(symbol), self.network)
+                       for symbol, active in states.items() if active}
+        observed = self.observe(states, listed)
+        plan = plan_actions(desired, observed, self.rollout_batch)
+
+        summary = ", ".join(f"{action} {len(plan[action])}" for action in ACTIONS + ("held",))
+        print(f"[RECONCILE] desired {len(desired)}, observed {len(observed)}: {summary}")
+        if plan["held"]:
+            print(f"[ROLLOUT] {len(plan['held'])} outdated containers wait for a later pass")
+        if not dry_run:
+            self.apply(plan, observed, image_id, desired)
+        return plan
+
+    def apply(self, plan, observed, image_id, desired):
+        """Run the plan's actions in parallel; failures are logged and retried next pass."""
+        jobs = [(action, symbol) for action in ACTIONS for symbol in plan[action]]
+        if not jobs:
+            return {}
+
+        def run(job):
+            action, symbol = job
+            try:
+                if action in ("stop", "replace"):
+                    self._remove(observed[symbol])
+                if action in ("start", "replace"):
+                    self._launch(symbol, image_id, desired[symbol])
+                if action == "restart":
+                    observed[symbol]["container"].start()
+                inc("mcp_orchestrator_actions_total", help="Container actions applied",
+                    action=action, outcome="ok")
+                return None
+            except Exception as e:
+                inc("mcp_orchestrator_actions_total", help="Container actions applied",
+                    action=action, outcome="error")
+                print(f"[RECONCILE] {action} {symbol} failed: {e}")
+                return job
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(jobs)),
+                                thread_name_prefix="mcp-orchestrator") as pool:
+            failed = [job for job in pool.map(run, jobs) if job is not None]
+        return {"applied": len(jobs) - len(failed), "failed": failed}
+
+    def watch(self, interval=ORCHESTRATOR_INTERVAL, dry_run=False):
+        """Reconcile every `interval` seconds until interrupted."""
+        while True:
+            started = time.monotonic()
+            try:
+                self.reconcile_once(dry_run=dry_run)
+            except Exception as e:
+                print(f"[RECONCILE] Pass failed: {e}")
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def _launch(self, symbol, image_id, spec):
+        print(f"[LAUNCH] Starting container for: {symbol}")
+        self.client.containers.run(
+            image=image_id,
+            name=container_name(symbol),
+            environment=container_environment(symbol),
+            labels={SYMBOL_LABEL: symbol, SPEC_LABEL: spec},
+            detach=True,
+            restart_policy={"Name": "always"},
+            network=self.network
+        )
+
+    def _remove(self, current):
+        print(f"[STOP] Stopping and removing: {current['name']}")
+        container = current["container"]
+        if current["state"] in ("running", "restarting", "paused"):
+            container.stop(timeout=self.stop_timeout)
+        container.remove()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Reconcile per-symbol bot containers with tracked_symbols")
+    parser.add_argument("--watch", action="store_true", help="Keep reconciling instead of a single pass")
+    parser.add_argument("--interval", type=float, default=ORCHESTRATOR_INTERVAL,
+                        help="Seconds between passes with --watch")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without touching containers")
+    return parser.parse_args()
 
-# Docker client
-client = docker.from_env()
-
-def get_active_symbols():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT symbol FROM tracked_symbols WHERE active = TRUE")
-    results = cur.fetchall()
-    cur.close()
-    conn.close()
-    return [r[0] for r in results]
-
-def container_exists(name):
-    try:
-        client.containers.get(name)
-        return True
-    except docker.errors.NotFound:
-        return False
-    
-def get_inactive_symbols():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT symbol FROM tracked_symbols WHERE active = FALSE")
-    results = cur.fetchall()
-    cur.close()
-    conn.close()
-    return [r[0] for r in results]
-
-def cleanup_inactive_containers():
-    inactive_symbols = get_inactive_symbols()
-    print(f"[CLEANUP] Inactive symbols: {inactive_symbols}")
-
-    for symbol in inactive_symbols:
-        container_name = f"{CONTAINER_PREFIX}{symbol.lower()}"
-        try:
-            container = client.containers.get(container_name)
-            print(f"[CLEANUP] Stopping and removing: {container_name}")
-            container.stop()
-            container.remove()
-        except docker.errors.NotFound:
-            print(f"[CLEANUP] Container not found: {container_name} (already removed)")
-
-def launch_container(symbol):
-    container_name = f"{CONTAINER_PREFIX}{symbol.lower()}"
-    if container_exists(container_name):
-        print(f"[SKIP] Container already running: {container_name}")
-        return
-
-    print(f"[LAUNCH] Starting container for: {symbol}")
-
-    client.containers.run(
-        
-        image=IMAGE_NAME,
-        name=container_name,
-        environment={
-            "PYTHONUNBUFFERED": "1",
-            "SYMBOL": symbol,
-            "DB_HOST": os.getenv("DB_HOST", "192.168.1.202"),
-            "DB_PORT": os.getenv("DB_PORT", "5432"),
-            "DB_NAME": os.getenv("DB_NAME", "trading_db"),
-            "DB_USER": os.getenv("DB_USER", "trading_user"),
-            "DB_PASS": os.getenv("DB_PASS", "Blank-Salamander-Car2"),
-            "BOT_VERSION": os.getenv("BOT_VERSION", "MCP-BOT:v0.0.1"),
-            "NEWSAPI_KEY": os.getenv("NEWSAPI_KEY", "8cd5d073ac044228b83f76d8166a3352"),
-
-            "RISK_THRESHOLD": os.getenv("RISK_THRESHOLD", "0.5"),
-            "CONFIDENCE_THRESHOLD": os.getenv("CONFIDENCE_THRESHOLD", "0.6"),
-            "SIGNAL_STRENGTH_THRESHOLD": os.getenv("RISK_THRESHOLD", "0.4")
-        },
-        detach=True,
-        restart_policy={"Name": "always"},
-        network="mcp-stock-tracker_mcp-network"
-    )
 
 def main():
-    cleanup_inactive_containers()      
-    active_symbols = get_active_symbols()
-    print(f"[INFO] Active symbols: {active_symbols}")
-    for symbol in active_symbols:
-        launch_container(symbol)
+    args = parse_args()
+    reconciler = Reconciler()
+    if args.watch:
+        reconciler.watch(args.interval, dry_run=args.dry_run)
+    else:
+        reconciler.reconcile_once(dry_run=args.dry_run)
+
 
 if __name__ == "__main__":
     main()
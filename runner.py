@@ -41,11 +41,12 @@ def main():
     # Step 1: Run symbol discovery
     run_subprocess("Symbol Discovery", "python -m discovery.symbol_discovery")
 
-    # Step 2: Launch containers for active symbols
-    run_subprocess("Container Orchestration", "python -m orchestration.container_orchestration")
+    # Step 2: The mcp-engine service (docker-compose.yml) analyses every active
+    # symbol itself, so no per-symbol containers are launched here; see
+    # orchestration/container_orchestration.py for that alternative deployment
 
-    # Future Step 3: Run strategy evaluator
-    # run_subprocess("Strategy Evaluation", "python -m strategist.strategy_evaluator")
+    # Step 3: Sweep strategy parameters; winners are written as candidates for review
+    run_subprocess("Strategy Evaluation", "python -m strategist.strategy_evaluator")
 
     # Future Step 4: Run LLM strategist (optional)
     # run_subprocess("LLM Strategist", "python -m strategist.mcp_llm_strategist")
@@ -0,0 +1,287 @@
+# MCP-Stock-Tracker/strategist/strategy_evaluator.py
+"""
+Strategy parameter sweep.
+
+For each symbol, candidate configs are drawn (grid or random) from
+SEARCH_SPACE over the weights, thresholds and indicators blocks. They are
+backtested with analysis.backtester on the older bars only; the newest
+STRATEGY_HOLDOUT_FRACTION of each symbol's bars is held out of the sweep.
+
+A winner that beats the config the symbol uses today is written as a
+candidate to strategies/candidates/{symbol}_config.json for review. The
+hand-maintained strategies/symbol_specific/{symbol}_config.json is only
+replaced with --apply, and only if the winner also beats the current config
+on the held-out bars.
+
+Candidates are grouped by indicator windows. Each pool task takes one
+(symbol, windows) group, computes RSI/MACD/EMA once and scores every
+weight/threshold combination in the group against it. Bars and the
+config-independent risk series are shipped to each worker process once,
+through the pool initializer.
+
+Usage:
+    python -m strategist.strategy_evaluator [AAPL NVDA ...] [--samples 500] [--grid] [--apply]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from analysis.backtester import (
+    compute_indicators,
+    compute_risk,
+    gate_actions,
+    run_backtest,
+    score_bars,
+    simulate
+)
+from analysis.strategy_config import STRATEGY_DIR, get_strategy, symbol_config_path
+from config import OPTIMIZER_WORKERS, SIGNAL_STRENGTH_THRESHOLD, BACKTEST_FEE_BPS, STRATEGY_HOLDOUT_FRACTION
+
+SEARCH_SPACE = {
+    "weights": {
+        "rsi": [0.2, 0.3, 0.4, 0.5],
+        "macd": [0.2, 0.3, 0.4, 0.5],
+        "ema_trend": [0.2, 0.3, 0.4, 0.5]
+    },
+    "thresholds": {
+        "rsi_oversold": [25, 30, 35, 40, 45],
+        "rsi_overbought": [55, 60, 65, 70, 75],
+        "buy_threshold": [0.2, 0.3, 0.4, 0.5, 0.6],
+        "sell_threshold": [-0.2, -0.3, -0.4, -0.5, -0.6]
+    },
+    "indicators": {
+        "rsi_window": [7, 14, 21],
+        "ema_pair": [(9, 21), (12, 26), (20, 50)],
+        "macd": [(12, 26, 9), (8, 17, 9), (5, 35, 5)]
+    }
+}
+
+# Per-process state, filled once by _init_worker
+_frames = {}
+_risk = {}
+
+
+def _indicator_options(space):
+    block = space["indicators"]
+    for rsi_window, (ema_short, ema_long), (fast, slow, signal) in itertools.product(
+            block["rsi_window"], block["ema_pair"], block["macd"]):
+        yield {"rsi_window": rsi_window, "ema_short": ema_short, "ema_long": ema_long,
+               "macd_fast": fast, "macd_slow": slow, "macd_signal": signal}
+
+
+def _block_options(block):
+    keys = list(block)
+    for values in itertools.product(*(block[k] for k in keys)):
+        yield dict(zip(keys, values))
+
+
+def _valid(thresholds):
+    return (thresholds["rsi_oversold"] < thresholds["rsi_overbought"]
+            and thresholds["sell_threshold"] < thresholds["buy_threshold"])
+
+
+def generate_candidates(space=SEARCH_SPACE, samples=500, grid=False, seed=None) -> list:
+    """
+    :return: List of {"weights", "thresholds", "indicators"} candidate blocks;
+             the full cartesian product with grid=True, else `samples` random draws
+    """
+    indicator_options = list(_indicator_options(space))
+    weight_options = list(_block_options(space["weights"]))
+    threshold_options = [t for t in _block_options(space["thresholds"]) if _valid(t)]
+
+    if grid:
+        combos = itertools.product(indicator_options, weight_options, threshold_options)
+    else:
+        rng = random.Random(seed)
+        combos = ((rng.choice(indicator_options), rng.choice(weight_options), rng.choice(threshold_options))
+                  for _ in range(samples))
+
+    return [{"indicators": i, "weights": w, "thresholds": t} for i, w, t in combos]
+
+
+def objective(metrics, min_trades=5) -> float:
+    """Higher is better: total return, ignoring configs that barely trade."""
+    if metrics.get("trades", 0) < min_trades:
+        return float("-inf")
+    return metrics["total_return"]
+
+
+def _init_worker(frames):
+    _frames.update(frames)
+
+
+def _evaluate_group(symbol, indicators, scorings, threshold, fee_bps):
+    df = _frames[symbol]
+    if symbol not in _risk:
+        _risk[symbol] = compute_risk(df)
+    close = df['close'].to_numpy(dtype="float64")
+
+    # One indicator pass shared by every weight/threshold combination in the group
+    values = compute_indicators(df, indicators)
+    results = []
+    for scoring in scorings:
+        action, confidence = score_bars(values, scoring)
+        metrics = simulate(close, gate_actions(action, confidence, _risk[symbol], threshold), fee_bps)
+        results.append(({"indicators": indicators, **scoring}, metrics))
+    return symbol, results
+
+
+def evaluate(frames: dict, candidates: list, workers=None, threshold=SIGNAL_STRENGTH_THRESHOLD,
+             fee_bps=BACKTEST_FEE_BPS, min_trades=5) -> dict:
+    """
+    Backtest every candidate for every symbol across a process pool.
+
+    :return: symbol -> (best candidate blocks, metrics), or (None, None) if nothing qualified
+    """
+    groups = defaultdict(list)
+    for candidate in candidates:
+        key = tuple(sorted(candidate["indicators"].items()))
+        groups[key].append({"weights": candidate["weights"], "thresholds": candidate["thresholds"]})
+
+    best = {symbol: (None, None, float("-inf")) for symbol in frames}
+    workers = workers or OPTIMIZER_WORKERS or os.cpu_count()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(frames,)) as pool:
+        futures = [
+            pool.submit(_evaluate_group, symbol, dict(key), scorings, threshold, fee_bps)
+            for symbol in frames
+            for key, scorings in groups.items()
+        ]
+        for future in futures:
+            symbol, results = future.result()
+            for candidate, metrics in results:
+                score = objective(metrics, min_trades)
+                if score > best[symbol][2]:
+                    best[symbol] = (candidate, metrics, score)
+
+    return {symbol: (candidate, metrics) for symbol, (candidate, metrics, _) in best.items()}
+
+
+def candidate_config_path(symbol: str) -> str:
+    return os.path.join(STRATEGY_DIR, "candidates", f"{symbol}_config.json")
+
+
+def split_holdout(df, fraction=STRATEGY_HOLDOUT_FRACTION):
+    """(in-sample, held-out) bars: the newest `fraction` of the rows is held out."""
+    cut = len(df) - int(len(df) * fraction)
+    return df.iloc[:cut].reset_index(drop=True), df.iloc[cut:].reset_index(drop=True)
+
+
+def build_config(symbol, candidate, metrics, baseline_metrics, holdout=None):
+    """The symbol's current config with the winning blocks, and provenance in metadata."""
+    config = get_strategy(symbol).to_dict()
+    config.update({
+        "strategy_name": f"{symbol.lower()}_optimized",
+        "description": f"Parameter sweep result for {symbol}",
+        "created_date": date.today().isoformat(),
+        "weights": candidate["weights"],
+        "thresholds": candidate["thresholds"],
+        "indicators": candidate["indicators"],
+    })
+    notes = (
+        f"in-sample return {metrics['total_return']:.4f} vs {baseline_metrics['total_return']:.4f} baseline, "
+        f"max drawdown {metrics['max_drawdown']:.4f}, hit rate {metrics['hit_rate']}, "
+        f"{metrics['trades']} trades over {metrics['bars']} bars"
+    )
+    if holdout is not None:
+        candidate_oos, baseline_oos = holdout
+        notes += (f"; held-out return {candidate_oos['total_return']:.4f} vs "
+                  f"{baseline_oos['total_return']:.4f} baseline over {candidate_oos['bars']} bars")
+    config["metadata"] = {
+        "last_modified_by": "strategy_evaluator",
+        "modification_reason": "parameter_sweep",
+        "performance_notes": notes
+    }
+    return config
+
+
+def write_config(config, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(config, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _active_symbols():
+    from db.db_connection import pooled_connection
+
+    with pooled_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT symbol FROM tracked_symbols WHERE active = TRUE ORDER BY symbol")
+        return [r[0] for r in cur.fetchall()]
+
+
+def main():
+    from data.collector import fetch_price_data_many
+
+    parser = argparse.ArgumentParser(description="Sweep strategy parameters per symbol")
+    parser.add_argument("symbols", nargs="*", help="Defaults to the active tracked symbols")
+    parser.add_argument("--period", default="60d")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--grid", action="store_true", help="Exhaustive grid instead of random samples")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--min-trades", type=int, default=5)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--holdout", type=float, default=STRATEGY_HOLDOUT_FRACTION,
+                        help="Newest share of bars kept out of the sweep for validation")
+    parser.add_argument("--apply", action="store_true",
+                        help="Replace the live symbol config when the winner also wins on held-out bars")
+    parser.add_argument("--dry-run", action="store_true", help="Report results without writing configs")
+    args = parser.parse_args()
+
+    symbols = [s.upper() for s in args.symbols] or _active_symbols()
+    frames, failures = fetch_price_data_many(symbols, period=args.period, interval=args.interval)
+    for symbol, error in failures.items():
+        print(f"[strategy_evaluator] Skipping {symbol}: {error}")
+    if not frames:
+        print("[strategy_evaluator] No price data to evaluate.")
+        return
+
+    splits = {symbol: split_holdout(df, args.holdout) for symbol, df in frames.items()}
+    in_sample = {symbol: train for symbol, (train, _) in splits.items()}
+
+    candidates = generate_candidates(samples=args.samples, grid=args.grid, seed=args.seed)
+    print(f"[strategy_evaluator] {len(candidates)} candidates x {len(frames)} symbols")
+
+    best = evaluate(in_sample, candidates, workers=args.workers, min_trades=args.min_trades)
+    for symbol, (candidate, metrics) in best.items():
+        current = get_strategy(symbol)
+        baseline = run_backtest(in_sample[symbol], symbol)
+
+        if candidate is None or objective(metrics, args.min_trades) <= objective(baseline, 0):
+            print(f"[strategy_evaluator] {symbol}: keeping {current.name} "
+                  f"(baseline return {baseline['total_return']:.4f})")
+            continue
+
+        holdout = None
+        held_out = splits[symbol][1]
+        if not held_out.empty:
+            sweep_config = build_config(symbol, candidate, metrics, baseline)
+            holdout = (run_backtest(held_out, symbol, sweep_config), run_backtest(held_out, symbol))
+        config = build_config(symbol, candidate, metrics, baseline, holdout)
+        validated = holdout is not None and holdout[0]["total_return"] > holdout[1]["total_return"]
+
+        print(f"[strategy_evaluator] {symbol}: in-sample return {metrics['total_return']:.4f} "
+              f"vs baseline {baseline['total_return']:.4f}"
+              + (f", held-out {holdout[0]['total_return']:.4f} vs {holdout[1]['total_return']:.4f}"
+                 if holdout else ", no held-out bars"))
+        if args.dry_run:
+            continue
+
+        print(f"[strategy_evaluator] Wrote candidate {write_config(config, candidate_config_path(symbol))}")
+        if args.apply and validated:
+            print(f"[strategy_evaluator] Replaced {write_config(config, symbol_config_path(symbol))}")
+        elif args.apply:
+            print(f"[strategy_evaluator] {symbol}: not applied, no improvement on held-out bars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# MCP-Stock-Tracker/trades/executor.py
+"""
+Paper-trading execution engine.
+
+Signals that pass the strength gate are turned into simulated fills against
+one in-memory portfolio (cash plus a signed position per symbol):
+
+- BUY  when flat opens a long worth PAPER_ORDER_NOTIONAL, fee included
+       (capped by the cash left);
+       when short it covers the whole short.
+- SELL when long closes the position; when flat it opens a short of the
+       same size only if PAPER_ALLOW_SHORT is set.
+- HOLD, or an action that would not change the position, only marks the
+  symbol to the latest price.
+
+Fills are PAPER_SLIPPAGE_BPS worse than the signal's market price and pay
+max(PAPER_FEE_MIN, PAPER_FEE_BPS of notional). Realized PnL is booked
+against the average entry price; unrealized PnL uses the last price seen.
+
+Every decision is made from memory, so there are no per-order connections
+or lookups. The portfolio is written as JSON to PAPER_SNAPSHOT_PATH at most
+every PAPER_SNAPSHOT_SECONDS (and on exit), and restored from it on start.
+The caller records the fill itself: publish_signal queues the trades row
+through the write pipeline with executed=True.
+"""
+
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+from utils.metrics import inc, register_gauge
+from config import (
+    PAPER_STARTING_CASH,
+    PAPER_ORDER_NOTIONAL,
+    PAPER_SLIPPAGE_BPS,
+    PAPER_FEE_BPS,
+    PAPER_FEE_MIN,
+    PAPER_ALLOW_SHORT,
+    PAPER_SNAPSHOT_PATH,
+    PAPER_SNAPSHOT_SECONDS
+)
+
+
+class Position:
+    """Signed quantity (negative = short) and its bookkeeping."""
+    __slots__ = ("qty", "avg_price", "last_price", "realized_pnl", "fees", "fills")
+
+    def __init__(self, qty=0, avg_price=0.0, last_price=None, realized_pnl=0.0, fees=0.0, fills=0):
+        self.qty = qty
+        self.avg_price = avg_price
+        self.last_price = last_price
+        self.realized_pnl = realized_pnl
+        self.fees = fees
+        self.fills = fills
+
+    @property
+    def unrealized_pnl(self) -> float:
+        if not self.qty or self.last_price is None:
+            return 0.0
+        return (self.last_price - self.avg_price) * self.qty
+
+    def apply(self, qty, price):
+        """Book a signed fill of qty at price, realizing PnL on the part that reduces the position."""
+        if self.qty and (self.qty > 0) != (qty > 0):
+            closing = min(abs(qty), abs(self.qty))
+            self.realized_pnl += closing * (price - self.avg_price) * (1 if self.qty > 0 else -1)
+            remaining = self.qty + qty
+            if remaining == 0:
+                self.avg_price = 0.0
+            elif (remaining > 0) != (self.qty > 0):
+                self.avg_price = price  # flipped through zero
+            self.qty = remaining
+        else:
+            total = abs(self.qty) + abs(qty)
+            self.avg_price = (self.avg_price * abs(self.qty) + price * abs(qty)) / total
+            self.qty += qty
+        self.fills += 1
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class PaperExecutor:
+    """
+    :param cash: Starting cash (ignored when a snapshot is restored)
+    :param snapshot_path: JSON snapshot file; empty keeps state in memory only
+    """
+
+    def __init__(self, cash=PAPER_STARTING_CASH, order_notional=PAPER_ORDER_NOTIONAL,
+                 slippage_bps=PAPER_SLIPPAGE_BPS, fee_bps=PAPER_FEE_BPS, fee_min=PAPER_FEE_MIN,
+                 allow_short=PAPER_ALLOW_SHORT, snapshot_path=PAPER_SNAPSHOT_PATH,
+                 snapshot_seconds=PAPER_SNAPSHOT_SECONDS):
+        self.cash = float(cash)
+        self.order_notional = order_notional
+        self.slippage_bps = slippage_bps
+        self.fee_bps = fee_bps
+        self.fee_min = fee_min
+        self.allow_short = allow_short
+        self.snapshot_path = snapshot_path
+        self.snapshot_seconds = snapshot_seconds
+        self.positions = {}
+
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_snapshot = time.monotonic()
+        self._restore()
+
+    def on_signal(self, symbol: str, action: str, price: float):
+        """
+        Execute one gated signal.
+
+        :return: Fill dict (side, qty, price, fee, realized_pnl, position) or None if nothing traded
+        """
+        if price is None or not math.isfinite(price) or price <= 0:
+            return None
+
+        with self._lock:
+            position = self.positions.get(symbol)
+            if position is None:
+                position = self.positions[symbol] = Position()
+            position.last_price = float(price)
+            self._dirty = True
+
+            qty = self._order_qty(position, action, price)
+            fill = self._fill(symbol, position, qty, price) if qty else None
+
+        self.maybe_snapshot()
+        return fill
+
+    def summary(self) -> dict:
+        with self._lock:
+            market_value = sum(p.qty * p.last_price for p in self.positions.values()
+                               if p.qty and p.last_price is not None)
+            return {
+                "cash": round(self.cash, 2),
+                "equity": round(self.cash + market_value, 2),
+                "realized_pnl": round(sum(p.realized_pnl for p in self.positions.values()), 2),
+                "unrealized_pnl": round(sum(p.unrealized_pnl for p in self.positions.values()), 2),
+                "fees": round(sum(p.fees for p in self.positions.values()), 2),
+                "open_positions": sum(1 for p in self.positions.values() if p.qty)
+            }
+
+    def maybe_snapshot(self):
+        if self._dirty and time.monotonic() - self._last_snapshot >= self.snapshot_seconds:
+            self.snapshot()
+
+    def snapshot(self):
+        """Write the portfolio to snapshot_path atomically."""
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            state = {
+                "saved_at": datetime.now().isoformat(timespec="seconds"),
+                "cash": self.cash,
+                "positions": {symbol: p.to_dict() for symbol, p in self.positions.items()}
+            }
+            self._dirty = False
+            self._last_snapshot = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            print(f"[executor] Could not write snapshot {self.snapshot_path}: {e}")
+
+    def _order_qty(self, position, action, price):
+        """Signed quantity the action calls for, given the current position."""
+        if action == "BUY":
+            if position.qty < 0:
+                return -position.qty
+            if position.qty == 0:
+                return self._opening_qty(price, 1)
+        elif action == "SELL":
+            if position.qty > 0:
+                return -position.qty
+            if position.qty == 0 and self.allow_short:
+                return -self._opening_qty(price, -1)
+        return 0
+
+    def _opening_qty(self, price, side):
+        """Shares a new position can take so that notional plus fee fits the order size and the cash left."""
+        budget = min(self.order_notional, max(self.cash, 0.0))
+        fill_price = self._fill_price(price, side)
+        # fee = max(fee_min, notional * fee_bps), so both bounds must hold
+        qty = math.floor(min((budget - self.fee_min) / fill_price,
+                             budget / (fill_price * (1 + self.fee_bps / 10_000))))
+        return max(qty, 0)
+
+    def _fill_price(self, price, side):
+        return price * (1 + side * self.slippage_bps / 10_000)
+
+    def _fill(self, symbol, position, qty, price):
+        side = 1 if qty > 0 else -1
+        fill_price = self._fill_price(price, side)
+        fee = max(self.fee_min, abs(qty) * fill_price * self.fee_bps / 10_000)
+        realized_before = position.realized_pnl
+
+        position.apply(qty, fill_price)
+        position.fees += fee
+        self.cash -= qty * fill_price + fee
+
+        inc("mcp_paper_fills_total", help="Simulated paper-trading fills", side="BUY" if side > 0 else "SELL")
+        return {
+            "symbol": symbol,
+            "side": "BUY" if side > 0 else "SELL",
+            "qty": abs(qty),
+            "price": round(fill_price, 4),
+            "fee": round(fee, 4),
+            "realized_pnl": round(position.realized_pnl - realized_before, 2),
+            "position": position.qty
+        }
+
+    def _restore(self):
+        if not self.snapshot_path:
+            return
+        try:
+            with open(self.snapshot_path) as f:
+                state = json.load(f)
+            self.cash = float(state["cash"])
+            self.positions = {symbol: Position(**data) for symbol, data in state["positions"].items()}
+            print(f"[executor] Restored paper portfolio from {self.snapshot_path} "
+                  f"({len(self.positions)} symbols, cash {self.cash:.2f})")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[executor] Ignoring unreadable snapshot {self.snapshot_path}: {e}")
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> PaperExecutor:
+    """The process-wide paper portfolio; snapshotted on interpreter exit."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = PaperExecutor()
+                atexit.register(_executor.snapshot)
+                register_gauge("mcp_paper_equity", lambda: _executor.summary()["equity"],
+                               help="Paper portfolio cash plus marked positions")
+                register_gauge("mcp_paper_cash", lambda: _executor.cash, help="Paper portfolio cash")
+    return _executor
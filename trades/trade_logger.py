@@ -1,36 +1,39 @@
-import psycopg2
-from config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS
-
-def get_connection():
-    return psycopg2.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASS
-    )
+from db.db_connection import pooled_connection
+from utils.metrics import timed
 
 # Function to insert the properties of a trade into the SQL database 
+@timed("db_log_trade")
 def log_trade(symbol, action, reason, confidence, risk, sentiment):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO trades (
-              symbol
-            , action
-            , signal_reason
-            , confidence_score
-            , risk_score
-            , sentiment_summary
-            )
-        VALUES (%s, %s, %s, %s, %s, %s)
-    """, (symbol, action, reason, confidence, risk, sentiment))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO trades (
+                  symbol
+                , action
+                , signal_reason
+                , confidence_score
+                , risk_score
+                , sentiment_summary
+                )
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (symbol, action, reason, confidence, risk, sentiment))
 
-# Log signal data in the trades table
-def log_signal(
+SIGNAL_COLUMNS = (
+    "symbol",
+    "action",
+    "signal_reason",
+    "confidence_score",
+    "risk_score",
+    "market_price",
+    "signal_strength",
+    "is_executed",
+    "signal_only",
+    "source",
+    "headline_id",
+    "nlp_id"
+)
+
+# Coerce a signal into a trades row (column order matches SIGNAL_COLUMNS)
+def signal_row(
     symbol,
     action,
     reason,
@@ -44,25 +47,7 @@ def log_signal(
     headline_id=None,
     nlp_id=None
 ):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO trades (
-            symbol
-        , action
-        , signal_reason
-        , confidence_score
-        , risk_score
-        , market_price
-        , signal_strength
-        , is_executed
-        , signal_only
-        , source
-        , headline_id
-        , nlp_id
-        )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """, (
+    return (
         str(symbol),
         str(action),
         str(reason),
@@ -75,18 +60,48 @@ def log_signal(
         str(source),
         int(headline_id) if headline_id is not None else None,
         int(nlp_id) if nlp_id is not None else None
-    ))
+    )
 
-    conn.commit()
-    cursor.close()
-    conn.close()
+# Log signal data in the trades table
+@timed("db_log_signal")
+def log_signal(
+    symbol,
+    action,
+    reason,
+    market_price,
+    confidence=None,
+    risk=None,
+    sentiment=None,
+    signal_strength=None,
+    executed=False,
+    source="MCP-BOT",
+    headline_id=None,
+    nlp_id=None
+):
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO trades (
+                symbol
+            , action
+            , signal_reason
+            , confidence_score
+            , risk_score
+            , market_price
+            , signal_strength
+            , is_executed
+            , signal_only
+            , source
+            , headline_id
+            , nlp_id
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, signal_row(
+            symbol, action, reason, market_price, confidence, risk, sentiment,
+            signal_strength, executed, source, headline_id, nlp_id
+        ))
 
 # Function to receive the most recent trade executed by the system 
 def get_latest_trade():
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM trades ORDER BY id DESC LIMIT 1")
-    trade = cursor.fetchone()
-    cursor.close()
-    conn.close()
-    return trade
\ No newline at end of file
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT * FROM trades ORDER BY id DESC LIMIT 1")
+        return cursor.fetchone()
\ No newline at end of file
@@ -0,0 +1,65 @@
+# MCP-Stock-Tracker/utils/cycle_state.py
+"""
+Per-symbol cycle bookkeeping shared by the threaded (main.py) and asyncio
+(async_runner.py) runners.
+
+A cycle's fingerprint covers everything its output depends on. When it
+matches the last published cycle, the cycle is skipped (SKIP_UNCHANGED_CYCLES),
+at most until SKIP_MAX_SECONDS have passed. Every cycle, skipped or not,
+refreshes the symbol's heartbeat, which the
+mcp_cycle_heartbeat_age_seconds gauge reads.
+
+The state lives here rather than in main.py: `python main.py --async` runs
+main as __main__ while async_runner imports it again as `main`, and two
+copies of the dictionaries would leave the gauge reading the empty one.
+"""
+
+import hashlib
+import threading
+import time
+
+from analysis.strategy_config import get_strategy
+from data.bar_store import time_column
+from utils.metrics import inc
+from config import SKIP_UNCHANGED_CYCLES, SKIP_MAX_SECONDS
+
+# symbol -> (input fingerprint, monotonic time it was last published), and
+# symbol -> wall time of its last cycle, published or skipped
+_published = {}
+_heartbeats = {}
+_lock = threading.Lock()
+
+
+def cycle_fingerprint(symbol, df, headlines):
+    """Everything a cycle's output depends on: newest bar, headlines and strategy version."""
+    last = df.iloc[-1]
+    ts_col = time_column(df)
+    return (
+        str(last[ts_col]) if ts_col else len(df),
+        float(last['close']),
+        hashlib.sha1("\n".join(headlines).encode("utf-8")).hexdigest(),
+        get_strategy(symbol).version
+    )
+
+
+def should_skip_cycle(symbol, fingerprint):
+    """True if the last published cycle had the same fingerprint (and is not older than SKIP_MAX_SECONDS)."""
+    with _lock:
+        _heartbeats[symbol] = time.time()
+        previous = _published.get(symbol)
+    skip = (SKIP_UNCHANGED_CYCLES and previous is not None and previous[0] == fingerprint
+            and not (SKIP_MAX_SECONDS > 0 and time.monotonic() - previous[1] >= SKIP_MAX_SECONDS))
+    if skip:
+        inc("mcp_cycles_total", help="Symbol cycles by outcome", outcome="skipped")
+    return skip
+
+
+def record_cycle(symbol, fingerprint):
+    with _lock:
+        _published[symbol] = (fingerprint, time.monotonic())
+    inc("mcp_cycles_total", help="Symbol cycles by outcome", outcome="executed")
+
+
+def oldest_heartbeat_age():
+    with _lock:
+        return time.time() - min(_heartbeats.values()) if _heartbeats else None
@@ -0,0 +1,304 @@
+# MCP-Stock-Tracker/utils/metrics.py
+"""
+In-process metrics and per-cycle profiling.
+
+Stages are wrapped with the `timed` decorator / context manager, which
+records a latency histogram and an outcome counter per stage:
+
+    mcp_stage_seconds{stage="fetch_price_data"}        histogram
+    mcp_stage_calls_total{stage=..., outcome="ok"}     counter
+
+Plain counters (inc) and gauges read at scrape time (register_gauge) cover
+throughput and queue/cache state. render() produces the Prometheus text
+exposition format, and start_metrics_server() serves it on
+http://METRICS_HOST:METRICS_PORT/metrics from a daemon thread.
+
+profile_cycle() is an opt-in hook. With PROFILE_MODE=cprofile or
+tracemalloc, every PROFILE_EVERY-th cycle is profiled and the top entries are
+written under PROFILE_DIR. Otherwise it costs one counter increment.
+cProfile only sees the thread that entered profile_cycle(), while
+tracemalloc traces every thread, so one profile runs at a time.
+"""
+
+import bisect
+import cProfile
+import functools
+import io
+import math
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import METRICS_HOST, METRICS_PORT, PROFILE_MODE, PROFILE_EVERY, PROFILE_DIR
+
+# Seconds; spans a cache hit up to a slow model or network call
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Counters, histograms and callback gauges keyed by (name, labels)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._help = {}
+
+    def inc(self, name, value=1, help=None, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            if help:
+                self._help.setdefault(name, help)
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, help=None, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram(buckets)
+            hist.observe(value)
+            if help:
+                self._help.setdefault(name, help)
+
+    def register_gauge(self, name, func, help=None, **labels):
+        """Gauge whose value is func() at scrape time (None/NaN values are skipped)."""
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = func
+            if help:
+                self._help.setdefault(name, help)
+
+    def snapshot(self) -> dict:
+        """Counters and histogram count/sum as plain dicts (for logs and benchmarks)."""
+        with self._lock:
+            counters = {_series(n, l): v for (n, l), v in self._counters.items()}
+            hists = {_series(n, l): {"count": h.count, "sum": round(h.sum, 6)}
+                     for (n, l), h in self._histograms.items()}
+        return {"counters": counters, "histograms": hists}
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            hists = sorted((k, (list(h.buckets), list(h.counts), h.sum, h.count))
+                           for k, h in self._histograms.items())
+            gauges = sorted(self._gauges.items(), key=lambda item: item[0])
+            help_text = dict(self._help)
+
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                if name in help_text:
+                    lines.append(f"# HELP {name} {help_text[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, "counter")
+            lines.append(f"{_series(name, labels)} {_fmt(value)}")
+
+        for (name, labels), (buckets, counts, total, count) in hists:
+            header(name, "histogram")
+            cumulative = 0
+            for bound, n in zip(list(buckets) + [math.inf], counts):
+                cumulative += n
+                le = "+Inf" if bound == math.inf else _fmt(bound)
+                lines.append(f"{_series(name + '_bucket', labels + (('le', le),))} {cumulative}")
+            lines.append(f"{_series(name + '_sum', labels)} {_fmt(total)}")
+            lines.append(f"{_series(name + '_count', labels)} {count}")
+
+        for (name, labels), func in gauges:
+            try:
+                value = func()
+            except Exception:
+                continue
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                continue
+            header(name, "gauge")
+            lines.append(f"{_series(name, labels)} {_fmt(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _series(name, labels):
+    if not labels:
+        return name
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return f"{name}{{{body}}}"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value):
+    value = float(value)
+    if value == math.inf:
+        return "+Inf"
+    return repr(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+registry = MetricsRegistry()
+inc = registry.inc
+observe = registry.observe
+register_gauge = registry.register_gauge
+
+
+class timed:
+    """
+    Time a stage, as a decorator or a context manager:
+
+        @timed("fetch_price_data")
+        def fetch_price_data(...): ...
+
+        with timed("db_flush"):
+            ...
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._started = []
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(self.stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        self._started.append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._started.pop()
+        observe("mcp_stage_seconds", elapsed, help="Latency of pipeline stages", stage=self.stage)
+        inc("mcp_stage_calls_total", help="Pipeline stage calls by outcome",
+            stage=self.stage, outcome="error" if exc_type else "ok")
+        return False
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes would otherwise flood stdout
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    """Serve /metrics from a daemon thread (idempotent; port 0 disables it)."""
+    global _server
+    with _server_lock:
+        if _server is not None or not port:
+            return _server
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="mcp-metrics", daemon=True).start()
+        print(f"[metrics] Serving Prometheus metrics on http://{host}:{port}/metrics", flush=True)
+        return _server
+
+
+_cycles = {}
+_cycles_lock = threading.Lock()
+_profile_lock = threading.Lock()
+
+
+@contextmanager
+def profile_cycle(label: str = "cycle", mode: str = PROFILE_MODE, every: int = PROFILE_EVERY):
+    """
+    Profile every `every`-th cycle with the given label when mode is
+    "cprofile" or "tracemalloc"; a no-op otherwise. Reports go to PROFILE_DIR.
+    A cycle that comes due while another profile is running is not profiled.
+    """
+    with _cycles_lock:
+        _cycles[label] = n = _cycles.get(label, 0) + 1
+    if mode not in ("cprofile", "tracemalloc") or every <= 0 or n % every:
+        yield
+        return
+    if not _profile_lock.acquire(blocking=False):
+        yield
+        return
+    try:
+        with _profile(f"{label}_{n}", mode):
+            yield
+    finally:
+        _profile_lock.release()
+
+
+@contextmanager
+def _profile(label, mode):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{label}_{datetime.now():%Y%m%d_%H%M%S}_{mode}.txt")
+
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(40)
+            _write_report(path, out.getvalue())
+        return
+
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(10)
+    before = tracemalloc.take_snapshot()
+    try:
+        yield
+    finally:
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started_here:
+            tracemalloc.stop()
+        top = after.compare_to(before, "lineno")[:40]
+        report = [f"current={current / 1e6:.1f} MB peak={peak / 1e6:.1f} MB"] + [str(stat) for stat in top]
+        _write_report(path, "\n".join(report))
+
+
+def _write_report(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+    print(f"[metrics] Profile written to {path}", flush=True)
@@ -0,0 +1,213 @@
+# MCP-Stock-Tracker/utils/scheduler.py
+"""
+Drift-free periodic task scheduler.
+
+Each task fires on a fixed wall-clock grid,
+
+    anchor + k * interval + settle + phase
+
+so start times never drift with run duration. `phase` is a deterministic
+offset in [0, spread) derived from the task's key (crc32), which spreads
+symbols that share a cadence across the interval instead of having every
+container hit yfinance / NewsAPI in the same second. With an interval that
+divides the bar length, one tick always lands `settle` seconds after each
+bar close.
+
+A task never overlaps itself. If a tick comes due while the previous run is
+still going, the overrun policy decides:
+
+- "skip": drop the tick; the task resumes on the next grid point.
+- "coalesce": remember one catch-up run, started as soon as the current
+  run finishes; any further missed ticks fold into it.
+
+Ticks missed because the loop itself woke late (busy pool, suspended host)
+are never replayed one by one. Per-task stats include tick lateness (actual
+start minus scheduled time), which is the early warning for an undersized
+worker pool.
+"""
+
+import heapq
+import math
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.metrics import inc, observe
+
+OVERRUN_POLICIES = ("skip", "coalesce")
+
+
+def phase_offset(key: str, spread: float) -> float:
+    """Deterministic offset in [0, spread) for a key."""
+    if spread <= 0:
+        return 0.0
+    return (zlib.crc32(key.encode("utf-8")) / 2 ** 32) * spread
+
+
+class ScheduledTask:
+    """One periodic job and its run statistics."""
+
+    def __init__(self, name, func, interval, anchor=0.0, spread=0.0, settle=0.0,
+                 overrun="skip", key=None):
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval!r}")
+        if overrun not in OVERRUN_POLICIES:
+            raise ValueError(f"overrun must be one of {OVERRUN_POLICIES}, got {overrun!r}")
+        self.name = name
+        self.func = func
+        self.interval = float(interval)
+        self.overrun = overrun
+        self.offset = anchor + settle + phase_offset(key or name, min(spread, interval))
+
+        self.next_run = None
+        self.running = False
+        self.pending = None      # scheduled time of a coalesced catch-up run
+
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.coalesced = 0
+        self.lateness_total = 0.0
+        self.lateness_max = 0.0
+        self.last_lateness = None
+        self.last_duration = None
+
+    def next_after(self, t: float) -> float:
+        """First grid point strictly after t."""
+        k = math.floor((t - self.offset) / self.interval) + 1
+        return self.offset + k * self.interval
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "coalesced": self.coalesced,
+            "lateness_avg": round(self.lateness_total / self.runs, 3) if self.runs else None,
+            "lateness_max": round(self.lateness_max, 3),
+            "last_lateness": round(self.last_lateness, 3) if self.last_lateness is not None else None,
+            "last_duration": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "running": self.running
+        }
+
+
+class Scheduler:
+    """
+    Runs ScheduledTasks on a shared worker pool.
+
+    :param max_workers: Tasks that can run at the same time
+    """
+
+    def __init__(self, max_workers=4):
+        self._tasks = {}
+        self._heap = []          # (fire time, sequence, name)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-sched")
+
+    def add(self, name, func, interval, *, anchor=0.0, spread=0.0, settle=0.0,
+            overrun="skip", key=None, run_now=False) -> ScheduledTask:
+        """
+        Register (or replace) a periodic task.
+
+        :param interval: Seconds between ticks
+        :param anchor: Epoch offset of the grid, e.g. 1800 for bars that close at :30
+        :param spread: Width of the window the task's phase offset is drawn from
+        :param settle: Fixed delay after each grid point (lets a bar finish publishing)
+        :param overrun: "skip" or "coalesce" (see module docstring)
+        :param key: Phase key; defaults to name
+        :param run_now: Fire once immediately instead of waiting for the first grid point
+        """
+        task = ScheduledTask(name, func, interval, anchor, spread, settle, overrun, key)
+        with self._cond:
+            self._tasks[name] = task
+            self._push(task, time.time() if run_now else task.next_after(time.time()))
+            self._cond.notify()
+        return task
+
+    def remove(self, name) -> None:
+        with self._cond:
+            self._tasks.pop(name, None)
+
+    def names(self) -> list:
+        with self._cond:
+            return list(self._tasks)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {name: task.stats() for name, task in self._tasks.items()}
+
+    def stop(self, wait=True) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._pool.shutdown(wait=wait)
+
+    def run_forever(self) -> None:
+        """Dispatch ticks until stop() is called (blocks the calling thread)."""
+        with self._cond:
+            while not self._stopped:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, seq, name = self._heap[0]
+                now = time.time()
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+                heapq.heappop(self._heap)
+
+                task = self._tasks.get(name)
+                if task is None or task.next_run != due:
+                    continue  # removed or replaced since it was queued
+
+                # Grid points that passed while the loop was not dispatching
+                task.skipped += int((now - due) // task.interval)
+                self._push(task, task.next_after(now))
+
+                if task.running:
+                    if task.overrun == "coalesce":
+                        if task.pending is None:
+                            task.pending = due
+                        task.coalesced += 1
+                    else:
+                        task.skipped += 1
+                    inc("mcp_tick_overruns_total", help="Ticks that found the previous run still going",
+                        task=name.split(":")[0], policy=task.overrun)
+                    continue
+
+                task.running = True
+                self._pool.submit(self._run, task, due)
+
+    def _push(self, task, due):
+        task.next_run = due
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, task.name))
+
+    def _run(self, task, scheduled):
+        while True:
+            started = time.time()
+            lateness = max(0.0, started - scheduled)
+            try:
+                task.func()
+            except Exception as e:
+                task.failures += 1
+                print(f"[scheduler] Task {task.name} failed: {e}", flush=True)
+
+            observe("mcp_tick_lateness_seconds", lateness, help="Scheduled tick start delay",
+                    task=task.name.split(":")[0])
+            with self._cond:
+                task.runs += 1
+                task.lateness_total += lateness
+                task.lateness_max = max(task.lateness_max, lateness)
+                task.last_lateness = lateness
+                task.last_duration = time.time() - started
+
+                if task.pending is None or self._stopped or self._tasks.get(task.name) is not task:
+                    task.running = False
+                    task.pending = None
+                    return
+                scheduled, task.pending = task.pending, None